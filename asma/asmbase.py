@@ -20,7 +20,9 @@
 
 this_module="asmbase.py"
 
-# Python imports: None
+# Python imports:
+import array             # Access compact cross-reference arrays
+import bisect            # Search ordered cross-reference arrays
 # SATK imports:
 import fsmparser         # Access Finite-State-Machine-based parsing technology
 import lexer             # Access some objects
@@ -66,6 +68,12 @@ class ASMExpr(object):
             return s
         print(s)
 
+    # Compile the prepared expression when it is evaluated repeatedly, for example,
+    # by a macro invocation.  Subclasses that support compilation override this
+    # method.
+    def compile(self):
+        pass
+
     def evaluate(self,external,debug=False,trace=False):
         assert self.pratt is not None,"%s pratt attribute is None" \
             % assembler.eloc(self,"evaluate",module=this_module)
@@ -141,6 +149,14 @@ class ASMExprArith(ASMExpr):
         # the prepare() method.
         self.loc_ctr=False
 
+    # Compile the prepared expression.  A single token expression uses the quick
+    # evaluation instead.
+    def compile(self):
+        assert self.pratt is not None,"%s pratt attribute is None" \
+            % assembler.eloc(self,"compile",module=this_module)
+        if not self.quick:
+            self.pratt.compile()
+
     def evaluate(self,external,debug=False,trace=False):
         assert self.pratt is not None,"%s pratt attribute is None" \
             % assembler.eloc(self,"evaluate",module=this_module)
@@ -204,6 +220,14 @@ class ASMExprBinary(ASMExpr):
     def __init__(self,tokens):
         super().__init__(tokens)
 
+    # Compile the prepared expression.  A single token expression uses the quick
+    # evaluation instead.
+    def compile(self):
+        assert self.pratt is not None,"%s pratt attribute is None" \
+            % assembler.eloc(self,"compile",module=this_module)
+        if not self.quick:
+            self.pratt.compile()
+
     def evaluate(self,external,debug=False,trace=False):
         assert self.pratt is not None,"%s pratt attribute is None" \
             % assembler.eloc(self,"evaluate",module=this_module)
@@ -514,6 +538,7 @@ class CTerm(ASMOperand):
 
 
 class ASMPLoc(object):
+    __slots__=("source","pndx")    # Retained by every operand, so no __dict__
     def __init__(self,source=None,pndx=None):
         self.source=source  # Physical line asminput.Source object
         self.pndx=pndx      # Index within the physical line of this input location
@@ -539,6 +564,10 @@ class ASMPLoc(object):
 
 
 class ASMString(object):
+    # Separated operands are retained by their statements for the entire assembly.
+    # Instance attributes are slots so that these objects are compact.  Subclasses
+    # without their own __slots__ attribute still support additional attributes.
+    __slots__=("text","length","amp","chr_exp","new_line")
     def __init__(self,string,start=None,amp=False):
         assert isinstance(string,str),\
             "'string' argument must be a string: %s" % string
@@ -1013,6 +1042,10 @@ class AsmCtxParser(fsmparser.FSMContext):
 # This class is the base class for managing an instruction's or assembler directive's
 # operands.  Each operand in the source input is convered into a subclass of Operand.
 class Operand(object):
+    # One object exists for each operand of each machine instruction or template
+    # statement.  Instance attributes are slots to reduce the size of each object.
+    # Each subclass must also define the slots of its own attributes.
+    __slots__=("name","source","exprs","fields","values","laddr")
     def __init__(self,name):
         self.name=name       # An operand name.
         #For MSLDB Format the source sfield (without a number) is the name.
@@ -1138,6 +1171,7 @@ class Operand(object):
 #
 #   0x100 -  integer-expression                   [int,   None, None]
 class Single(Operand):
+    __slots__=("immediate",)
     valid_expr=[0x100,]
     valid_source=[0b100,]        # int -> register or mask or immediate
     omitted=[0,None,None]
@@ -1179,6 +1213,7 @@ class Single(Operand):
 #   0x200 -  CSECT-Address-expression             [isAbsolute(), None, None]
 #   0x200 -  DSECT-Address-expression             [isDummy(),    None, None]
 class SingleAddress(Operand):
+    __slots__=()
     valid_expr=[0x200,]
     valid_source=[0b100,]        # Address -> directive address
     omitted=[0,None,None]
@@ -1216,6 +1251,7 @@ class SingleAddress(Operand):
 #   0x200 -  CSECT-Address-expression             [isAbsolute(), None, None]
 #   0x200 -  DSECT-Address-expression             [isDummy(),    None, None]
 class SingleAny(Operand):
+    __slots__=()
     valid_expr=[0x100,0x200,]
     valid_source=[0b100,]    # Address or integer       -> directive operand
     omitted=[0,None,None]
@@ -1252,6 +1288,7 @@ class SingleAny(Operand):
 #
 #   0x200 -  CSECT-Address-expression             [isAbsolute(), None, None]
 class SingleRelImed(Operand):
+    __slots__=("relimed","isladdr")
     valid_expr=[0x200,]
     valid_source=[0b100,]
     omitted=[0,None,None]
@@ -1323,6 +1360,7 @@ class SingleRelImed(Operand):
 #    Operand.evaluate()    - Builds self.values list from self.operands,
 #    Storage.resolve()     - establishes all values explicit or implied
 class Storage(Operand):
+    __slots__=("size","base","disp")
     valid_expr=[0x100,0x110,0x200,0x210]
     valid_source=[0b100,     # Address/int, None, None  ->  UA/Disp (UA=base implied)
                   0b110]     # Address/int, int, None   ->  UA/Disp,base
@@ -1441,19 +1479,20 @@ class Storage(Operand):
 # Lengths are implied from the expression's root symbol's length.  The expression's
 # root symbol is the one to which an integer value is added or subtracted.
 class StorageExt(Storage):
+    __slots__=("isIndex","index","length")
     valid_expr=[0x100,0x101,0x110,0x111,0x200,0x210,0x211]
     valid_source=[0b100,     # Address/int, None, None  -> UA/Disp  (UA==base implied)
                   0b110,     # Address/int, int, None   -> UA/Disp,index
                   0b101,     # int, None, int           -> Disp,base
                   0b111]     # int, int, int            -> Disp,index,base
     disp_size={"SL":12,"SX":12,"SYL":20,"SYX":20}
-    isIndex=["SX","SYX"]
+    indexes=["SX","SYX"]     # Operand names with an index register
     omitted=[0,0,0]
 
     def __init__(self,name):
         super().__init__(name)
         # Indicates whether field is an index register (True) or length (False)
-        self.isIndex=(name in StorageExt.isIndex)
+        self.isIndex=(name in StorageExt.indexes)
 
         self.index=None
         self.length=None
@@ -1796,6 +1835,9 @@ class ASMSymAttr(object):
 #   T      Sets the entry's T' (type) attribute
 #   S      Sets the entry's S' (scale) attribute
 #   I      Sets the entry's I' (integer) attribute
+#
+# The statement numbers referencing the symbol are held in an array in the order of
+# their first reference.  Each statement number occurs once.
 class ASMSymEntry(object):
     def __init__(self,name,value,length=None,T="U",S=0,I=0):
         assert isinstance(name,str) and len(name)>=1,\
@@ -1807,6 +1849,12 @@ class ASMSymEntry(object):
         self.name=name                # Symbol name
         self.attrs=ASMSymAttr()       # Symbol attributes
         self._value=value             # Value of defined symbol
+
+        # Cross-reference information
+        self._defined=None            # source statement number defining the symbol
+        self._refs=array.array("L")   # source statements referencing this symbol
+        self._ordered=True            # Whether self._refs is in ascending order
+        self._xref=None               # XrefStore of the table containing the symbol
         # Set the type, scale and integer attributes
         self["T"]=T
         self["S"]=S
@@ -1832,6 +1880,30 @@ class ASMSymEntry(object):
 
         self.attrs[key]=value
 
+    # Add a reference to the symbol
+    def reference(self,line):
+        assert isinstance(line,int),\
+            "%s 'line' argument must be an integer" \
+                % assembler.eloc(self,"reference",module=this_module)
+
+        refs=self._refs
+        if refs:
+            last=refs[-1]
+            if line==last:
+                return
+            if self._ordered:
+                # While the references ascend, a prior reference is found by a
+                # binary search
+                if line<last:
+                    if refs[bisect.bisect_left(refs,line)]==line:
+                        return
+                    self._ordered=False
+            elif line in refs:
+                return
+        refs.append(line)
+        if self._xref is not None:
+            self._xref.index=None     # The store's index no longer includes them all
+
     # Update attributes.  Each updated attribute is an undefined keyword argument
     # accessed bia the **attrs dictionary, for exmaple update(I=5,T="A")
     def update(self,**attrs):
@@ -1864,6 +1936,7 @@ class ASMSymTable(object):
         self.tbl={}         # Symbol table dictionary
         self.wo=wo          # Whether symbol table is 'write-once'
         self.case=case      # Whether smbols names are case insensitive
+        self.xrefs=XrefStore()  # Cross-reference of the table's symbols
 
     # Retrieve a symbol entry definition by its name using index syntax: table[name]
     # Exceptions:
@@ -1892,6 +1965,8 @@ class ASMSymTable(object):
                 pass
 
         self.tbl[key]=item
+        if item._xref is None:
+            self.xrefs.add(item)
 
     # Add a new lang.STE entry.  The 'line' argument is the defining statement number
     # AssemblerError is raised if symbol already exists in the table
@@ -1926,6 +2001,18 @@ class ASMSymTable(object):
     def entries(self):
         return self.tbl.items()
 
+    # Returns the symbols referenced by statements within a range of statement
+    # numbers.
+    # Method Arguments:
+    #   first   The first statement number of the range
+    #   last    The last statement number of the range.  Defaults to first.
+    # Returns:
+    #   a list of tuples (statement number, symbol name) in statement number order
+    def referenced(self,first,last=None):
+        if last is None:
+            last=first
+        return [(line,entry.name) for line,entry in self.xrefs.query(first,last)]
+
     # Fetch a symbol by name.  Returns an instance of lang.STE.
     # Raises KeyError if symbol is not defined
     def get(self,item):
@@ -1949,6 +2036,18 @@ class ASMSymTable(object):
     def symbols(self):
         return self.tbl.values()
 
+    # Returns the cross-reference of a symbol
+    # Method Argument:
+    #   symbol  The name of the symbol
+    # Returns:
+    #   a tuple: (defining statement number or None, array of referencing statement
+    #   numbers in the order first referenced)
+    # Exception:
+    #   KeyError if the symbol is not defined
+    def xref(self,symbol):
+        entry=self.get(symbol)
+        return (entry._defined,array.array("L",entry._refs))
+
 
 #
 #  +---------------------------------+
@@ -1962,9 +2061,6 @@ class ASMSymTable(object):
 class LabelSymbol(ASMSymEntry):
     def __init__(self,name,entry,length=None,T="U",S=0,I=0):
         super().__init__(name,entry,length=length,T=T,S=S,I=I)
-        # Assembler XREF information
-        self._defined=None       # source statement number defining the symbol
-        self._refs=[]            # source statements referencing this symbol
 
         # Define attributes:
         if length is None:
@@ -1989,14 +2085,6 @@ class LabelSymbol(ASMSymEntry):
         raise ValueError("%s unexpected symbol table object '%s': %s" \
             % (eloc(self,"compute"),self.symbol,obj))
 
-    # Add a reference to the symbol
-    def reference(self,line):
-        assert isinstance(line,int),\
-            "%s 'line' argument must be an integer" % eloc(self,"reference")
-
-        if not line in self._refs:
-            self._refs.append(line)
-
 
 #
 #  +-----------------------------+
@@ -2008,7 +2096,9 @@ class LabelSymbol(ASMSymEntry):
 
 # The assembler manages many cross-reference contexts.  This object is used for
 # managing this information.  It has the ability to support an attribute character
-# with the line number.  Some cross-reference listings require that.
+# with the line number.  Some cross-reference listings require that.  Entries are
+# held in arrays.  xref objects are only created when the sorted entries are
+# requested.
 class XREF(object):
 
     # Returns the comparison value for sorting cross-reference items.
@@ -2018,29 +2108,34 @@ class XREF(object):
 
     # Create cross-reference database
     def __init__(self):
-        self.refs=[]      # Cross-reference item objects
+        self.lines=array.array("L")   # Line number of each entry
+        self.flags=bytearray()        # Flag character of each entry
 
     # Enter a definition entry.  Flag defaults to an asterisk, '*'.
     def define(self,line,flag="*"):
-        self.refs.append(xref(line,flag=flag))
+        self.lines.append(line)
+        self.flags.append(ord(flag))
 
     # Enter a reference entry.  Flag defaults to a space, ' '.
     def ref(self,line,flag=" "):
-        self.refs.append(xref(line,flag=flag))
+        self.lines.append(line)
+        self.flags.append(ord(flag))
 
     # Returns a sorted list of cross-reference entries.  Sort is based upon the
     # line number of the entry.
     def sort(self):
-        return sorted(self.refs,key=XREF.sort_key)
-        
+        refs=[xref(line,flag=chr(flag)) for line,flag in zip(self.lines,self.flags)]
+        return sorted(refs,key=XREF.sort_key)
+
     # Removes the first entry from the list of references.  The first
     # entry is the location of the definition.
     def undefine(self):
-        if not self.refs:
+        if not self.lines:
             # No entries so nothing to undefine
             return
         # Remove the first reference to this cross-reference list
-        self.refs=self.refs[1:]
+        del self.lines[0]
+        del self.flags[0]
 
 
 # Individual cross-reference entry.  The flag defaults to a space.
@@ -2053,6 +2148,51 @@ class xref(object):
         return "xref: line - %s, flag - %s" % (self.line,self.flag) 
 
 
+# This object provides queries of the symbols referenced by a range of statements
+# for the entries of a symbol table.  The references themselves remain with each
+# entry.  An index of all of the references in statement number order, held in two
+# arrays, is built by the first query following the recording of a new reference.
+class XrefStore(object):
+    def __init__(self):
+        self.entries=[]                # ASMSymEntry objects by symbol index
+        # Index of the references: (statement numbers, symbol indices) or None
+        self.index=None
+
+    def __len__(self):
+        return sum(len(entry._refs) for entry in self.entries)
+
+    # Add a symbol entry to the store
+    def add(self,entry):
+        entry._xref=self
+        self.entries.append(entry)
+        if entry._refs:
+            self.index=None
+
+    # Returns the references of the statements within a range of statement numbers
+    # Method Arguments:
+    #   first   The first statement number of the range
+    #   last    The last statement number of the range
+    # Returns:
+    #   a list of tuples (statement number, ASMSymEntry) in statement number order
+    def query(self,first,last):
+        index=self.index
+        if index is None:
+            refs=sorted((line,xid) for xid,entry in enumerate(self.entries) \
+                for line in entry._refs)
+            index=self.index=(array.array("L",[line for line,xid in refs]),\
+                array.array("L",[xid for line,xid in refs]))
+        lines,syms=index
+        entries=self.entries
+        found=[]
+        # Start with the first reference at or after the first statement
+        for ndx in range(bisect.bisect_left(lines,first),len(lines)):
+            line=lines[ndx]
+            if line>last:
+                break
+            found.append((line,entries[syms[ndx]]))
+        return found
+
+
 if __name__ == "__main__":
     raise NotImplementedError("%s - this module only supports import usage" \
         % this_module)
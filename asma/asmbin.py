@@ -55,12 +55,16 @@ class AsmBinary(object):
         return bytearray(array)
 
     # Scan all of the assembler statements looking for contiguous binary data.  For
-    # each chunk it finds, create a Contig instance and add it to list, self.contig
+    # each chunk it finds, create a Contig instance and add it to list, self.contig.
+    # A Contig's data is a slice of the image buffer, so no statement's data is
+    # copied.  Statements whose content is not located in the image supply their
+    # own data.
     def __find_contig(self,asm):
         # If list already exists, no need to scan the statements again.
         if isinstance(self.contig,list):
             return
 
+        image=asm.imgwip.barray        # memoryview of the completed image buffer
         current=None
         max_addr=0
         contig_list=[]
@@ -79,22 +83,30 @@ class AsmBinary(object):
                 continue
             if not loc.isAbsolute():   # Only use data with an absolute address
                 continue
-            if len(barray)==0:         # If data is actually of zero length, ignore it
+            length=len(barray)
+            if length==0:              # If data is actually of zero length, ignore it
                 continue
 
             # Found some actual data that could be contigous with other data
             addr=loc.address
             max_addr=max(max_addr,addr)   # Save maximum address
+            disp=content.img_disp()
+            if disp is None:
+                # Not in the image, so use the statement's own data
+                buffer=memoryview(barray)
+                disp=0
+            else:
+                buffer=image
             if current is None:
-                current=Contig(addr)
-            if current.add(addr,barray):
+                current=Contig(addr,buffer,disp)
+            if current.add(addr,buffer,disp,length):
                 # True means it _was_ contigous so keep looking for more
                 continue
             # False means it was _not_ contiguous.  Add what we have to complete list
             contig_list.append(current)
             # Start a new area and add the discontiguous data to it.
-            current=Contig(addr)
-            current.add(addr,barray)
+            current=Contig(addr,buffer,disp)
+            current.add(addr,buffer,disp,length)
 
         self.max_addr=max_addr          # Remember the maximum address
 
@@ -116,18 +128,16 @@ class AsmBinary(object):
         chunks=[]
         for c in self.contig:
             chunks.extend(c.chunks(16))  # maximum of 16 bytes stored
-        cmdfile=""
+        cmds=[]
         for c in chunks:
-            cmdfile="%s%sSTORE RS%X %s\n" \
-                % (cmdfile,cpcmd,c.addr,self.bytes_in_hex(c.data))
+            cmds.append("%sSTORE RS%X %s\n" \
+                % (cpcmd,c.addr,self.bytes_in_hex(c.data)))
+        cmdfile="".join(cmds)
         #print("cmdfile:\n%s" % cmdfile)
         return cmdfile
 
     def bytes_in_hex(self,barray):
-        hexdata=""
-        for b in barray:
-            hexdata="%s%02X" % (hexdata,b)
-        return hexdata
+        return bytes(barray).hex().upper()
 
     def card_sequence(self,number):
         num="%08d" % number
@@ -155,15 +165,15 @@ class AsmBinary(object):
         # Prepare constants for deck generation
         blank1=AsmBinary.SPACE        # Position 5    in TXT record
         blank2=2*AsmBinary.SPACE      # Position 9,10 and 13,14 in TXT record
-        TXT=bytearray(AsmBinary.TXT)
-        END=bytearray(AsmBinary.END)
+        TXT=AsmBinary.TXT
+        END=AsmBinary.END
         ESDID=(0).to_bytes(2,byteorder="big")  # Positions 15 and 16 in TXT record
         number=1
-        deck=[]
+        deck=bytearray()
 
         # Generate TXT records
         for c in chunks:
-            record=[]
+            record=bytearray()
             record.extend(TXT)                        # Pos 1-4
             record.extend(blank1)                     # Pos 5
             addr=c.addr.to_bytes(3,byteorder="big")
@@ -182,7 +192,7 @@ class AsmBinary(object):
             deck.extend(record)
 
         # Generate END record
-        record=[]
+        record=bytearray()
         record.extend(END)                            # Pos 1-4
         record.extend(blank1)                         # Pos 5
         entry=entry.to_bytes(3,byteorder="big")
@@ -193,7 +203,7 @@ class AsmBinary(object):
         record.extend(self.card_sequence(number))     # Pos 73-80
         deck.extend(record)
 
-        return bytearray(deck)
+        return deck
 
     # Create tuple list of list for directed IPL content.
     # Each tuple contains:
@@ -229,11 +239,11 @@ class AsmBinary(object):
         chunks=[]
         for c in self.contig:
             chunks.extend(c.chunks(16))  # maximum of 16 bytes altered by r command
-        rcfile=""
+        cmds=[]
         for c in chunks:
-            rcfile="%sr %X=%s\n" % (rcfile,c.addr,self.bytes_in_hex(c.data))
+            cmds.append("r %X=%s\n" % (c.addr,self.bytes_in_hex(c.data)))
 
-        return rcfile
+        return "".join(cmds)
 
     # Create a virtual machine STORE command file     
     def vmc_file(self,asm):
@@ -249,44 +259,58 @@ class Chunk(object):
         return "Chunk(start=0x%X,end=0x%X,bytes=%s)" \
             % (self.addr,self.addr+length-1,length)
 
+# A contiguous area of binary data.  The data is not accumulated.  It is the slice
+# of a buffer, normally the image buffer, where the area resides.
+#
+# Instance Arguments:
+#   start    The starting address of the area
+#   buffer   A memoryview of the buffer containing the data
+#   disp     The displacement of the area within the buffer
 class Contig(object):
-    def __init__(self,start):
+    def __init__(self,start,buffer,disp):
         self.start=start       # Starting address of contiguous area
         self.next=start        # Addres of next contiguous area
-        self.data=[]           # Accumulated data
+        self.buffer=buffer     # Buffer containing the data
+        self.disp=disp         # Displacement of the data within the buffer
+        self.length=0          # Length of the contiguous data
 
     def __str__(self):
-        length=len(self.data)
+        length=self.length
         return "Contig(start=0x%X,end=0x%X,bytes=%s)" \
             % (self.start,self.start+length-1,length)
 
+    # Returns the contiguous data as a memoryview
+    @property
+    def data(self):
+        return self.buffer[self.disp:self.disp+self.length]
+
     # Accumulates contigous data.
+    # Method Arguments:
+    #   addr     The address of the data
+    #   buffer   The buffer containing the data
+    #   disp     The displacement of the data within the buffer
+    #   length   The length of the data
     # Returns True if data is accepted as contiguous
     # Returns False if the data is not contiguous.
-    def add(self,addr,data):
-        if not isinstance(data,(bytes,bytearray)):
-            cls_str=assembler.eloc(self,"add")
-            raise ValueError("%s 'data' argument must be bytes or bytearray: %s" \
-                % (cls_str,data))
-
+    def add(self,addr,buffer,disp,length):
         if addr!=self.next:
             return False
-        if not isinstance(data,list):
-            d=list(data)
-        else:
-            d=data
+        # Contiguous addresses must also be contiguous in the same buffer
+        if buffer is not self.buffer or disp!=self.disp+self.length:
+            return False
 
-        self.data.extend(d)
-        self.next+=len(d)
+        self.length+=length
+        self.next+=length
         return True
 
     # Returns a list of Chunk objects in the size requested
     def chunks(self,size):
-        length=len(self.data)
+        length=self.length
+        data=self.data
         addr=self.start
         chunks=[]
         for ndx in range(0,length,size):
-            c=self.data[ndx:min(ndx+size,length)]
+            c=data[ndx:min(ndx+size,length)]
             chunks.append(Chunk(addr+ndx,c))
         return chunks
 
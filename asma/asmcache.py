@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+# This file is part of SATK.
+#
+#     SATK is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     SATK is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with SATK.  If not, see <http://www.gnu.org/licenses/>.
+
+# This module provides incremental assembly.  The results of an assembly are saved
+# in a cache directory together with a record of everything upon which the
+# assembly depended:
+#
+#   - the contents of every file read: the source, COPY members, macro library
+#     files, MSL database files and code page files,
+#   - every file name sought in the COPY and macro library search paths, found or
+#     not, and the file which it located, so that a newly added COPY member or
+#     library macro is recognized,
+#   - the assembler options including --define values and the MSL target,
+#   - which outputs were requested, and
+#   - the assembler's own modules.
+#
+# When none of these have changed, the saved results are returned to the driver
+# without constructing an assembler.  Otherwise the assembly occurs and its results
+# replace those previously saved.
+#
+# The macro expansions of the assembly are saved with its results.  When the saved
+# results can not be used but only the source, COPY members or macro library files
+# changed, the assembly reuses the saved expansions preceding the first changed
+# input line rather than running the macro engine for them.  See the
+# asmmacs.ExpansionCache class.  The statements themselves are assembled again.
+# Every statement's generated binary and listing line depend upon the location
+# counter and symbol values established by every other statement, so statement
+# results are not reused individually.  The results of an assembly referencing the
+# date or time of the assembly through a system variable symbol are never reused.
+
+this_module="asmcache.py"
+
+# Python imports:
+import hashlib        # Access digest algorithms
+import os             # Access file system
+import pickle         # Save and restore results
+import sys            # Access the Python version
+# SATK imports:
+import satkutil       # Access the SATK root directory
+# ASMA imports:
+import assembler      # Access the Image object
+
+
+# This object replaces the assembler.Image object for saved results.  Only the
+# output and the text of reported errors are retained.
+#
+# Instance Argument:
+#   img    The assembler.Image object whose results are being saved
+class CachedImage(assembler.Image):
+    def __init__(self,img):
+        super().__init__()
+        self.deck=img.deck
+        self.export=img.export
+        # The image buffer and its views are memoryviews, which can not be pickled
+        self.image=img.image
+        if self.image is not None:
+            self.image=bytes(self.image)
+        self.ldipl=img.ldipl
+        if self.ldipl is not None:
+            self.ldipl=[(name,bytes(content) if isinstance(content,memoryview) \
+                else content,mode) for name,content,mode in self.ldipl]
+        self.listing=img.listing
+        self.mc=img.mc
+        self.rc=img.rc
+        self.vmc=img.vmc
+
+        # Saved error reports in the order reported by assembler.Image.errors()
+        aes=sorted(img.aes,key=assembler.AssemblerError.sort)
+        self.reports=["%s" % ae for ae in aes]
+        self.failed=img.failures()
+
+    def errors(self):
+        for report in self.reports:
+            print(report)
+
+    def failures(self):
+        return self.failed
+
+
+# This class manages a directory of saved assembly results.  A results file is
+# identified by the input source, the current working directory and the assembler
+# options.  It is valid only if none of the assembly's dependencies have changed.
+#
+# Warning: results files are Python pickles.  The cache directory must not be
+# writable by untrusted users.
+#
+# Instance Arguments:
+#   directory   The directory in which results files reside.  It is created if it
+#               does not exist.
+#   debug       Specify True to print cache activity messages.
+class AsmCache(object):
+    version=4        # Results file format version.  Increment on any change.
+    ext=".asmr"      # Results file extension
+    # SATK directories containing the assembler's modules
+    tool_dirs=["asma","tools","tools/lang","tools/ipl"]
+
+    def __init__(self,directory,debug=False):
+        self.directory=directory  # Directory containing results files
+        self.debug=debug          # Print cache activity
+        # Macro expansions available for reuse.  Set by the load() method
+        self.expansions={}
+
+    # Return the file system path of the results file for an assembly.
+    def __cache_file(self,source,options):
+        key="%s|%s|%s|%s|%r" % (AsmCache.version,sys.hexversion,os.getcwd(),\
+            source,options)
+        name=hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory,"%s%s" % (name,AsmCache.ext))
+
+    # Return the digest of a file's contents or None if the file can not be read
+    @staticmethod
+    def digest(filepath):
+        try:
+            with open(filepath,"rb") as fo:
+                return hashlib.sha1(fo.read()).hexdigest()
+        except OSError:
+            return None
+
+    # Return the path of the file selected by opening a file name from a search
+    # path or None if no file would be found.  This matches satkutil.PathMgr.ropen().
+    # Method Arguments:
+    #   dirs      The search path's directories or None if not opened from a path
+    #   filename  The file name as opened
+    @staticmethod
+    def resolve(dirs,filename):
+        if os.path.isabs(filename) or dirs is None:
+            candidates=[filename,]
+        else:
+            candidates=[os.path.join(d,filename) for d in dirs]
+        for filepath in candidates:
+            if os.path.isfile(filepath):
+                return os.path.abspath(filepath)
+        return None
+
+    # Return the search path directories of a PathMgr object or an empty list
+    @staticmethod
+    def search(pathmgr,variable):
+        if pathmgr is None:
+            return []
+        try:
+            return pathmgr.paths[variable].dir_list
+        except KeyError:
+            return []
+
+    # Identifies the assembler's own modules by name, size and modification time.
+    # Any change to the assembler invalidates all saved results.
+    @staticmethod
+    def tools():
+        modules=[]
+        for reldir in AsmCache.tool_dirs:
+            directory=satkutil.satkdir(reldir)
+            try:
+                names=os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith(".py"):
+                    continue
+                try:
+                    st=os.stat(os.path.join(directory,name))
+                except OSError:
+                    continue
+                modules.append((reldir,name,st.st_size,st.st_mtime_ns))
+        modules.sort()
+        return hashlib.sha1(repr(modules).encode("utf-8")).hexdigest()
+
+    # Returns a previously saved CachedImage object or None if one is not
+    # available or is not valid for the assembly.  The saved macro expansions
+    # remain available in the expansions attribute when only the input files of the
+    # assembly changed.
+    # Method Arguments:
+    #   source   The input source file name as supplied to the assembler
+    #   options  A tuple of the assembler options influencing its results
+    def load(self,source,options):
+        self.expansions={}
+        cfile=self.__cache_file(source,options)
+        try:
+            with open(cfile,"rb") as fo:
+                saved=pickle.load(fo)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            if self.debug:
+                print("%s - AsmCache.load() - ignoring unreadable results file "
+                    "%s: %s" % (this_module,cfile,e))
+            return None
+
+        try:
+            if saved["version"]!=AsmCache.version:
+                return None
+            tools=saved["tools"]
+            env=saved["env"]
+            files=saved["files"]
+            lookups=saved["lookups"]
+            expansions=saved["expansions"]
+            img=saved["image"]
+        except (TypeError,KeyError):
+            return None
+
+        if tools!=AsmCache.tools():
+            if self.debug:
+                print("%s - AsmCache.load() - assembler changed" % this_module)
+            return None
+        # MSL database and code page files influence macro expansions through the
+        # symbol values established before a macro is invoked.
+        for filepath,digest in env:
+            if AsmCache.digest(filepath)!=digest:
+                if self.debug:
+                    print("%s - AsmCache.load() - file changed: %s" \
+                        % (this_module,filepath))
+                return None
+        self.expansions=expansions
+
+        for dirs,filename,filepath in lookups:
+            if AsmCache.resolve(dirs,filename)!=filepath:
+                if self.debug:
+                    print("%s - AsmCache.load() - file located differently: %s" \
+                        % (this_module,filename))
+                return None
+        for filepath,digest in files:
+            if AsmCache.digest(filepath)!=digest:
+                if self.debug:
+                    print("%s - AsmCache.load() - file changed: %s" \
+                        % (this_module,filepath))
+                return None
+
+        if img is None:
+            if self.debug:
+                print("%s - AsmCache.load() - results depend upon the assembly "
+                    "date or time" % this_module)
+            return None
+        if self.debug:
+            print("%s - AsmCache.load() - using results file: %s" \
+                % (this_module,cfile))
+        return img
+
+    # Saves the results of a completed assembly.  It must be called after the
+    # assembly's outputs are written.
+    # Returns True if the results file was written, False otherwise.
+    # Method Arguments:
+    #   source   The input source file name as supplied to the assembler
+    #   options  A tuple of the assembler options influencing its results
+    #   asm      The assembler.Assembler object that performed the assembly
+    def save(self,source,options,asm):
+        env=[]
+        for filepath in asm.OMF.mslfiles+asm.cpfiles:
+            filepath=os.path.abspath(filepath)
+            digest=AsmCache.digest(filepath)
+            if digest is None:
+                return False
+            env.append((filepath,digest))
+
+        files=[]
+        for filepath in asm.dependencies():
+            digest=AsmCache.digest(filepath)
+            if digest is None:
+                return False
+            files.append((filepath,digest))
+
+        lookups=[]
+        for variable,filename,dirs in asm.lookups():
+            lookups.append((dirs,filename,AsmCache.resolve(dirs,filename)))
+
+        expansions={}
+        timed=False
+        if asm.XC is not None:
+            expansions=asm.XC.expansions
+            timed=asm.XC.timed
+
+        img=CachedImage(asm.image())
+        if timed:
+            # The results depend upon when the assembly occurred.  Only the
+            # expansions preceding the dependency are saved for reuse.
+            img=None
+        elif img.listing is None and asm.aout.streamed:
+            # The listing was written to its file rather than kept by the Image
+            try:
+                with open(asm.aout.listing,"rt") as fo:
+                    img.listing=fo.read()
+            except OSError:
+                return False
+
+        saved={"version":AsmCache.version,
+               "tools":AsmCache.tools(),
+               "env":env,
+               "files":files,
+               "lookups":lookups,
+               "expansions":expansions,
+               "image":img}
+        cfile=self.__cache_file(source,options)
+        # Write a temporary file and rename it so that concurrent assemblies
+        # never see a partially written results file.
+        tfile="%s.%s" % (cfile,os.getpid())
+        try:
+            os.makedirs(self.directory,exist_ok=True)
+            with open(tfile,"wb") as fo:
+                pickle.dump(saved,fo,protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tfile,cfile)
+        except (OSError,pickle.PicklingError) as e:
+            if self.debug:
+                print("%s - AsmCache.save() - could not write results file %s: %s" \
+                    % (this_module,cfile,e))
+            try:
+                os.remove(tfile)
+            except OSError:
+                pass
+            return False
+
+        if self.debug:
+            print("%s - AsmCache.save() - results file written: %s" \
+                % (this_module,cfile))
+        return True
+
+
+if __name__ == "__main__":
+    raise NotImplementedError("%s - intended for import use only" % this_module)
@@ -105,6 +105,19 @@ class asma(config.Tool):
             help="listing provides the image content in storage dump format.",\
             cl=True,cfg=True))
 
+        # Stream the listing to its file
+        cfg.arg(config.Enable("lstream",full="lstream",\
+            help="writes the listing file while the listing is created rather than "
+                 "holding the complete listing in memory.",\
+            cl=True,cfg=True))
+
+        # Listing lines per streamed write
+        cfg.arg(config.Decimal("lbuffer",full="lbuffer",default="0",\
+            metavar="LINES",\
+            help="number of listing lines collected before each write of a streamed "
+                 "listing.  Defaults to 0, writing each line when created.",\
+            cl=True,cfg=True))
+
         # Set macro call printing option
         cfg.arg(config.Enable("mcall",short="m",full="mcall",\
             help="Include inner macro statements during PRINT ON listing option. "
@@ -119,6 +132,13 @@ class asma(config.Tool):
                  "created.",
             cl=True,cfg=True))
 
+        # Assembly result export file
+        cfg.arg(config.Option_SV("export",full="export",metavar="FILEPATH",\
+            help="binary indexed file of the symbol table, image map, USING "
+                 "ranges, statement addresses and image content for use by other "
+                 "tools.  If omitted, no file is created.",\
+            cl=True,cfg=True))
+
         # Path and filename of the written binary image file
         cfg.arg(config.Option_SV("image",short="i",full="image",metavar="FILEPATH",\
             help="binary image file containing content.  If omitted, no file is "
@@ -174,6 +194,20 @@ class asma(config.Tool):
             help="enables statististics reporting.",\
             cl=True,cfg=True))
 
+        # Enable profiling
+        cfg.arg(config.Option_SV("profile",full="profile",metavar="FILEPATH",\
+            help="enables profiling by statement class, macro, parser and file.  "
+                 "A report is displayed and the measurements are written to the "
+                 "JSON file FILEPATH.  If omitted, profiling is disabled.",\
+            cl=True,cfg=True))
+
+        # Profile report sequence
+        cfg.arg(config.Choices("profsort",full="profsort",metavar="KEY",\
+            choices=["self","total","calls","name"],default="self",\
+            help="sorts the profile report by KEY: self, total, calls or name.  "
+                 "Defaults to self.",\
+            cl=True,cfg=True))
+
         # Specify the code page translation
         cfg.arg(config.Option_SV("cp",full="cp",metavar="TRANS[=FILE]",\
             help="specify the code page translation and, if provided, the code page "
@@ -188,6 +222,31 @@ class asma(config.Tool):
                  "specified by the MSLPATH environment variable.",\
             cl=True,cfg=True))
 
+        # Compiled MSL database directory
+        cfg.arg(config.Option_SV("mslcache",full="mslcache",metavar="DIR",\
+            help="directory of compiled MSL CPU definitions.  A compiled definition "
+                 "is used when its MSL files are unchanged, avoiding the MSL "
+                 "database build.  If omitted, MSL files are always processed.",\
+            cl=True,cfg=True))
+
+        # Saved library macro definitions directory
+        cfg.arg(config.Option_SV("maccache",full="maccache",metavar="DIR",\
+            help="directory of saved macro library definitions.  A saved "
+                 "definition is used when its macro library file is unchanged, "
+                 "avoiding processing of the file's statements.  If omitted, macro "
+                 "library files are always processed.",\
+            cl=True,cfg=True))
+
+        # Incremental assembly results directory
+        cfg.arg(config.Option_SV("asmcache",full="asmcache",metavar="DIR",\
+            help="directory of saved assembly results.  Saved results are output "
+                 "without assembling when the source, its COPY members, macro "
+                 "library files, MSL files, options and requested outputs are "
+                 "unchanged.  Otherwise the source is assembled again, reusing the "
+                 "saved macro expansions preceding the first changed line.  If "
+                 "omitted, the source is always assembled.",\
+            cl=True,cfg=True))
+
         # Maximum depth of nested input sources.
         # May be specified in a local configuration
         nest_default="20"
@@ -20,7 +20,8 @@
 
 this_module="%s.py" % __name__
 
-# Python imports: None
+# Python imports:
+import copy       # Copy parsed operands
 # SATK imports:
 import pratt3     # Access for some object type checks
 import fsmparser  # Access Finite-State machine parser technology
@@ -911,6 +912,46 @@ class DCDS_Operand(asmbase.AsmFSMScope):
     def align(self):
         return self.act_algn
 
+    # Returns a copy of a parsed operand for use by another statement.  The lexical
+    # tokens are copied because Pass 0 updates them with their position in the
+    # statement.  Must only be used with an operand that has not been through
+    # Pass 0 processing.
+    # Method Argument:
+    #   stmt   The statement using the copy
+    def clone(self,stmt):
+        new=copy.copy(self)
+        new._stmt=stmt
+        new._typ_tok=DCDS_Operand.clone_token(self._typ_tok,stmt)
+        new._dup_expr=DCDS_Operand.clone_tokens(self._dup_expr,stmt)
+        new._len_expr=DCDS_Operand.clone_tokens(self._len_expr,stmt)
+        values=[]
+        for val in self._values:
+            if isinstance(val,asmtokens.LexicalToken):
+                values.append(DCDS_Operand.clone_token(val,stmt))
+            else:
+                # Address constant nominal values are a list of tokens
+                values.append(DCDS_Operand.clone_tokens(val,stmt))
+        new._values=values
+        new.value=list(self.value)
+        new.values=[]
+        return new
+
+    # Returns a copy of a lexical token.  A current location counter reference
+    # refers to the location of the statement using the copy.
+    @staticmethod
+    def clone_token(ltok,stmt):
+        if ltok is None:
+            return None
+        new=copy.copy(ltok)
+        if getattr(ltok,"iscur",False):
+            new.stmt=stmt
+        return new
+
+    # Returns a list of copied lexical tokens
+    @staticmethod
+    def clone_tokens(ltoks,stmt):
+        return [DCDS_Operand.clone_token(ltok,stmt) for ltok in ltoks]
+
     # A DC operand with zero duplication ends up being represented by this object.
     # This lets Pass 2 build nothing.
     def build(self,stmt,asm,n,debug=False,trace=False):
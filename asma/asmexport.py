@@ -0,0 +1,648 @@
+#!/usr/bin/python3
+# This file is part of SATK.
+#
+#     SATK is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     SATK is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with SATK.  If not, see <http://www.gnu.org/licenses/>.
+
+# This module exports the results of an assembly in a compact binary file, allowing
+# other tools to locate a symbol or the statement of an address without processing
+# the listing.  The file is created by the asma.py --export option.  The ExportFile
+# class memory maps an export file and searches its tables in place.
+#
+# Export File Format
+#
+# All integers are little-endian.  The file starts with a header followed by the
+# table directory.  Each table starts on an 8-byte boundary.
+#
+#   Header      magic 'ASMX', version, number of tables, load address, entry address,
+#               the length of the longest statement and flags.  An address of -1
+#               indicates the address is not available.
+#   Directory   one entry per table: table name, record length, file position of
+#               the table and number of records.
+#
+#   Table   Records                                                  Sequence
+#   STRS    UTF-8 text of names.  Other records locate a name by its  -
+#           position and length within this table.
+#   FILE    source files: file number and file name                   file number
+#   SYMB    symbols: name, value, L' attribute, defining statement,   name
+#           position and number of its references within REFS, T'
+#           attribute and flags
+#   LITS    literals: literal pool number followed by the same        pool, name
+#           fields as a SYMB record.  The same literal may occur in
+#           more than one pool.
+#   REFS    statement numbers referencing symbols and literals        by symbol
+#   MAPS    the image, its regions and their control sections: name,  listing map
+#           address, image position, length, containing region and
+#           the T' attribute of the name
+#   USNG    USING ranges: base address, first and ending statements,  first stmt.
+#           DSECT name, register and flags
+#   STMT    statements generating object code: address, image         address
+#           position, length, statement number, file number and line
+#           within the file, and flags
+#   CODE    the image content                                         -
+#
+# Generated statements are attributed to the source line of the open code statement
+# whose macro generated them.
+#
+# This module may be imported without the assembler.  The ExportWriter class imports
+# the assembler modules it needs when used.
+
+this_module="asmexport.py"
+
+# Python imports:
+import bisect         # Locate recorded addresses
+import mmap           # Map the export file
+import struct         # Build and extract binary records
+# SATK imports:
+from satkutil import eloc   # Access the error location function
+
+
+# Raised when an export file is not readable by the ExportFile class
+class ExportError(Exception):
+    def __init__(self,msg=""):
+        self.msg=msg
+        super().__init__(msg)
+
+
+# Export file header and table formats
+HEADER=struct.Struct("<4sHHqqIB3x")
+DIRENT=struct.Struct("<4sIQQ")
+FILE=struct.Struct("<III")
+SYMB=struct.Struct("<IIqIIIIcB2x")
+LITS=struct.Struct("<IIIqIIIIcB2x")
+REFS=struct.Struct("<I")
+MAPS=struct.Struct("<IIqqqicB2x")
+USNG=struct.Struct("<qIIIIBB2x")
+STMT=struct.Struct("<qqIIIIB3x")
+
+MAGIC=b"ASMX"
+VERSION=2
+NONE=0xFFFFFFFF       # Unavailable statement number
+
+# Flags
+HDR_CASE=0x01         # Symbol names are case sensitive
+SYM_DUMMY=0x01        # Symbol value is a DSECT displacement
+USNG_DUMMY=0x01       # USING base is a DSECT displacement
+STMT_GENED=0x01       # Statement was generated by a macro
+
+
+#
+#  +-------------------------+
+#  |                         |
+#  |   Export File Creation  |
+#  |                         |
+#  +-------------------------+
+#
+
+# This class creates the export file content from a completed assembly.
+#
+# Instance Argument:
+#   asm    The assembler.Assembler object whose results are exported
+class ExportWriter(object):
+    def __init__(self,asm):
+        self.asm=asm
+        self.strings=bytearray()  # The STRS table
+        self.names={}             # Position and length of each name in STRS
+
+    # Returns the position and length of a name in the STRS table, adding it if
+    # needed.
+    def name(self,name):
+        try:
+            return self.names[name]
+        except KeyError:
+            pass
+        data=name.encode("utf-8")
+        ref=self.names[name]=(len(self.strings),len(data))
+        self.strings.extend(data)
+        return ref
+
+    # Returns the export file content as a bytes sequence
+    def build(self):
+        asm=self.asm
+        img=asm.img
+        files=self.files()
+        symbols,literals,refs=self.symbols()
+        maps=self.maps()
+        usings=self.usings()
+        stmts,max_len=self.stmts()
+        code=img.image
+        if code is None:
+            code=b""
+
+        tables=[(b"FILE",FILE.size,files),
+                (b"SYMB",SYMB.size,symbols),
+                (b"LITS",LITS.size,literals),
+                (b"REFS",REFS.size,refs),
+                (b"MAPS",MAPS.size,maps),
+                (b"USNG",USNG.size,usings),
+                (b"STMT",STMT.size,stmts),
+                (b"STRS",1,[self.strings,]),
+                (b"CODE",1,[code,])]
+
+        load=img.load
+        entry=img.entry
+        if load is None:
+            load=-1
+        if entry is None:
+            entry=-1
+        flags=HDR_CASE if asm.case else 0
+        data=bytearray(HEADER.pack(MAGIC,VERSION,len(tables),load,entry,max_len,\
+            flags))
+        dirpos=len(data)
+        data.extend(bytes(DIRENT.size*len(tables)))
+        for ndx,tbl in enumerate(tables):
+            tag,size,records=tbl
+            data.extend(bytes(-len(data) % 8))
+            pos=len(data)
+            for rec in records:
+                data.extend(rec)
+            count=(len(data)-pos)//size
+            DIRENT.pack_into(data,dirpos+ndx*DIRENT.size,tag,size,pos,count)
+        return bytes(data)
+
+    # Returns the list of FILE records
+    def files(self):
+        recs=[]
+        for src in sorted(self.asm.IM.LB._files,key=lambda s: s.fileno):
+            soff,slen=self.name(src.fname)
+            recs.append(FILE.pack(src.fileno,soff,slen))
+        return recs
+
+    # Returns the list of MAPS records in the sequence of the listing's image map
+    def maps(self):
+        recs=[]
+        wip=self.asm.imgwip
+        soff,slen=self.name(wip.name)
+        recs.append(MAPS.pack(soff,slen,0,0,len(wip),-1,b"1",0))
+        for r in wip.elements:
+            soff,slen=self.name(r.name)
+            recs.append(MAPS.pack(soff,slen,r.value().address,r.img_loc,len(r),\
+                -1,b"2",0))
+            parent=len(recs)-1
+            for c in r.elements:
+                soff,slen=self.name(c.name)
+                recs.append(MAPS.pack(soff,slen,c.value().address,c.img_loc,\
+                    len(c),parent,b"J",0))
+        return recs
+
+    # Returns the list of STMT records in address sequence and the length of the
+    # longest statement
+    def stmts(self):
+        recs=[]
+        max_len=0
+        fileno=lineno=0
+        for s in self.asm.stmts:
+            logline=s.logline
+            if not s.gened and logline is not None and logline.source is not None:
+                # Generated statements use the source of the open code statement
+                fileno=logline.source.fileno or 0
+                lineno=logline.source.lineno or 0
+            content=s.content
+            if content is None:
+                continue
+            length=len(content)
+            disp=content.img_disp()
+            if length==0 or disp is None:
+                continue
+            max_len=max(max_len,length)
+            flags=STMT_GENED if s.gened else 0
+            recs.append((content.loc.lval(),disp,length,s.lineno,fileno,lineno,flags))
+        recs.sort()
+        return ([STMT.pack(*rec) for rec in recs],max_len)
+
+    # Returns the lists of SYMB, LITS and REFS records.  The SYMB records are in the
+    # sequence of their UTF-8 encoded names.  The LITS records are in the sequence
+    # of their pool numbers and then their names.
+    def symbols(self):
+        # Imported here because lnkbase imports the assembler, which imports this
+        # module.
+        import assembler      # Access Section objects
+        import lnkbase        # Access Address objects
+
+        asm=self.asm
+        syms=[]
+        for name in asm.ST.getList():
+            syms.append((name.encode("utf-8"),name,asm.ST[name]))
+        syms.sort(key=lambda x: x[0])
+        lits=[]
+        for pool in asm.LPM.pools:
+            for lit in pool.getList():
+                lits.append((pool.pool_id,lit.name.encode("utf-8"),lit.name,lit))
+        lits.sort(key=lambda x: x[:2])
+
+        recs=[]
+        lrecs=[]
+        refs=[]
+        nrefs=0
+        for pool,name,ste in [(None,name,ste) for key,name,ste in syms]+\
+                             [(pool,name,ste) for pool,key,name,ste in lits]:
+            value=ste.value()
+            flags=0
+            if isinstance(value,assembler.Section):
+                if value.isdummy():
+                    flags|=SYM_DUMMY
+            elif isinstance(value,lnkbase.Address) and value.isDummy():
+                flags|=SYM_DUMMY
+            value=lnkbase.Address.extract(value)
+            defined=ste._defined
+            if defined is None:
+                defined=NONE
+            typ=ste["T"].encode("utf-8")[:1]
+            soff,slen=self.name(name)
+            lines=ste._refs
+            fields=(soff,slen,value,ste["L"],defined,nrefs,len(lines),typ,flags)
+            if pool is None:
+                recs.append(SYMB.pack(*fields))
+            else:
+                lrecs.append(LITS.pack(pool,*fields))
+            refs.append(struct.pack("<%sI" % len(lines),*lines))
+            nrefs+=len(lines)
+        return (recs,lrecs,refs)
+
+    # Returns the list of USNG records in the sequence the USING's were established
+    def usings(self):
+        recs=[]
+        for rng in self.asm.bases.ranges():
+            base=rng.base
+            flags=0
+            if base.section is None:
+                soff=slen=0
+            else:
+                soff,slen=self.name(base.section.name)
+                flags|=USNG_DUMMY
+            first=rng.first
+            last=rng.last
+            if first is None:
+                first=NONE
+            if last is None:
+                last=NONE
+            recs.append(USNG.pack(base.address,first,last,soff,slen,base.reg,flags))
+        return recs
+
+
+#
+#  +------------------------+
+#  |                        |
+#  |   Export File Access   |
+#  |                        |
+#  +------------------------+
+#
+
+# A symbol or literal of an export file
+class ExportSymbol(object):
+    def __init__(self,name,value,length,defined,refs,typ,flags,pool=None):
+        self.name=name          # The symbol's name
+        self.pool=pool          # The literal's pool number or None for a symbol
+        self.value=value        # Its address or value
+        self.length=length      # The L' attribute
+        self.defined=defined    # The defining statement number or None
+        self.refs=refs          # tuple of referencing statement numbers
+        self.typ=typ            # The T' attribute
+        self.dummy=(flags & SYM_DUMMY)!=0  # Whether value is a DSECT displacement
+
+    def __str__(self):
+        return "%s(%s,T=%s,L=%s,value=0x%X,defined=%s)" % (self.__class__.__name__,\
+            self.name,self.typ,self.length,self.value,self.defined)
+
+
+# An image, region or control section of an export file
+class ExportMap(object):
+    def __init__(self,name,address,pos,length,region,typ):
+        self.name=name          # The name of the image, region or section
+        self.address=address    # Its starting address
+        self.pos=pos            # Its position within the image
+        self.length=length      # Its length
+        self.region=region      # Index of the containing region in maps or None
+        self.typ=typ            # '1' for the image, '2' for a region, 'J' a section
+
+    def __str__(self):
+        return "%s(%s,%s,address=0x%X,pos=0x%X,length=%s)" \
+            % (self.__class__.__name__,self.typ,self.name,self.address,self.pos,\
+                self.length)
+
+
+# A USING range of an export file
+class ExportUsing(object):
+    def __init__(self,address,first,last,section,reg,flags):
+        self.address=address    # Base address or DSECT displacement
+        self.first=first        # First statement number of the range
+        self.last=last          # Ending statement number or None
+        self.section=section    # DSECT name or None
+        self.reg=reg            # The base register
+        self.dummy=(flags & USNG_DUMMY)!=0
+
+    def __str__(self):
+        return "%s(R%s,0x%X,section=%s,first=%s,last=%s)" \
+            % (self.__class__.__name__,self.reg,self.address,self.section,\
+                self.first,self.last)
+
+    # Returns whether the range includes a statement number
+    def includes(self,lineno):
+        return self.first<=lineno and (self.last is None or lineno<self.last)
+
+
+# A statement of an export file
+class ExportStmt(object):
+    def __init__(self,address,pos,length,lineno,filename,fline,flags):
+        self.address=address    # The statement's address
+        self.pos=pos            # Its position within the image
+        self.length=length      # The length of its object code
+        self.lineno=lineno      # The statement number
+        self.filename=filename  # The source file or None
+        self.fline=fline        # The line number within the source file
+        self.gened=(flags & STMT_GENED)!=0   # Whether generated by a macro
+
+    def __str__(self):
+        return "%s([%s] 0x%X,length=%s,%s:%s)" % (self.__class__.__name__,\
+            self.lineno,self.address,self.length,self.filename,self.fline)
+
+
+# This class provides access to an export file.  The file is memory mapped and its
+# tables searched in place.  Symbols are located by name and statements by address
+# with a binary search.
+#
+# Instance Argument:
+#   filepath   The path of the export file
+# Exceptions:
+#   OSError if the file can not be opened
+#   ExportError if the file is not a supported export file
+class ExportFile(object):
+    def __init__(self,filepath):
+        self.filepath=filepath
+        with open(filepath,"rb") as fo:
+            try:
+                self.mm=mmap.mmap(fo.fileno(),0,access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ExportError("%s empty export file: %s" \
+                    % (eloc(self,"__init__",module=this_module),\
+                        filepath)) from None
+        self.view=memoryview(self.mm)
+        try:
+            self.__header()
+        except (ExportError,struct.error) as e:
+            self.close()
+            if isinstance(e,ExportError):
+                raise
+            raise ExportError("%s truncated export file: %s" \
+                % (eloc(self,"__init__",module=this_module),\
+                    filepath)) from None
+
+        # Lazily built address index of the STMT table.  See stmt_addrs() method.
+        self._addrs=None
+        self._files=None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    # Returns the number of symbols in the file
+    def __len__(self):
+        return self.tables[b"SYMB"][2]
+
+    # Read and validate the header and table directory
+    def __header(self):
+        magic,version,ntables,load,entry,max_len,flags=\
+            HEADER.unpack_from(self.mm,0)
+        if magic!=MAGIC or version!=VERSION:
+            raise ExportError("%s not a version %s export file: %s" \
+                % (eloc(self,"__header",module=this_module),VERSION,\
+                    self.filepath))
+        self.load=None if load==-1 else load
+        self.entry=None if entry==-1 else entry
+        self.max_len=max_len
+        self.case=(flags & HDR_CASE)!=0   # Whether names are case sensitive
+        self.tables={}
+        for n in range(ntables):
+            tag,size,pos,count=DIRENT.unpack_from(self.mm,HEADER.size+n*DIRENT.size)
+            if pos+size*count>len(self.mm):
+                raise ExportError("%s truncated %s table in export file: %s" \
+                    % (eloc(self,"__header",module=this_module),\
+                        tag.decode("ascii","replace"),self.filepath))
+            self.tables[tag]=(size,pos,count)
+
+    # Returns the index of the first LITS record whose key is not less than the
+    # supplied key or, when after is True, is greater than the supplied key.  A key
+    # of only the pool number matches all of the pool's records.
+    def __lits_bound(self,key,count,after):
+        lo=0
+        hi=count
+        while lo<hi:
+            mid=(lo+hi)//2
+            rec=self.__record(b"LITS",LITS,mid)
+            found=(rec[0],self.__bytes(rec[1],rec[2]))[:len(key)]
+            if found<key or (after and found==key):
+                lo=mid+1
+            else:
+                hi=mid
+        return lo
+
+    # Returns the record of a table as a tuple
+    def __record(self,tag,fmt,ndx):
+        size,pos,count=self.tables[tag]
+        return fmt.unpack_from(self.mm,pos+ndx*size)
+
+    # Returns a name from the STRS table as a bytes sequence
+    def __bytes(self,soff,slen):
+        pos=self.tables[b"STRS"][1]+soff
+        return self.mm[pos:pos+slen]
+
+    # Returns a name from the STRS table as a string
+    def __name(self,soff,slen):
+        return self.__bytes(soff,slen).decode("utf-8")
+
+    # Returns the file name of a file number or None
+    def __filename(self,fileno):
+        if self._files is None:
+            files={}
+            for n in range(self.tables[b"FILE"][2]):
+                num,soff,slen=self.__record(b"FILE",FILE,n)
+                files[num]=self.__name(soff,slen)
+            self._files=files
+        return self._files.get(fileno)
+
+    # Returns an ExportSymbol object from the tuple of a SYMB record or the tuple
+    # of a LITS record without its pool number
+    def __symbol(self,rec,pool=None):
+        soff,slen,value,length,defined,roff,rcnt,typ,flags=rec
+        rpos=self.tables[b"REFS"][1]+roff*REFS.size
+        refs=struct.unpack_from("<%sI" % rcnt,self.mm,rpos)
+        if defined==NONE:
+            defined=None
+        return ExportSymbol(self.__name(soff,slen),value,length,defined,refs,\
+            typ.decode("utf-8"),flags,pool=pool)
+
+    # Returns an ExportStmt object from the tuple of a STMT record
+    def __stmt(self,rec):
+        address,pos,length,lineno,fileno,fline,flags=rec
+        return ExportStmt(address,pos,length,lineno,self.__filename(fileno),fline,\
+            flags)
+
+    # Release the memory mapped file
+    def close(self):
+        if self.mm is None:
+            return
+        self._addrs=None
+        self.view.release()
+        self.mm.close()
+        self.mm=None
+
+    # Returns a list of ExportMap objects of the image, its regions and their
+    # sections in the sequence of the listing's image map
+    def maps(self):
+        lst=[]
+        for n in range(self.tables[b"MAPS"][2]):
+            soff,slen,address,pos,length,region,typ,flags=\
+                self.__record(b"MAPS",MAPS,n)
+            if region<0:
+                region=None
+            lst.append(ExportMap(self.__name(soff,slen),address,pos,length,region,\
+                typ.decode("utf-8")))
+        return lst
+
+    # Returns a read-only memoryview of image content.  The view must be released
+    # before the ExportFile object is closed.
+    # Method Arguments:
+    #   address   The address of the content
+    #   length    The number of bytes of the content
+    # Exception:
+    #   KeyError if the content is not within one region of the image
+    def read(self,address,length):
+        for m in self.maps():
+            if m.typ!="2":
+                continue
+            if m.address<=address and address+length<=m.address+m.length:
+                pos=self.tables[b"CODE"][1]+m.pos+(address-m.address)
+                return self.view[pos:pos+length]
+        raise KeyError(address)
+
+    # Returns the list of ExportStmt objects whose object code contains an address.
+    # Statements overlapping by ORG each contain the address.  Returns an empty
+    # list if no statement contains the address.
+    def statements(self,address):
+        addrs=self.stmt_addrs()
+        ndx=bisect.bisect_right(addrs,address)
+        lst=[]
+        low=address-self.max_len
+        while ndx>0:
+            ndx-=1
+            start=addrs[ndx]
+            if start<=low:
+                break
+            rec=self.__record(b"STMT",STMT,ndx)
+            if address<start+rec[2]:
+                lst.append(self.__stmt(rec))
+        lst.reverse()
+        return lst
+
+    # Returns the statement whose object code contains an address.  When statements
+    # overlap, the last statement assembled is returned.
+    # Exception:
+    #   KeyError if no statement contains the address
+    def statement(self,address):
+        lst=self.statements(address)
+        if len(lst)==0:
+            raise KeyError(address)
+        return max(lst,key=lambda s: s.lineno)
+
+    # Returns the list of STMT table addresses.  The list is built when first
+    # requested.
+    def stmt_addrs(self):
+        if self._addrs is None:
+            size,pos,count=self.tables[b"STMT"]
+            self._addrs=[struct.unpack_from("<q",self.mm,pos+n*size)[0] \
+                for n in range(count)]
+        return self._addrs
+
+    # Returns the list of ExportSymbol objects of literals in the sequence of their
+    # pool numbers and names.  Unique literals, for example those referencing the
+    # location counter, may occur more than once in a pool.
+    # Method Arguments:
+    #   pool   Selects the literals of this pool number.  If None, literals of all
+    #          pools are returned.  Defaults to None.
+    #   name   Selects the literals with this name, the literal as it appears in the
+    #          listing, including its initial '='.  If None, literals of any name are
+    #          returned.  Defaults to None.
+    def literals(self,pool=None,name=None):
+        count=self.tables[b"LITS"][2]
+        if pool is None:
+            lo=0
+            hi=count
+        else:
+            # Locate the records of the pool and, if supplied, the name
+            key=(pool,) if name is None else (pool,name.encode("utf-8"))
+            lo=self.__lits_bound(key,count,False)
+            hi=self.__lits_bound(key,count,True)
+        lst=[]
+        for n in range(lo,hi):
+            rec=self.__record(b"LITS",LITS,n)
+            if name is not None and self.__name(rec[1],rec[2])!=name:
+                continue
+            lst.append(self.__symbol(rec[1:],pool=rec[0]))
+        return lst
+
+    # Returns the ExportSymbol object of a symbol
+    # Method Argument:
+    #   name   The symbol's name.  Names are case sensitive only if the assembly
+    #          was.
+    # Exception:
+    #   KeyError if the symbol is not present
+    def symbol(self,name):
+        if self.case:
+            key=name.encode("utf-8")
+        else:
+            # Symbol names of a case insensitive assembly are upper case
+            key=name.upper().encode("utf-8")
+        lo=0
+        hi=self.tables[b"SYMB"][2]
+        while lo<hi:
+            mid=(lo+hi)//2
+            rec=self.__record(b"SYMB",SYMB,mid)
+            found=self.__bytes(rec[0],rec[1])
+            if found<key:
+                lo=mid+1
+            elif found>key:
+                hi=mid
+            else:
+                return self.__symbol(rec)
+        raise KeyError(name)
+
+    # Returns an iterator of the ExportSymbol objects of all symbols in name
+    # sequence.  Literals are returned by the literals() method.
+    def symbols(self):
+        for n in range(self.tables[b"SYMB"][2]):
+            yield self.__symbol(self.__record(b"SYMB",SYMB,n))
+
+    # Returns the list of ExportUsing objects of the USING ranges.  If a statement
+    # number is supplied, only the ranges including the statement are returned.
+    def usings(self,lineno=None):
+        lst=[]
+        for n in range(self.tables[b"USNG"][2]):
+            address,first,last,soff,slen,reg,flags=self.__record(b"USNG",USNG,n)
+            if first==NONE:
+                first=0
+            if last==NONE:
+                last=None
+            if flags & USNG_DUMMY:
+                section=self.__name(soff,slen)
+            else:
+                section=None
+            u=ExportUsing(address,first,last,section,reg,flags)
+            if lineno is None or u.includes(lineno):
+                lst.append(u)
+        return lst
+
+
+if __name__ == "__main__":
+    raise NotImplementedError("%s - intended for import use only" % this_module)
@@ -25,6 +25,10 @@
 this_module="asminput.py"
 
 # Python imports
+import array         # Access compact line offset index
+import collections   # Access ordered dictionary for SourceCache
+import hashlib       # Access digest algorithms for macro expansion reuse
+import os            # Access file status for SourceCache validation
 import os.path       # Access path tools by FileBuffer class
 
 # SATK imports:
@@ -62,6 +66,163 @@ class SourceError(Exception):
         self.msg=msg
         super().__init__(msg)
 
+#
+#  +-----------------------+
+#  |                       |
+#  |   Source File Cache   |
+#  |                       |
+#  +-----------------------+
+#
+
+# The complete text of a source or COPY file with an index of the offset at which
+# each of its lines starts.  Lines are created from the text when requested.
+#
+# Instance Arguments:
+#   fname   The path of the file as located by its search path
+#   text    The file's content as read in text mode
+#   stat    The os.stat_result of the file when it was read
+class SourceFile(object):
+    def __init__(self,fname,text,stat):
+        self.fname=fname
+        self.text=text
+        self.mtime=stat.st_mtime_ns   # Used to detect a changed file
+        self.size=stat.st_size
+        self._digest=None             # Digest of the text.  See digest() method
+
+        # Offset of the start of each line.  A final line feed does not start a line.
+        starts=array.array("L",[0])
+        pos=text.find("\n")
+        while pos!=-1:
+            starts.append(pos+1)
+            pos=text.find("\n",pos+1)
+        if starts[-1]==len(text):
+            starts.pop()
+        self.starts=starts
+
+    def __len__(self):
+        return len(self.starts)
+
+    # Returns the hexadecimal digest of the file's text
+    def digest(self):
+        if self._digest is None:
+            self._digest=hashlib.sha1(\
+                self.text.encode("utf-8","surrogatepass")).hexdigest()
+        return self._digest
+
+    # Returns a line of the file, without its line feed, by its index
+    def line(self,ndx):
+        starts=self.starts
+        beg=starts[ndx]
+        if ndx+1<len(starts):
+            return self.text[beg:starts[ndx+1]-1]
+        line=self.text[beg:]
+        if line and line[-1]=="\n":
+            return line[:-1]
+        return line
+
+    # Returns whether the file is unchanged since it was read
+    def valid(self):
+        try:
+            st=os.stat(self.fname)
+        except OSError:
+            return False
+        return st.st_mtime_ns==self.mtime and st.st_size==self.size
+
+
+# This class reads each source and COPY file once, in bulk, and retains its text
+# for later use.  Subsequent references to the same file, whether repeated COPY's
+# within an assembly or by later assemblies in the same process, are satisfied from
+# memory.  A file modified since it was read is read again.  When the retained text
+# exceeds the limit, the least recently referenced files are discarded.  A file
+# being read by an assembly remains available to it when discarded.
+#
+# A file is identified by the name by which it is referenced, the search path
+# used to locate it and the current working directory.  A file name located by
+# a different search path may be a different file.  A retained file is only used
+# while the search path, as reflected by its directory listings, still locates
+# the same file.  A file of the same name added to a directory earlier in the
+# search order is read instead.
+#
+# The number of files read from the file system and the number of references
+# satisfied from memory are counted.  When profiling, the profiler counts them too.
+#
+# Instance Argument:
+#   limit   The maximum number of characters of file text retained.  Defaults to
+#           16 megabytes.
+class SourceCache(object):
+    def __init__(self,limit=16*1024*1024):
+        self.files=collections.OrderedDict()  # SourceFile objects by reference
+        self.limit=limit  # Maximum characters of text retained
+        self.chars=0      # Characters of text presently retained
+        self.reads=0      # Number of files read from the file system
+        self.hits=0       # Number of references satisfied from memory
+
+    # Count an event in the profiler when profiling
+    @staticmethod
+    def count(name):
+        prof=assembler.Stats.prof
+        if prof is not None:
+            prof.count(name)
+
+    # Discard all retained files
+    def clear(self):
+        self.files=collections.OrderedDict()
+        self.chars=0
+
+    # Returns the SourceFile object of a referenced file.
+    # Method Arguments:
+    #   pathmgr   The satkutil.PathMgr object locating the file
+    #   filename  The file name as referenced
+    #   variable  The search path variable used to locate the file
+    # Exceptions:
+    #   SourceError if the file can not be located or read
+    def source(self,pathmgr,filename,variable):
+        try:
+            dirs=tuple(pathmgr.paths[variable].dir_list)
+        except KeyError:
+            dirs=None
+        key=(filename,variable,dirs,os.getcwd())
+        try:
+            sfile=self.files[key]
+        except KeyError:
+            sfile=None
+        if sfile is not None and sfile.valid() \
+           and pathmgr.resolves(filename,sfile.fname,variable=variable):
+            self.files.move_to_end(key)
+            self.hits+=1
+            SourceCache.count("source cache hits")
+            return sfile
+
+        try:
+            fname,fo=pathmgr.ropen(filename,variable=variable,debug=False)
+        except ValueError as ve:
+            raise SourceError("%s" % ve) from None
+        try:
+            with fo:
+                stat=os.fstat(fo.fileno())
+                text=fo.read()
+        except OSError:
+            raise SourceError("could not read input text file: %s" % fname) \
+                from None
+
+        self.reads+=1
+        SourceCache.count("source file reads")
+        files=self.files
+        old=files.pop(key,None)
+        if old is not None:
+            self.chars-=len(old.text)
+        sfile=files[key]=SourceFile(fname,text,stat)
+        self.chars+=len(text)
+        # Discard the least recently referenced files exceeding the limit
+        while self.chars>self.limit and len(files)>1:
+            discarded,old=files.popitem(last=False)
+            self.chars-=len(old.text)
+        return sfile
+
+# The source cache shared by all assemblies in this process
+CACHE=SourceCache()
+
+
 #
 #  +-------------------+
 #  |                   |
@@ -120,7 +281,8 @@ class InputSource(object):
         raise NotImplementedError("%s subclass must provide init() method" \
             % assembler.eloc(self,"init",module=this_module))
 
-# Manage a text file as an input source.
+# Manage a text file as an input source.  The file's lines are provided by the
+# SourceCache.
 # Instance Arguments:
 #    typ        Type of input source. Always 'F' supplied by LineBuffer
 #    filename   A file name is the source id for a FileSource
@@ -138,28 +300,23 @@ class FileSource(InputSource):
         self.fname=None           # Text absolute path from search path.
         self.eof=False            # Flag set at physical end-of-file
         self.leof=False           # Flas set when at logical end-of-file
-        self.fo=None              # Python file object
+        self.sfile=None           # SourceFile object providing the lines
         self.lineno=None          # File line number
         
         self.queued=[]  # Allows physical lines to be pushed back and read again
 
     # Finish use of this file input source
     def fini(self):
-        if self.fo is None:
-            raise ValueError("%s file object not created for file: %s" \
+        if self.sfile is None:
+            raise ValueError("%s source file not read for file: %s" \
                 % (assembler.eloc(self,"fini",module=this_module),self.fname))
-        try:
-            self.fo.close()
-        except OSError:
-            raise SourceError("could not close input text file: %s" % self.fname) \
-                from None
 
     # Returns a physical line conforming to the files continuation convention
     def getLine(self,debug=False):
         # Validate source state for getLine() method
-        if self.fo is None:
+        if self.sfile is None:
             cls_str=assembler.eloc(self,"getLine",module=this_module)
-            raise ValueError("%s file object not created for file: %s" \
+            raise ValueError("%s source file not read for file: %s" \
                 % (cls_str,self.fname))
         if self.eof:
             if self.leof:
@@ -176,27 +333,24 @@ class FileSource(InputSource):
             return pline
 
         # No queued lines, so read from the file
-        line=self.fo.readline()
-        if len(line)==0:
+        if self.lineno>=len(self.sfile):
             self.fini()
             raise SourceEmpty()
+        line=self.sfile.line(self.lineno)
         self.lineno+=1
-        if line[-1]=="\n":
-            line=line[:-1]
 
         return StreamLine(Source(lineno=self.lineno,fileno=self.fileno),\
             line,seq=self.seq)
 
     # Perform file input source initialization
-    # Locate the file based upon ASMPATH environment variable and open it 
+    # Locate the file based upon ASMPATH environment variable and obtain its lines
+    # from the source cache
     def init(self,pathmgr=None,variable="ASMPATH"):
-        if self.fo is not None:
-            raise ValueError("%s file object already exists for file: %s" \
+        if self.sfile is not None:
+            raise ValueError("%s source file already read for file: %s" \
                 % (assembler.eloc(self,"init",module=this_module),self.fname))
-        try:
-            self.fname,self.fo=pathmgr.ropen(self.rname,variable=variable,debug=False)
-        except ValueError as ve:
-            raise SourceError("%s" % ve) from None
+        self.sfile=CACHE.source(pathmgr,self.rname,variable)
+        self.fname=self.sfile.fname
 
         self.lineno=0
         
@@ -342,7 +496,12 @@ class MacroSource(InputSource):
             self.queued=plines[1:]  # Queue the extra lines for the next call
 
         # Return the first or only line
-        pline=StreamLine(None,plines[0],genlvl=self.depth)
+        line=plines[0]
+        if isinstance(line,ModelLine):
+            line.genlvl=self.depth
+            pline=line
+        else:
+            pline=StreamLine(None,line,genlvl=self.depth)
         if __debug__:
             if debug:
                 print("%s returning: %s" \
@@ -415,6 +574,8 @@ class PhysLine(object):
         self.oper_start=None        # Set by LogLine.fields() method
         self.operand_start=None     # Set by Logline.fields() method
         self.comment_start=None     # Set by asmline.cfsm.ACT_Found_Comment() method
+        # Operands located by a macro model statement template.  See ModelLine
+        self.presplit=None
 
         # Make sure we do not process an empty physical line
         if len(self.content)==0:
@@ -516,6 +677,24 @@ class StreamLine(PhysLine):
             self._variable()
 
 
+# A single physical line generated by a macro model statement whose operands have
+# already been located by the model statement's template (see model.Model.presplit()
+# method).  The asmline.LineMgr uses the located operands rather than recognizing
+# them again from the text.
+#
+# Instance Arguments:
+#   content   The generated line as a string
+#   presplit  A tuple of the operand field starting index, a list of the operands,
+#             each either a tuple of the operand string and its starting index or
+#             None for an omitted operand, and the comment field's starting index
+#             or None.
+#   genlvl    The generation level of the line.  Set by MacroSource if None.
+class ModelLine(StreamLine):
+    def __init__(self,content,presplit,genlvl=None):
+        super().__init__(None,content,genlvl=genlvl)
+        self.presplit=presplit
+
+
 # This class buffers input lines in a LIFO stack of input sources.
 #
 #
@@ -531,6 +710,8 @@ class StreamLine(PhysLine):
 #    error     Report if a file source in included more than once.
 #              (not yet implemented)
 #    pathmgr   PathMgr object for access to input.
+#    xcache    asmmacs.ExpansionCache object whose input digest includes the input
+#              read or None
 #
 # Instance Methods:
 #    end       Terminate additional input.  Called when END directive encountered
@@ -539,7 +720,7 @@ class StreamLine(PhysLine):
 #              inclusion for initial input source file.
 class LineBuffer(object):
     source_type={"F":FileSource,"M":MacroSource}
-    def __init__(self,depth=20,env="ASMPATH",pathmgr=None,seq=False):
+    def __init__(self,depth=20,env="ASMPATH",pathmgr=None,seq=False,xcache=None):
         # Directory search order path manager
         if pathmgr is None:
             self._opath=satkutil.PathMgr(variable=env,debug=False)
@@ -550,6 +731,11 @@ class LineBuffer(object):
         self._seq=seq              # Enable 80 collumn card handling
         self._sources=[]           # List of input sources
         self._files=[]             # List of input files
+        self._lookups=[]           # File names sought from the search path
+        self._xcache=xcache        # asmmacs.ExpansionCache object or None
+        # Whether lines are included in the input digest as they are read.  Macro
+        # library files are included in their entirety when opened.
+        self._xlines=xcache is not None and env!="MACLIB"
         self._cur_src=None         # Current active source
         self._fileno=0             # Current file number
         self._lineno=0             # The previous global line number
@@ -602,10 +788,20 @@ class LineBuffer(object):
                 msg="nested input source depth reached: %s" % self._depth)
         src_cls=LineBuffer.source_type[typ]
         srco=src_cls(typ,sid,srcno=srcno,seq=self._seq)
+        prof=assembler.Stats.prof
+        if prof is not None and typ=="F":
+            # Measure the file input by the environment variable locating it
+            prof.instrument(srco,self._env,sid,["init","getLine","fini"])
+        if typ=="F":
+            self._lookups.append(sid)
         try:
             srco.init(pathmgr=self._opath,variable=self._env)
         except SourceError as se:
+            if self._xcache is not None and typ=="F":
+                self._xcache.opened(self._env,sid,None)
             raise assembler.AssemblerError(line=stmtno,msg=se.msg) from None
+        if self._xcache is not None and typ=="F":
+            self._xcache.opened(self._env,sid,srco.sfile)
 
         # Input source now ready to be used
         self.__appendSource(srco)
@@ -638,6 +834,8 @@ class LineBuffer(object):
         while True:
             try:
                 ln=self._cur_src.getLine(debug=False)
+                if self._xlines and self._cur_src._typ=="F":
+                    self._xcache.line(ln.content)
                 # WARNING: this break is required!  DO NOT DELETE
                 break
             except SourceEmpty:
@@ -257,6 +257,7 @@ class LOperands(asmbase.ASMString):
 # multiple operands.  A list of these objects is constructed when a asmstmts.Stmt
 # subclass has the class attribute sep=True.
 class LOperand(asmbase.ASMString):
+    __slots__=("onum","isLiteral")
     def __init__(self,string,source,ndx,onum):
         assert string is not None,\
             "LOperand 'string' argument must be a string: %s" % string
@@ -584,6 +585,14 @@ class cfsm(fsm.FSM):
                             pl.comment=True
                 return []
 
+        # Separate the operands of a single physical line without the FSM when
+        # possible.
+        if self._trace is None and not self.pline.cont \
+           and not self.comma_only:
+            operands=self.quick()
+            if operands is not None:
+                return operands
+
         # Use FSM to parse operands
         while True:
             c=self.char()
@@ -599,6 +608,75 @@ class cfsm(fsm.FSM):
             self.add_operand()
         return self.operands
 
+    # Separate the operands of an uncontinued physical line using string methods
+    # rather than the FSM.  Only operand fields without single quotes are separated.
+    # The results, including the physical line's comment_start attribute, are the
+    # same as those of the FSM for the same line.
+    # Returns:
+    #   a list of LOperand objects or None for omitted operands
+    #   None if the FSM must separate the operands.  This includes all operand
+    #   fields in error so the FSM reports the error.
+    def quick(self):
+        text=self.text
+        ndx=self.cndx
+        end=text.find(" ",ndx)
+        if end==-1:
+            end=len(text)
+        field=text[ndx:end]
+        if "'" in field:
+            return None
+
+        source=self.source
+        operands=[]
+        opnd=""       # Accumulated operand characters
+        start=ndx     # Index of the operand's first character
+        lparens=rparens=0
+        pieces=field.split(",")
+        last=len(pieces)-1
+        for n,piece in enumerate(pieces):
+            opnd+=piece
+            if "(" in piece or ")" in piece:
+                lparens+=piece.count("(")
+                rparens+=piece.count(")")
+            if n==last:
+                break
+            if lparens!=rparens:
+                # This is a suboperand separator, so include it in the operand
+                opnd+=","
+                continue
+            # End of the operand
+            if opnd:
+                lopnd=LOperand(opnd,source,start,len(operands)+1)
+                lopnd.amp="&" in opnd
+                operands.append(lopnd)
+            else:
+                operands.append(None)
+            start+=len(opnd)+1
+            opnd=""
+            lparens=rparens=0
+
+        if end<len(text):
+            # The operands end with a space
+            if self.spaces and lparens>rparens:
+                return None
+        elif not opnd:
+            # A trailing comma does not add an omitted operand
+            return operands
+        if lparens!=rparens:
+            return None
+        if opnd:
+            lopnd=LOperand(opnd,source,start,len(operands)+1)
+            lopnd.amp="&" in opnd
+            operands.append(lopnd)
+        else:
+            operands.append(None)
+
+        # Locate the comment following the operands if any
+        mo=cfsm.find_cmt.match(text,end)
+        if mo.end()<len(text):
+            self.pline.comment_start=mo.end()
+        return operands
+
     def start(self,logline,attrs="",spaces=False,alt=False,comma=False):
         if attrs=="":
             self.attrs=asmtokens.ATTR
@@ -729,6 +807,11 @@ class cfsm(fsm.FSM):
 #   pline    The first physical line starting the logical line.
 #   bend     Set to True if the assembler has already encountered the END statement
 class LogLine(object):
+    # Each statement retains its logical line for the listing.  Instance attributes
+    # are slots so that each of these objects is compact.
+    __slots__=("plines","source","genlvl","literal","error","label_fld","oper_fld",\
+               "opnd_fld","operu","T","spaces","sep","alt","optn","info",\
+               "operands","comment","quiet","empty","cont","bend","ignore")
     #                       label       sp       oper             sp
     fieldre=re.compile("(?P<label>[^ ]+)?([ ]+)(?P<oper>[^ ]+)(?P<sp>[ ]*)")
     def __init__(self,pline,bend=False):
@@ -911,6 +994,12 @@ class LogLine(object):
     def operpos(self):
         return self.plines[0].operand_start
 
+    # Release the field and operand objects.  Only the physical lines, needed by
+    # the listing, and the line status are retained.
+    def release(self):
+        self.label_fld=self.oper_fld=self.opnd_fld=None
+        self.operands=self.info=None
+
 
 # This object manages all input processing, delivering logical lines to the
 # assembler.  The line buffer supplied by the asminput module is used for physical
@@ -936,7 +1025,7 @@ class LineMgr(object):
 
         # Physical line source manager
         self.LB=asminput.LineBuffer(depth=depth,env=env,pathmgr=pathmgr,\
-            seq=self.asm.seq)
+            seq=self.asm.seq,xcache=self.asm.XC)
 
         # Universal Operand Field Parser
         self.fsm=cfsm(trace=True)
@@ -1087,6 +1176,17 @@ class LineMgr(object):
                 print("%s alt:   %s" % (cls_str,alt))
 
         if sep:
+            pline=logline.plines[0]
+            if pline.presplit is not None and not comma \
+               and len(logline.plines)==1 \
+               and pline.operand_start==pline.presplit[0]:
+                # Use operands already located by a macro model statement template
+                logline.operands=self.presplit(pline)
+                if __debug__:
+                    if debug:
+                        print("%s logline.operands: %s" \
+                            % (cls_str,logline.operands))
+                return
             # Separate the individual operands from the operand field in all
             # physical input lines
             self.fsm.trace(on=debug)
@@ -1126,6 +1226,25 @@ class LineMgr(object):
     def InputPath(self):
         return self.LB.InputPath()
 
+    # Create the LOperand objects of a physical line whose operands were located
+    # by a macro model statement template.  The results are the same as those of
+    # the cfsm parser for the same line.
+    # Returns:
+    #   a list of LOperand objects or None for omitted operands
+    def presplit(self,pline):
+        opnd_col,opnds,comment_start=pline.presplit
+        operands=[]
+        for n,opnd in enumerate(opnds):
+            if opnd is None:
+                operands.append(None)
+                continue
+            text,ndx=opnd
+            lopnd=LOperand(text,pline.source,ndx,n+1)
+            lopnd.amp="&" in text
+            operands.append(lopnd)
+        pline.comment_start=comment_start
+        return operands
+
     # Initiate a new file source
     def newFile(self,fname,stmtno=None):
         self.LB.newFile(fname,stmtno=stmtno)
@@ -340,8 +340,16 @@ class AsmListing(Listing):
             errors+=1
         self.num_errors=errors
 
-    # This method acts as the interface with the super class.  
-    def create(self):
+    # This method acts as the interface with the super class.
+    # Method Arguments:
+    #   fo      An open file object to which the listing is written as it is created.
+    #           If None the listing is placed in the final Image object.  Defaults
+    #           to None.
+    #   buffer  When fo is provided, the number of listing lines collected before
+    #           they are written.  Defaults to 0, each line written when created.
+    # Exception:
+    #   OSError if the listing can not be written to fo.
+    def create(self,fo=None,buffer=0):
         # Get access to the assembler data needed for creating the listing
         self.stmts=self.asm.stmts     # Make available the Stmt objects
         self.ST=self.asm.ST           # Make available the Symbol Table
@@ -376,6 +384,11 @@ class AsmListing(Listing):
         self.create_title()           # Create the default title
         self.new_part()               # Setup for part 1 of the listing
 
+        if fo is not None:
+            # Write the listing as it is generated.  The Image object has none.
+            self.stream(fo,buffer=buffer)
+            return
+
         # Generate the listing
         listing=self.generate()
         # Add it to the file Image object
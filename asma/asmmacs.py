@@ -68,9 +68,14 @@
 this_module="%s.py" % __name__
 
 # Python imports:
+import copyreg                # Access the default pickle reduction functions
 import datetime               # Access UTC time
+import hashlib                # Access digest algorithms for the macro caches
+import os                     # Access the file system for the macro cache
 import os.path                # For file path manipulation
+import pickle                 # Save and restore library macro definitions
 import re                     # Access regular expressions
+import sys                    # Access the Python version
 
 # SATK imports:
 from satkutil import method_name       # Access the method names in method objects
@@ -533,7 +538,8 @@ class MacroEngine(object):
         self.syslist=False  # Whether to build &SYSLIST when invoked.
         self.done=False  # Set to True when Mend object added
 
-    # This method drives the resolution of operation's sequence symbol usage.
+    # This method drives the resolution of operation's sequence symbol usage and
+    # the compilation of each operation's expressions.
     def __resolve(self):
         for n in range(len(self.ops)):
             op=self.ops[n]
@@ -548,6 +554,7 @@ class MacroEngine(object):
                 dest.append(ndx)
             op.dest=dest
             op.post_resolve()
+            op.compile()
 
     # Add a macro operation to the engine.
     # Method arguments:
@@ -604,9 +611,10 @@ class MacroEngine(object):
         else:
             loc=next          # Already started it, pick up where we left off
 
+        ops=self.ops
         while True:
             # Fetch the operation
-            op=self.ops[loc]
+            op=ops[loc]
 
             # Execute it
             try:
@@ -713,14 +721,20 @@ class EngineState(object):
     # Actually set a GBLA/LCLA variable by updating its A_Val object
     def seta(self,symid,value):
         self.lcls.seta(symid,value)
+        if self.exp.steps is not None:
+            self.exp.record_set("A",symid,value.value())
 
     # Actually set a GBLB/LCLB variable by updating its B_Val object
     def setb(self,symid,value):
         self.lcls.setb(symid,value)
+        if self.exp.steps is not None:
+            self.exp.record_set("B",symid,value.value())
 
     # Actually set a GBLB/LCLB variable by updating its C_Val object
     def setc(self,symid,value):
         self.lcls.setc(symid,value)
+        if self.exp.steps is not None:
+            self.exp.record_set("C",symid,value.string())
 
 
 # The base class for all macro operations.  Helper methods for operations are also
@@ -762,6 +776,13 @@ class MacroOp(object):
     def post_resolve(self):
         pass
 
+    # Compiles the operation's expressions once the macro definition is complete.
+    # Each invocation of the macro evaluates the compiled expressions rather than
+    # reparsing their Pratt tokens.  For operations without expressions, this
+    # method does nothing.
+    def compile(self):
+        pass
+
   #
   # Macro Operation Execution Helper Methods
   #
@@ -833,6 +854,8 @@ class ACTR(MacroOp):
     def __init__(self,lineno,expr):
         super().__init__(lineno)
         self.expr=expr        # Computed ACTR arithmetic expression
+    def compile(self):
+        self.expr.compile()
     def operation(self,state,debug=False):
         value=self.evaluate_expr(state,self.expr,debug=debug,trace=False)
 
@@ -875,6 +898,9 @@ class AGOC(MacroOp):
         super().__init__(lineno,dest=dest)
         self.expr=expr        # Computed AGO arithmetic expression
 
+    def compile(self):
+        self.expr.compile()
+
     def operation(self,state,debug=False):
         #value=self.evaluate(state,self.expr,Macro.Arith,debug=debug,trace=False)
         value=self.evaluate_expr(state,self.expr,debug=debug,trace=False)
@@ -910,6 +936,9 @@ class AIF(MacroOp):
         super().__init__(lineno,dest=dest)
         self.expr=expr        # AIF logical expression
 
+    def compile(self):
+        self.expr.compile()
+
     def operation(self,state,debug=False):
         state.exp.mhelp_04()   # Dump variable symbols if requested
 
@@ -960,6 +989,8 @@ class GBLA(MacroOp):
         symid=self.symid.SymID(state,debug=debug)
         sym=state.exp.gbls.defa(symid)
         state.exp.lcls._add(sym)
+        if state.exp.steps is not None:
+            state.exp.steps.append(("G","A",symid.var,tuple(symid.indices)))
         return (self.next,None)
 
 
@@ -976,6 +1007,8 @@ class GBLB(MacroOp):
         symid=self.symid.SymID(state,debug=debug)
         sym=state.exp.gbls.defb(symid)
         state.exp.lcls._add(sym)
+        if state.exp.steps is not None:
+            state.exp.steps.append(("G","B",symid.var,tuple(symid.indices)))
         return (self.next,None)
 
 
@@ -992,6 +1025,8 @@ class GBLC(MacroOp):
         symid=self.symid.SymID(state,debug=debug)
         sym=state.exp.gbls.defc(symid)
         state.exp.lcls._add(sym)
+        if state.exp.steps is not None:
+            state.exp.steps.append(("G","C",symid.var,tuple(symid.indices)))
         return (self.next,None)
 
 
@@ -1091,6 +1126,15 @@ class SETx(MacroOp):
     def __init__(self,lineno):
         super().__init__(lineno)
 
+    # Compile the subscript and operand expressions of SETA and SETB.  SETC
+    # character expressions are not compiled.
+    def compile(self):
+        setsym=self.setsym
+        if setsym.hasSubscript():
+            setsym[0].compile()
+        for expr in self.expr:
+            expr.compile()
+
     # Shared process identifies symbol being set, and, for subscripted set symbols
     # drives the updating of successive symbols from each operand in the statement
     def process(self,state,debug=False):
@@ -1346,6 +1390,12 @@ class Invoker(object):
         self.name=None          # The macro name being invoked
         self.sysndx=""          # &SYSNDX string (from __init_lcls() method)
 
+        # Macro expansion reuse attributes.  See ExpansionCache class
+        self.key=None           # Identity of the expansion when reuse is enabled
+        self.steps=None         # Steps of the expansion being recorded or None
+        self.replay=None        # Steps of the expansion being reused or None
+        self.rpos=0             # Next step of the expansion being reused
+
         # MHELP related attributes.  See mhelp_init() method
         self._mhelp_sup=128
         self._mhelp_01=0        # Trace macro entry
@@ -1362,7 +1412,7 @@ class Invoker(object):
 
     # Intialize the macro's local variable symbols
     def __init_lcls(self):
-        l=Mac_Symbols(self.case,unique=True)
+        l=Mac_Symbols(self.case,unique=True,xcache=self.asm.XC)
 
         # Make system global variables available to local macro.  Each of these are
         # read only.
@@ -1481,7 +1531,8 @@ class Invoker(object):
         self.mhelp_init()                   # Initialize MHELP values
         self.mhelp_01()                     # Trace macro entry if requested
         self.mhelp_10()                     # Dump parameters if requested
-        self.state=self.engine.start(self)  # Start the macro engine
+        if self.replay is None:
+            self.state=self.engine.start(self)  # Start the macro engine
 
     # Creates a MacroError object from one supplied, adding macro specific
     # information to the error and reflecting the invoking statement as the error's
@@ -1502,14 +1553,24 @@ class Invoker(object):
     #     a string (the generated model statement) or
     #     None to indicate the macro expansion has terminated.
     def generate(self):
+        if self.replay is not None:
+            return self.__replay()
+
         state=self.state
+        prof=assembler.Stats.prof
         while True:
-            state=self.engine.run(state)
+            if prof is None:
+                state=self.engine.run(state)
+            else:
+                state=prof.call("macro",self.name,self.engine.run,state)
             if state.isDone():
                 break
             # Macro is not done, so just return the model statement
             self.state=state       # Save the macro engine state for the next call
 
+            if self.steps is not None:
+                self.record_lines(state.result)
+
             if __debug__:
                 if self.debug:
                     print("%s macro %s returning: %s" \
@@ -1518,10 +1579,77 @@ class Invoker(object):
             return state.result
 
         # Done, returning none
+        if self.steps is not None:
+            self.asm.XC.add(self.key,self.name,self.steps)
+            self.steps=None
         self.engine=None
         self.state=None
         return None
 
+    # Performs the next steps of a reused expansion.
+    # Returns:
+    #     a list of the next generated model statement lines or
+    #     None to indicate the macro expansion has terminated.
+    def __replay(self):
+        gbls=self.gbls
+        steps=self.replay
+        while self.rpos<len(steps):
+            step=steps[self.rpos]
+            self.rpos+=1
+            if step[0]=="L":
+                plines=[]
+                for line in step[1]:
+                    if isinstance(line,str):
+                        plines.append(line)
+                    else:
+                        content,presplit=line
+                        plines.append(asminput.ModelLine(content,presplit))
+                return plines
+
+            symid=macsyms.SymbolID(step[2],indices=list(step[3]))
+            typ=step[1]
+            if step[0]=="G":
+                if typ=="A":
+                    gbls.defa(symid)
+                elif typ=="B":
+                    gbls.defb(symid)
+                else:
+                    gbls.defc(symid)
+            else:
+                value=step[4]
+                if typ=="A":
+                    gbls.seta(symid,macsyms.A_Val(value))
+                elif typ=="B":
+                    gbls.setb(symid,macsyms.B_Val(value))
+                else:
+                    gbls.setc(symid,macsyms.C_Val(value))
+
+        # Done, the reused expansion is retained for the next assembly
+        self.asm.XC.add(self.key,self.name,steps)
+        self.replay=None
+        self.engine=None
+        return None
+
+    # Record the generated model statement lines of an expansion
+    def record_lines(self,plines):
+        lines=[]
+        for line in plines:
+            if isinstance(line,asminput.ModelLine):
+                lines.append((line.content,line.presplit))
+            else:
+                lines.append(line)
+        self.steps.append(("L",lines))
+
+    # Record the setting of a global variable symbol by an expansion.  Local variable
+    # symbols are not recorded.
+    # Method Arguments:
+    #   typ     The type of the variable symbol: "A", "B" or "C"
+    #   symid   The macsyms.SymbolID object of the variable symbol being set
+    #   value   The new value as a Python integer or string
+    def record_set(self,typ,symid,value):
+        if self.lcls._fetch(symid.var).gbl:
+            self.steps.append(("S",typ,symid.var,tuple(symid.indices),value))
+
     # Prepare to enter macro processing
     # This method is called by MacroLanguage.macstmt() method after the Invoker object
     # has been created.  Actual entry is via the entry() method called by the
@@ -1552,6 +1680,16 @@ class Invoker(object):
         # Ready to do macro expansion now with the MacroEngine with my state
         self.lineno=stmt.lineno        # Statement number of invoking statement
         self.name=self.macro.name      # Macro being invoked
+
+        # Reuse a previously recorded expansion or record this one.  Expansions
+        # are neither reused nor recorded while MHELP actions are enabled.
+        xc=self.asm.XC
+        if xc is not None and self.mgr.mhelp_sup and not xc.timed:
+            self.key=xc.key(self.sysndx)
+            self.replay=xc.find(self.key,self.name)
+            if self.replay is None:
+                self.steps=[]
+
         # This Invoker object is now ready to enter the macro.
         # Entry occurs in the asminput.MacroSource object when its init() method
         # is called by the asminput.LineBuffer managing all source statement input.
@@ -1641,6 +1779,10 @@ class MacroBuilder(object):
         # Switch to debug a macro definition.
         self.ddebug=False   # Set by define() method from MACRO assembler directive.
 
+        # When a list, the Macro objects added by addMacro() are also appended to
+        # it.  Used by the MACLIBProcessor to record the macros of a library file.
+        self.added=None
+
     # Add a defined macro to the operation management framework
     # Change state if triggered by an MEND directive
     def addMacro(self,mac,mend=False):
@@ -1649,6 +1791,8 @@ class MacroBuilder(object):
                 % (assembler.eloc(self,"addMacro",module=this_module),mac)
 
         self.asm.OMF.def_macro(mac,O=self.O_source)    # Add the macro the OMF
+        if self.added is not None:
+            self.added.append(mac)
         if mend:
             self.flush()
 
@@ -1774,6 +1918,340 @@ class MacroBuilder(object):
         self.state=0                 # Change state to relfect this
 
 
+#
+#  +------------------------------+
+#  |                              |
+#  |   Library Macro Definitions  |
+#  |                              |
+#  +------------------------------+
+#
+
+# The Macro objects defined from a macro library file are saved in a cache
+# directory.  When the same library file is used again, by this or a later
+# assembly, the saved objects are defined instead of processing the file's
+# statements.
+#
+# Macro objects refer to the assembler performing the definition and to the regular
+# expression match objects of the lexical tokens recognized in their statements.
+# Neither can be saved directly.  The assembler is replaced when the objects are
+# restored by the assembler using them.  Match objects are recreated from their
+# regular expression and the string being recognized.
+
+# Pickler of saved macro definitions
+#
+# Instance Arguments:
+#   fo    The binary file object to which the definitions are written
+#   asm   The assembler.Assembler object defining the macros
+class MacroPickler(pickle.Pickler):
+    dispatch_table=copyreg.dispatch_table.copy()
+
+    def __init__(self,fo,asm):
+        super().__init__(fo,protocol=pickle.HIGHEST_PROTOCOL)
+        self.asm=asm
+
+    # The assembler is saved by reference only
+    def persistent_id(self,obj):
+        if obj is self.asm:
+            return "asm"
+        return None
+
+    # Reduce a regular expression match object to the arguments that recreate it
+    @staticmethod
+    def reduce_match(mo):
+        return (MacroUnpickler.match,(mo.re,mo.string,mo.pos,mo.endpos,mo.span()))
+
+MacroPickler.dispatch_table[type(re.match("",""))]=MacroPickler.reduce_match
+
+
+# Unpickler of saved macro definitions
+#
+# Instance Arguments:
+#   fo    The binary file object from which the definitions are read
+#   asm   The assembler.Assembler object using the macros
+class MacroUnpickler(pickle.Unpickler):
+    def __init__(self,fo,asm):
+        super().__init__(fo)
+        self.asm=asm
+
+    # Recreate a regular expression match object.  The lexer may have used either
+    # match() or search().  Whichever reproduces the saved span is the original.
+    @staticmethod
+    def match(pattern,string,pos,endpos,span):
+        for method in [pattern.match,pattern.search,pattern.fullmatch]:
+            mo=method(string,pos,endpos)
+            if mo is not None and mo.span()==span:
+                return mo
+        raise pickle.UnpicklingError("could not recreate match of %s at %s" \
+            % (pattern.pattern,span))
+
+    def persistent_load(self,pid):
+        if pid=="asm":
+            return self.asm
+        raise pickle.UnpicklingError("unsupported persistent id: %s" % pid)
+
+
+# This class manages a directory of saved library macro definitions.  A saved file
+# is identified by the absolute path of the macro library file and the options
+# influencing how its statements are recognized.  It is valid only while the
+# library file is unchanged.  Its size and modification time are checked first.
+# When either differs, the contents are compared.
+#
+# Warning: saved files are Python pickles.  The cache directory must not be writable
+# by untrusted users.
+#
+# Instance Arguments:
+#   directory   The directory in which saved files reside.  It is created if it
+#               does not exist.
+#   asm         The assembler.Assembler object defining the macros
+#   debug       Specify True to print cache activity messages.
+class MacroCache(object):
+    version=4        # Saved file format version.  Increment on any change.
+    ext=".macc"      # Saved file extension
+
+    def __init__(self,directory,asm,debug=False):
+        self.directory=directory  # Directory containing saved files
+        self.asm=asm              # The assembler
+        self.debug=debug          # Print cache activity
+
+    # Return the file system path of the saved file for a macro library file.
+    # Operation synonyms in effect are part of the key because they influence
+    # the recognition of the file's MACRO, MEND, COPY and other directives.
+    def __cache_file(self,filepath):
+        asm=self.asm
+        key="%s|%s|%s|%s|%s|%s" % (MacroCache.version,sys.hexversion,filepath,\
+            asm.case,asm.seq,self.__opsyn_key())
+        name=hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory,"%s%s" % (name,MacroCache.ext))
+
+    # Return a string identifying the current operation synonym table entries.
+    # An empty string is returned when no synonyms exist.
+    def __opsyn_key(self):
+        opsyn=self.asm.OMF.opsyn
+        if len(opsyn)==0:
+            return ""
+        entries=[]
+        for syn in sorted(opsyn.keys()):
+            op=opsyn[syn]
+            if op is None:
+                entries.append("%s=" % syn)
+            else:
+                entries.append("%s=%s:%s" % (syn,op.oper,op.O))
+        return hashlib.sha1(",".join(entries).encode("utf-8")).hexdigest()
+
+    # Return the digest of a file's contents or None if the file can not be read
+    @staticmethod
+    def digest(filepath):
+        try:
+            with open(filepath,"rb") as fo:
+                return hashlib.sha1(fo.read()).hexdigest()
+        except OSError:
+            return None
+
+    # Return the size and modification time of a file or None if not available
+    @staticmethod
+    def stat(filepath):
+        try:
+            st=os.stat(filepath)
+        except OSError:
+            return None
+        return (st.st_size,st.st_mtime_ns)
+
+    # Returns the list of Macro objects previously saved for a macro library file
+    # or None if not available or not valid for the file.
+    # Method Argument:
+    #   filepath   The path of the macro library file
+    def load(self,filepath):
+        filepath=os.path.abspath(filepath)
+        cfile=self.__cache_file(filepath)
+        try:
+            with open(cfile,"rb") as fo:
+                saved=MacroUnpickler(fo,self.asm).load()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            if self.debug:
+                print("%s - MacroCache.load() - ignoring unreadable saved file "
+                    "%s: %s" % (this_module,cfile,e))
+            return None
+
+        try:
+            if saved["version"]!=MacroCache.version:
+                return None
+            stat=saved["stat"]
+            digest=saved["digest"]
+            macros=saved["macros"]
+        except (TypeError,KeyError):
+            return None
+
+        if MacroCache.stat(filepath)!=stat \
+           and MacroCache.digest(filepath)!=digest:
+            if self.debug:
+                print("%s - MacroCache.load() - macro library file changed: %s" \
+                    % (this_module,filepath))
+            return None
+
+        if self.debug:
+            print("%s - MacroCache.load() - using saved file %s for %s" \
+                % (this_module,cfile,filepath))
+        return macros
+
+    # Saves the Macro objects defined by a macro library file.  The objects must
+    # not yet have been invoked.
+    # Returns True if the saved file was written, False otherwise.
+    # Method Arguments:
+    #   filepath   The path of the macro library file
+    #   macros     The list of Macro objects defined from the file
+    def save(self,filepath,macros):
+        filepath=os.path.abspath(filepath)
+        stat=MacroCache.stat(filepath)
+        digest=MacroCache.digest(filepath)
+        if stat is None or digest is None:
+            return False
+
+        saved={"version":MacroCache.version,
+               "stat":stat,
+               "digest":digest,
+               "macros":macros}
+        cfile=self.__cache_file(filepath)
+        # The cross-reference of the assembly defining the macros is not saved.
+        # It is attached again when the restored macros are defined.
+        xrefs=[mac._xref for mac in macros]
+        # Write a temporary file and rename it so that concurrent assemblies
+        # never see a partially written saved file.
+        tfile="%s.%s" % (cfile,os.getpid())
+        try:
+            for mac in macros:
+                mac._xref=None
+            os.makedirs(self.directory,exist_ok=True)
+            with open(tfile,"wb") as fo:
+                MacroPickler(fo,self.asm).dump(saved)
+            os.replace(tfile,cfile)
+        except (OSError,pickle.PicklingError,TypeError,AttributeError) as e:
+            if self.debug:
+                print("%s - MacroCache.save() - could not write saved file %s: %s" \
+                    % (this_module,cfile,e))
+            try:
+                os.remove(tfile)
+            except OSError:
+                pass
+            return False
+        finally:
+            for mac,xref in zip(macros,xrefs):
+                mac._xref=xref
+
+        if self.debug:
+            print("%s - MacroCache.save() - saved file written: %s" \
+                % (this_module,cfile))
+        return True
+
+
+#
+#  +---------------------------+
+#  |                           |
+#  |   Macro Expansion Reuse   |
+#  |                           |
+#  +---------------------------+
+#
+
+# The macro expansions of an assembly are recorded so that a later assembly of the
+# same source with the same options may reuse them without running the macro
+# engine.  An expansion is identified by a digest of all of the input read by the
+# assembly before the macro was invoked and by the invocation's &SYSNDX value.
+# Everything influencing an expansion, the open code statements, COPY members,
+# macro library definitions and the values of global variable symbols, is
+# established by that input.  So an expansion with the same identity generates the
+# same statements and global variable symbol values.  When a source is edited,
+# expansions preceding the first changed line are reused.  Expansions following it
+# are performed again.
+#
+# An expansion is recorded as a list of steps in the order performed:
+#   ("G",type,name,indices)        a global variable symbol is declared,
+#   ("S",type,name,indices,value)  a global variable symbol is set, or
+#   ("L",lines)                    model statement lines are generated.
+# Local variable symbols are not recorded.  They do not outlive the expansion.
+# Expansions ended by an error are not recorded.  Nor are expansions performed
+# while MHELP actions are enabled.
+#
+# The values of the &SYSCLOCK, &SYSDATC, &SYSDATE and &SYSTIME system variable
+# symbols depend upon when the assembly occurs rather than upon its input.  Once an
+# expansion references one of them, the value may reach any later expansion through
+# global variable symbols or generated statements.  So, from that reference
+# onward, expansions are neither reused nor recorded, and the assembly's complete
+# results are not saved for reuse.  Expansions completed before the reference are
+# unaffected.  The remaining system variable symbols are established by the input,
+# the options or the source file name, all of which identify the saved results.
+#
+# Instance Argument:
+#   saved   A dictionary of the expansions recorded by a previous assembly or None
+class ExpansionCache(object):
+    # System variable symbols whose values depend upon when the assembly occurs
+    volatile=frozenset(["&SYSCLOCK","&SYSDATC","&SYSDATE","&SYSTIME"])
+
+    def __init__(self,saved=None):
+        self.digest=hashlib.sha1()  # Digest of the input read so far
+        if saved is None:
+            saved={}
+        self.saved=saved            # Expansions of a previous assembly by identity
+        self.expansions={}          # Expansions of this assembly by identity
+        self.reused=0               # Number of expansions reused
+        # Set to True when a volatile system variable symbol is referenced
+        self.timed=False
+
+    # Record a completed expansion
+    # Method Arguments:
+    #   key    The expansion's identity returned by the key() method
+    #   name   The name of the macro
+    #   steps  The list of the expansion's steps
+    def add(self,key,name,steps):
+        if not self.timed:
+            self.expansions[key]=(name,steps)
+
+    # Returns the steps of a previously recorded expansion or None if not available
+    # Method Arguments:
+    #   key    The expansion's identity returned by the key() method
+    #   name   The name of the macro being invoked
+    def find(self,key,name):
+        if self.timed:
+            return None
+        try:
+            mac,steps=self.saved[key]
+        except KeyError:
+            return None
+        if mac!=name:
+            return None
+        self.reused+=1
+        prof=assembler.Stats.prof
+        if prof is not None:
+            prof.count("macro expansions reused")
+        return steps
+
+    # Returns the identity of a macro expansion
+    # Method Argument:
+    #   sysndx   The &SYSNDX value of the invocation as a string
+    def key(self,sysndx):
+        return (self.digest.hexdigest(),sysndx)
+
+    # Include a line read from a source or COPY file in the input digest
+    def line(self,text):
+        self.digest.update(("L%s\n" % text).encode("utf-8","surrogatepass"))
+
+    # Include the opening of a file in the input digest.
+    # Method Arguments:
+    #   env    The search path environment variable, ASMPATH or MACLIB
+    #   name   The file name as referenced
+    #   sfile  The asminput.SourceFile object of the file or None if not found
+    def opened(self,env,name,sfile):
+        if sfile is None:
+            item="F%s|%s|\n" % (env,name)
+        elif env=="MACLIB":
+            # A macro library file is used in its entirety when opened
+            item="F%s|%s|%s|%s\n" % (env,name,sfile.fname,sfile.digest())
+        else:
+            # The lines of source and COPY files are included as they are read
+            item="F%s|%s|%s\n" % (env,name,sfile.fname)
+        self.digest.update(item.encode("utf-8","surrogatepass"))
+
+
 class MacroLanguage(object):
     def __init__(self,asm):
         self.asm=asm           # The assembler
@@ -2081,11 +2559,13 @@ class MacroLanguage(object):
 #   case      Enables case sensitivity for macro symbols if True.  Defaults to False
 # Note: This class is heavily dependent upon module macsyms.
 class Mac_Symbols(object):
-    def __init__(self,case,unique=False,gbl=False):
+    def __init__(self,case,unique=False,gbl=False,xcache=None):
         self.syms={}        # Dictionary of variable symbols
         self.unique=unique  # Only new unique symbols may be defined
         self.gbl=gbl        # Sets a symbol's gbl attribute
         self.case=case      # Enables case sensitivity for macro symbols
+        # ExpansionCache object notified of volatile system variable references
+        self.xcache=xcache
 
     # Defines a symbol variable
     # Method Arguments:
@@ -2239,6 +2719,9 @@ class Mac_Symbols(object):
             # Implicit definition requested
             mac_sym=implicit(symbol)   # Create the required Mac_Sym subclass
 
+        if self.xcache is not None and symbol.var in ExpansionCache.volatile:
+            self.xcache.timed=True
+
         # Check for read-only symbol if it is being referenced for an update by SETx
         if updating and mac_sym.ro:
             raise MacroError(invoke=True,\
@@ -2274,6 +2757,9 @@ class Mac_Symbols(object):
              # than generating an error via an exception.
             return None
 
+        if self.xcache is not None and symbol.var in ExpansionCache.volatile:
+            self.xcache.timed=True
+
         try:
             return mac_sym.getValue(symbol)
         except macsyms.SymbolError as se:
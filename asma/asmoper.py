@@ -111,8 +111,14 @@ class MSLentry(object):
 #   machine The MSL cpu definition being requested from the MSL file
 #   msl     The MSL filename requested
 #   mslpath PathMgr object of the MSL database
+#   mslcache Directory of compiled MSL CPU definitions or None.  When None the
+#           MSL database is always built from its source files.
 #   debug   Specify True to enable debugging of the file access operations
 class OperMgr(asmbase.ASMOperTable):
+    # Expanded CPU definitions prepared by the prepare() method.  The key is a
+    # tuple of the CPU, the MSL file name and the MSL search path directories.
+    prepared={}
+
     # XMODE values accepted
     ccw_xmode={"0":"CCW0",0:"CCW0","1":"CCW1",1:"CCW1","none":None,"NONE":None}
     psw_xmode={"S":"PSWS","PSWS":"PSWS",
@@ -128,7 +134,7 @@ class OperMgr(asmbase.ASMOperTable):
                "ZS":"PSWZS","PSWZS":"PSWZS",
                "none":None,"NONE":None}
 
-    def __init__(self,asm,machine,msl,mslpath,debug=False):
+    def __init__(self,asm,machine,msl,mslpath,mslcache=None,debug=False):
         super().__init__()
         self.asm=asm         # The Assembler object
         # Legacy AsmPasses objects for assembler directives
@@ -138,7 +144,9 @@ class OperMgr(asmbase.ASMOperTable):
         self.addrsize=None   # Maximum address size supported by the CPU
         self.ccw=None        # Expected CCw format used by the CPU
         self.psw=None        # Expected PSW format used by the CP
-        self.cache=self.__getMachine(machine,msl,mslpath=mslpath,debug=debug)
+        self.mslfiles=[]     # MSL files from which the CPU definition was built
+        self.cache=self.__getMachine(machine,msl,mslpath=mslpath,\
+            mslcache=mslcache,debug=debug)
 
         # Manage Directive Statements
         self.def_adirs()     # Define Assembler directives
@@ -158,16 +166,55 @@ class OperMgr(asmbase.ASMOperTable):
 
     # Create the MSL cache and supplies maximum address size for listing
     # Method arguments are passed from the instance arguments.
-    def __getMachine(self,machine,mslfile,mslpath,debug=False):
-        mslproc=msldb.MSL(default=None,pathmgr=mslpath,debug=debug)
-        mslproc.build(mslfile,fail=True)
-        cpux=mslproc.expand(machine)  # Return the expanded version of cpu
+    def __getMachine(self,machine,mslfile,mslpath,mslcache=None,debug=False):
+        cpux,self.mslfiles=OperMgr.cpu(machine,mslfile,mslpath,\
+            mslcache=mslcache,debug=debug)
         self.addrsize=cpux.addrmax    # Set the maximum address size for CPU
         self.ccw=cpux.ccw             # Set the expected CCW format of the CPU
         self.psw=cpux.psw             # Set the expected PSW format of the CPU
         cache=MSLcache(cpux)          # Create the cache handler
         return cache
 
+    # Returns a tuple of the expanded CPU definition (msldb.CPUX object) and the
+    # list of MSL files from which it was built.  A CPU definition previously
+    # prepared by the prepare() method is returned if available.
+    #
+    # When a compiled MSL directory is supplied, a previously compiled expanded
+    # CPU is used if none of its MSL files have changed.  Otherwise the MSL
+    # database is built and the expanded CPU is compiled for the next assembly.
+    @staticmethod
+    def cpu(machine,mslfile,mslpath,mslcache=None,debug=False):
+        mslproc=msldb.MSL(default=None,pathmgr=mslpath,debug=debug)
+        key=(machine,mslfile,tuple(msldb.CPUXcache.dirs(mslproc)))
+        try:
+            return OperMgr.prepared[key]
+        except KeyError:
+            pass
+        cpux=None
+        if mslcache is not None:
+            compiled=msldb.CPUXcache(mslcache,debug=debug)
+            cpux=compiled.load(mslproc,mslfile,machine)
+            files=compiled.files
+        if cpux is None:
+            mslproc.build(mslfile,fail=True)
+            cpux=mslproc.expand(machine)  # Return the expanded version of cpu
+            files=mslproc.files
+            if mslcache is not None:
+                compiled.save(mslproc,mslfile,machine,cpux)
+        return (cpux,files)
+
+    # Prepare an expanded CPU definition for use by all subsequently created
+    # OperMgr objects in this process and processes forked from it.  Used by
+    # drivers performing multiple assemblies.  Arguments are the same as those
+    # of the cpu() method.
+    @staticmethod
+    def prepare(machine,mslfile,mslpath,mslcache=None,debug=False):
+        mslproc=msldb.MSL(default=None,pathmgr=mslpath,debug=debug)
+        key=(machine,mslfile,tuple(msldb.CPUXcache.dirs(mslproc)))
+        if key not in OperMgr.prepared:
+            OperMgr.prepared[key]=OperMgr.cpu(machine,mslfile,mslpath,\
+                mslcache=mslcache,debug=debug)
+
     # Set XMODE.  Setting is validated against the above class attributes as supplied
     # by the caller.
     def __xmode_setting(self,mode,setting,sdict):
@@ -344,7 +391,11 @@ class OperMgr(asmbase.ASMOperTable):
         try:
             # Run the MACLIBProcessor to define the macro
             #print("ENTERING MACRO PROCESSOR")
-            r=asm.MP.run(asm,macname)
+            prof=assembler.Stats.prof
+            if prof is None:
+                r=asm.MP.run(asm,macname)
+            else:
+                r=prof.call("maclib",macname,asm.MP.run,asm,macname)
             #print("RETURNED FROM MACRO PROCESSOR: class: %s" \
             #    % r.__class__.__name__)
 
@@ -288,6 +288,13 @@ class OperandParser(asmbase.AsmFSMParser):
         # Parse the literal
         lit.parse(debug=debug)
 
+        # The literal may be written differently than a literal of the current pool
+        # with the same constant.
+        try:
+            return mgr.share(lit,stmt.lineno,debug=debug)
+        except KeyError:
+            pass
+
         # Complete "Pass0" processing
         lit.Pass0(debug=debug)
 
@@ -0,0 +1,255 @@
+#!/usr/bin/python3
+# This file is part of SATK.
+#
+#     SATK is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     SATK is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with SATK.  If not, see <http://www.gnu.org/licenses/>.
+
+# This module provides the optional assembly profiler.  While the assembler.AsmStats
+# timers measure each pass, the profiler measures the work performed within the
+# passes.  Work is measured by category and name:
+#
+#   Category    Name                     Measured work
+#   create      statement class          creation of the statement object
+#   pass0       statement class          the statement's Pass0() method
+#   pass1       statement class          the statement's Pass1() method
+#   pass2       statement class          the statement's Pass2() method
+#   macro       macro name               generation of statements by the macro
+#   maclib      macro name               definition of a macro library macro
+#   parser      parser.method            ParserMgr parser methods
+#   lexer       lexer.method             ParserMgr lexer methods
+#   ASMPATH     file name                reading of the source and COPY files
+#   MACLIB      file name                reading of macro library files
+#
+# Events without a duration, for example the reading of a source file from the file
+# system rather than from the asminput.SourceCache, are counted by name.
+#
+# Each measurement records the number of calls, the total time and the self time.
+# Total time includes the time of all measurements made while it was active.  Self
+# time excludes them.  For example, the total time of a DC statement's Pass1()
+# method includes its use of the 'dcds' parser.  The self time does not.  Self
+# times of all measurements may be added together.  Total times may not.
+#
+# The profiler is enabled by the asma.py --profile option.  A report is displayed at
+# the end of the assembly and all measurements are written to a JSON file.
+
+this_module="asmprof.py"
+
+# Python imports:
+import json           # Write the measurements
+import time           # Access the high resolution timer
+# ASMA imports:
+import assembler      # Access the eloc() function
+
+
+# The measurements of a single category and name
+#
+# Instance Arguments:
+#   category   The category of the measured work
+#   name       The name of the measured work within the category
+class ProfEntry(object):
+    def __init__(self,category,name):
+        self.category=category
+        self.name=name
+        self.calls=0        # Number of calls
+        self.total=0.0      # Time including nested measurements
+        self.child=0.0      # Time of nested measurements
+        self.active=0       # Number of calls in progress (for recursion)
+
+    # Returns the time excluding nested measurements
+    def self_time(self):
+        return self.total-self.child
+
+    # Returns a dictionary of the measurements for JSON output
+    def to_dict(self):
+        return {"category":self.category,
+                "name":self.name,
+                "calls":self.calls,
+                "total":self.total,
+                "self":self.self_time()}
+
+
+# This class accumulates and reports all measurements of the assembly.
+class Profiler(object):
+    # Report section titles by category in their report sequence
+    sections=[("create", "Statement creation by class"),
+              ("pass0",  "Statement Pass 0 by class"),
+              ("pass1",  "Statement Pass 1 by class"),
+              ("pass2",  "Statement Pass 2 by class"),
+              ("macro",  "Macro statement generation by macro"),
+              ("maclib", "Macro library definition by macro"),
+              ("parser", "Parsers by method"),
+              ("lexer",  "Lexers by method"),
+              ("ASMPATH","Source and COPY file input by file"),
+              ("MACLIB", "Macro library file input by file")]
+    # Report sort keys
+    sorts={"self":  lambda e: (-e.self_time(),e.name),
+           "total": lambda e: (-e.total,e.name),
+           "calls": lambda e: (-e.calls,e.name),
+           "name":  lambda e: e.name}
+
+    def __init__(self):
+        self.entries={}     # Dictionary of ProfEntry objects by (category,name)
+        self.counters={}    # Dictionary of event counts by name
+        self.stack=[]       # ProfEntry objects of the active measurements
+        self.begin=time.perf_counter()  # When profiling started
+
+    # Returns the ProfEntry object of a category and name, creating it if needed
+    def __entry(self,category,name):
+        key=(category,name)
+        try:
+            return self.entries[key]
+        except KeyError:
+            entry=self.entries[key]=ProfEntry(category,name)
+            return entry
+
+    # Measure a call of a method or function
+    # Method Arguments:
+    #   category   The category of the measured work
+    #   name       The name of the measured work within the category
+    #   method     The method or function performing the work
+    #   args/kwds  The arguments of the method or function
+    # Returns:
+    #   the value returned by the method or function.  Exceptions raised by it
+    #   are passed to the caller.
+    def call(self,category,name,method,*args,**kwds):
+        entry=self.__entry(category,name)
+        stack=self.stack
+        stack.append(entry)
+        entry.active+=1
+        start=time.perf_counter()
+        try:
+            return method(*args,**kwds)
+        finally:
+            elapsed=time.perf_counter()-start
+            stack.pop()
+            entry.active-=1
+            entry.calls+=1
+            # A recursive call is already included in the outer call's time
+            if entry.active==0:
+                entry.total+=elapsed
+            else:
+                entry.child-=elapsed
+            if len(stack)!=0:
+                stack[-1].child+=elapsed
+
+    # Count an event
+    # Method Arguments:
+    #   name   The name of the counted event
+    #   n      The number of events.  Defaults to 1.
+    def count(self,name,n=1):
+        try:
+            self.counters[name]+=n
+        except KeyError:
+            self.counters[name]=n
+
+    # Measure each call of selected methods of an object.  The object's instance
+    # attributes replace the methods.  The object's class is not changed.
+    # Method Arguments:
+    #   obj        The object whose methods are measured
+    #   category   The category of the measured work
+    #   name       The name of the object.  The method name is added to it.
+    #   methods    A list of the names of the methods being measured.
+    def instrument(self,obj,category,name,methods):
+        for mname in methods:
+            method=getattr(obj,mname)
+            ename="%s.%s" % (name,mname)
+            setattr(obj,mname,self.wrapper(category,ename,method))
+
+    # Measure every lexer method of a lexer that recognizes a string
+    def lexer(self,name,lexer):
+        methods=[m for m in ["analyze","recognize","recognize_types","tokenize"]\
+            if callable(getattr(lexer,m,None))]
+        self.instrument(lexer,"lexer",name,methods)
+
+    # Measure every public method of a parser whose name starts with 'parse'
+    def parser(self,name,parser):
+        methods=[m for m in dir(parser) \
+            if m.startswith("parse") and callable(getattr(parser,m))]
+        self.instrument(parser,"parser",name,methods)
+
+    # Measure the parsers and lexers of a parsers.ParserMgr object.  Those
+    # already constructed are measured now.  The ParserMgr object measures those
+    # it constructs later using the lexer() and parser() methods.
+    def parsers(self,pm):
+        for name,parser in pm.parsers.items():
+            self.parser(name,parser)
+        for name,lexer in pm.lexers.items():
+            self.lexer(name,lexer)
+        pm.prof=self
+
+    # Returns the report as a string
+    # Method Argument:
+    #   sort   The order of each section's entries: 'self', 'total', 'calls' or
+    #          'name'.  Defaults to 'self'.
+    def report(self,sort="self"):
+        try:
+            key=Profiler.sorts[sort]
+        except KeyError:
+            raise ValueError("%s unrecognized sort: %s" \
+                % (assembler.eloc(self,"report",module=this_module),sort)) from None
+
+        elapsed=time.perf_counter()-self.begin
+        string="\nProfile (sorted by %s)  profiled seconds: %.6f" % (sort,elapsed)
+        for category,title in Profiler.sections:
+            entries=[e for e in self.entries.values() if e.category==category]
+            if len(entries)==0:
+                continue
+            entries.sort(key=key)
+            calls=sum(e.calls for e in entries)
+            total=sum(e.self_time() for e in entries)
+            string="%s\n\n%s - calls: %s  self seconds: %.6f" \
+                % (string,title,calls,total)
+            string="%s\n      calls  total sec   self sec   self %%  avg msec  name" \
+                % string
+            for e in entries:
+                self_time=e.self_time()
+                if elapsed:
+                    pc=(self_time/elapsed)*100
+                else:
+                    pc=0.0
+                avg=(e.total/e.calls)*1000 if e.calls else 0.0
+                string="%s\n %10d %10.6f %10.6f %8.4f %9.4f  %s" \
+                    % (string,e.calls,e.total,self_time,pc,avg,e.name)
+        if len(self.counters)!=0:
+            string="%s\n\nEvents\n      count  name" % string
+            for name in sorted(self.counters.keys()):
+                string="%s\n %10d  %s" % (string,self.counters[name],name)
+        return string
+
+    # Returns a function measuring each call of a method
+    def wrapper(self,category,name,method):
+        call=self.call
+        def measured(*args,**kwds):
+            return call(category,name,method,*args,**kwds)
+        return measured
+
+    # Write all measurements to a JSON file
+    # Method Arguments:
+    #   filepath   The path of the JSON file being written
+    #   summary    A dictionary from assembler.AsmStats.summary() included with the
+    #              measurements or None.  Defaults to None.
+    # Exception:
+    #   OSError if the file can not be written
+    def write(self,filepath,summary=None):
+        entries=sorted(self.entries.values(),key=lambda e: (e.category,e.name))
+        data={"profiled":time.perf_counter()-self.begin,
+              "stats":summary,
+              "counters":self.counters,
+              "entries":[e.to_dict() for e in entries]}
+        with open(filepath,"wt") as fo:
+            json.dump(data,fo,indent=1)
+            fo.write("\n")
+
+
+if __name__ == "__main__":
+    raise NotImplementedError("%s - intended for import use only" % this_module)
@@ -146,6 +146,17 @@ class Structure(object):
 # The type is derived very early in a statement's processing when the physical line
 # is read, even before the logical line is constructed.
 class ASMStmt(object):
+    # Every statement is retained for the entire assembly.  Its attributes are
+    # slots to reduce the size of each statement, so every subclass declares the
+    # slots of the attributes it adds, if any.  The statement processing controls
+    # below are read from the class.  The syslist attribute is set by the macopnd
+    # module while parsing a macro directive's or model statement's operands.
+    __slots__=("lineno","logline","ignore","genlvl","source","label_fld",\
+               "oper_fld","amp","amp_list","norep","optn","instu","asmdir",\
+               "macdir","T","trace","error","opnd_fld","operands","location",\
+               "P0_operands","bin_oprs","content","p1_loc","p2_loc","prdir",\
+               "plist","pon","pgen","pdata","gened","laddr","aes","syslist")
+
     # Statement processing controls are class attributes that aid in processing
     # the statement(s) supported by the class.  These attributes are referenced
     # by various modules that participate in the process.  They have no meaning
@@ -267,13 +278,9 @@ class ASMStmt(object):
         self.asmdir=False          # Subclass must set this if an assembler directive
         self.macdir=False          # Subclass must set this if a macro directive
 
-        # Statement processing controls
-        cls=self.__class__         # Processing controls are class attributes
-        self.spaces=cls.spaces     # Set whether spaces can be in operands
-        self.comma=cls.comma       # Set whether only comma forces an operand
-        self.sep=cls.sep           # Whether operands parsed into LOperand objects
-        self.alt=cls.alt           # Set whether alternate statement format supported
-        self.T=cls.typ             # Operation type - some values used for T'attribute
+        # Statement processing controls, spaces, comma, sep and alt, are class
+        # attributes
+        self.T=self.__class__.typ  # Operation type - some values used for T'attribute
 
         # General state flags.  Once either is set True future processing is inhibited
         # Master processing switch.  All passes check ignore to determine if the
@@ -872,6 +879,15 @@ class ASMStmt(object):
         # Return the trace setting
         return trace
 
+    # Release the parser intermediates once the statement's binary content is
+    # complete following Pass 2.  Only the attributes used by the listing and the
+    # binary output generators are retained.  Subclasses with their own
+    # intermediates extend this method.
+    def release(self):
+        self.label_fld=self.oper_fld=self.opnd_fld=None
+        self.operands=self.P0_operands=self.bin_oprs=self.amp_list=None
+        self.logline.release()
+
     # Returns a case sensitive or insensitive sequence symbol
     # Method Argument:
     #   case   Specify True for case sensitive handling.  Otherwise the sequence
@@ -1002,6 +1018,7 @@ class ASMStmt(object):
 
 # Statements processing macro parameters in a prototype or invoked macro
 class ParmStmt(ASMStmt):
+    __slots__=()
     def __init__(self,lineno,logline=None):
         super().__init__(lineno,logline=logline)
 
@@ -1036,6 +1053,7 @@ class ParmStmt(ASMStmt):
 
 # SETA, SETB and SETC macro directive super class
 class SETx(ASMStmt):
+    __slots__=()
     def __init__(self,lineno,logline=None):
         super().__init__(lineno,logline=logline)
         self.macdir=True    # All subclasses are macro directives
@@ -1094,6 +1112,7 @@ class SETx(ASMStmt):
 
 # POP and PUSH assembler directive super class
 class StackingStmt(ASMStmt):
+    __slots__=()
     def __init__(self,lineno,logline=None):
         super().__init__(lineno,logline=logline)
         self.asmdir=True     # All subclasses are assembler directives
@@ -1126,6 +1145,7 @@ class StackingStmt(ASMStmt):
 
 # GBLA, GBLB, GBLC, LCLA, LCLB, LCLC macro directive super class
 class SymbolDefine(ASMStmt):
+    __slots__=()
     def __init__(self,lineno,logline=None):
         super().__init__(lineno,logline=logline)
         self.macdir=True     # All subclasses are macro directives
@@ -1185,6 +1205,7 @@ class SymbolDefine(ASMStmt):
 # CCW, CCW0, CCW1, ORG, PSWS, PSW360, PSW67, PSWBC, PSWEC, PSW380, PSWXA, PSWE370,
 # PSWE390, PSWZ. SPACE assembler directive super class.
 class TemplateStmt(ASMStmt):
+    __slots__=("minimum",)
     def __init__(self,lineno,logline=None,minimum=None):
         super().__init__(lineno,logline=logline)
         self.asmdir=True       # All subclasses area assembler directives
@@ -1243,6 +1264,7 @@ class TemplateStmt(ASMStmt):
 
 # Statement class used for all logical lines that constitute comments
 class StmtComment(ASMStmt):
+    __slots__=("comment","quite","empty")
     typ="*"        # Statement type identifier
     lfld=""        # Valid label field content
     ofld=""        # Valid operation field content
@@ -1270,6 +1292,7 @@ class StmtComment(ASMStmt):
 
 # Statement class used for all logical lines in error
 class StmtError(ASMStmt):
+    __slots__=()
     typ="?"        # Statement type identifier
     lfld=""        # Valid label field content
     ofld=""        # Valid operation field content
@@ -1302,6 +1325,7 @@ class StmtError(ASMStmt):
 
 # Statement class used for all machine instructions
 class MachineStmt(ASMStmt):
+    __slots__=("insn","format")
     # Statement processing controls
     typ="I"        # Statement type identifier
     lfld="L"       # Valid label field content
@@ -1428,6 +1452,7 @@ class MachineStmt(ASMStmt):
 
 # Macro Prototype Statement - Oper Type: MP
 class MacroProto(ParmStmt):
+    __slots__=()
     # Statement processing controls
     typ="MP"       # Statement type identifier
     lfld="B"       # Valid label field content
@@ -1511,6 +1536,7 @@ class MacroProto(ParmStmt):
 
 # Statement class used for each invoked macro
 class MacroStmt(ParmStmt):
+    __slots__=("macro","label","keywords","pos")
     # Statement processing controls
     typ="M"        # Statement type identifier
     lfld="L"       # Valid label field content
@@ -1592,6 +1618,7 @@ class MacroStmt(ParmStmt):
 
 # Generic model statement
 class ModelStmt(ASMStmt):
+    __slots__=("model","mdebug")
     # Statement processing controls
     typ="MG"       # Statement type identifier
     lfld="MLSQ"    # Valid label field content
@@ -1660,6 +1687,7 @@ class ModelStmt(ASMStmt):
 
 # ACTR Macro Directive - Oper Type: MO
 class ACTR(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -1715,6 +1743,7 @@ class ACTR(ASMStmt):
 # [.seqsym] AGO  [(arithmetic-expression)].seqsym[,seqsym...]
 
 class AGO(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -1824,6 +1853,7 @@ class AGO(ASMStmt):
 # [.seqsym] AIF   (<binary-expression>).seqsym
 
 class AIF(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -1891,6 +1921,7 @@ class AIF(ASMStmt):
 # [CSECT] AMODE 24|31|64|ANY|ANY31|ANY64
 
 class AMODE(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -1920,6 +1951,7 @@ class AMODE(ASMStmt):
 # [.seqsym] ANOP  [comments]
 
 class ANOP(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -1953,6 +1985,7 @@ class ANOP(ASMStmt):
 # [label] ATRACEOFF oper[,oper]...
 
 class ATRACEOFF(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -2018,6 +2051,7 @@ class ATRACEOFF(ASMStmt):
 # [label] ATRACEON oper[,oper]...
 
 class ATRACEON(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -2076,6 +2110,7 @@ class ATRACEON(ASMStmt):
 # [label] CCW0    command,address,flags,count
 
 class CCW0(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -2166,6 +2201,7 @@ class CCW0(TemplateStmt):
 # [label] CCW1    command,address,flags,count
 
 class CCW1(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -2250,6 +2286,7 @@ class CCW1(TemplateStmt):
 # [label] CNOP   byte,boundary
 
 class CNOP(TemplateStmt):
+    __slots__=("new_symbol","nops")
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -2379,6 +2416,7 @@ class CNOP(TemplateStmt):
 # [label] COPY  'path/filename'
 
 class COPY(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -2425,6 +2463,7 @@ class COPY(ASMStmt):
 #
 # [label] CSECT   # no operands
 class CSECT(ASMStmt):
+    __slots__=("csect","for_pass2")
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -2501,6 +2540,7 @@ class CSECT(ASMStmt):
 # [label] DC   desc'values',...
 
 class DC(ASMStmt):
+    __slots__=("dc","gscope","dcds_opnds","values")
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -2524,6 +2564,12 @@ class DC(ASMStmt):
         # Pass 1
         self.values=[]           # Nominal or DCDS_Operand objects
 
+    # Release the constant's operands following Pass 2.  The binary content of the
+    # constant remains in the Area object.
+    def release(self):
+        super().release()
+        self.gscope=self.dcds_opnds=self.values=None
+
     # This method builds the binary Area object that holds the nominal values of
     # the constant operands.  It is shared with the LiteralStmt object
     # Method Arguments:
@@ -2708,6 +2754,7 @@ class DC(ASMStmt):
 # [label] DROP   reg (1-16 operands allowed)
 
 class DROP(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -2759,7 +2806,7 @@ class DROP(TemplateStmt):
                 print("%s bases being dropped for registers: %s" % (cls_str,regs))
 
         for r in regs:
-            asm.bases.drop(r,trace=dtrace)
+            asm.bases.drop(r,trace=dtrace,line=self.lineno)
 
         if __debug__:
             if dtrace:
@@ -2773,6 +2820,7 @@ class DROP(TemplateStmt):
 # [label] DS   desc'values',...
 
 class DS(DC):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -2810,6 +2858,7 @@ class DS(DC):
 # label DSECT   # no operands
 
 class DSECT(ASMStmt):
+    __slots__=("dsect",)
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -2860,6 +2909,7 @@ class DSECT(ASMStmt):
 # [label] EJECT   # operands ignored if present
 
 class EJECT(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="PD"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -2893,6 +2943,7 @@ class EJECT(ASMStmt):
 # [label] END     [entry]
 
 class END(ASMStmt):
+    __slots__=("scope","pool","align")
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -2960,6 +3011,7 @@ class END(ASMStmt):
 # [label] ENTRY  <address>
 
 class ENTRY(TemplateStmt):
+    __slots__=("entry_label",)
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3007,6 +3059,7 @@ class ENTRY(TemplateStmt):
 # label EQU     expression
 
 class EQU(TemplateStmt):
+    __slots__=("new_symbol",)
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -3120,6 +3173,7 @@ class EQU(TemplateStmt):
 # [seq]  GBLA  &sym,&syma(a-expr),...
 
 class GBLA(SymbolDefine):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3151,6 +3205,7 @@ class GBLA(SymbolDefine):
 # [seq]  GBLB  &sym,&symb(a-expr),...
 
 class GBLB(SymbolDefine):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3182,6 +3237,7 @@ class GBLB(SymbolDefine):
 # [seq]  GBLC  &sym,&symb(a-expr),...
 
 class GBLC(SymbolDefine):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3213,6 +3269,7 @@ class GBLC(SymbolDefine):
 # [seq]  LCLA  &sym,&syma(a-expr)
 
 class LCLA(SymbolDefine):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3244,6 +3301,7 @@ class LCLA(SymbolDefine):
 # [seq]  LCLB  &sym,&symb(a-expr),....
 
 class LCLB(SymbolDefine):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3274,6 +3332,7 @@ class LCLB(SymbolDefine):
 #
 # [seq]  LCLC  &sym,&symb(a-expr),...
 class LCLC(SymbolDefine):
+    __slots__=()
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3299,6 +3358,7 @@ class LCLC(SymbolDefine):
 
 
 class LiteralStmt(DC):
+    __slots__=("literal",)
     # Statement processing controls
     typ="MO"       # Statement type identifier
     lfld=None      # Valid label field content
@@ -3370,6 +3430,7 @@ class LiteralStmt(DC):
 # [label] LTORG  [comments]
 
 class LTORG(ASMStmt):
+    __slots__=("pool","align")
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -3410,6 +3471,7 @@ class LTORG(ASMStmt):
 # [label] MACRO  [DEBUG] [comments]
 
 class MACRO(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld=None      # Valid label field content
@@ -3450,6 +3512,7 @@ class MACRO(ASMStmt):
 # [seqsym] MEND  [comments]
 
 class MEND(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="MD"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3486,6 +3549,7 @@ class MEND(ASMStmt):
 # [seqsym] MEXIT  [comments]
 
 class MEXIT(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="MD"       # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3519,6 +3583,7 @@ class MEXIT(ASMStmt):
 # [seqsym] MHELP  <action>
 
 class MHELP(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3571,6 +3636,7 @@ class MHELP(TemplateStmt):
 # [label] MNOTE sev,'message'
 
 class MNOTE(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3639,6 +3705,7 @@ class MNOTE(ASMStmt):
 # newop  OPSYN [oldop]
 
 class OPSYN(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="LS"      # Valid label field content
@@ -3729,6 +3796,7 @@ class OPSYN(ASMStmt):
 # [label] ORG  expression
 
 class ORG(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQS"     # Valid label field content
@@ -3808,6 +3876,7 @@ class ORG(TemplateStmt):
 #
 
 class POP(StackingStmt):
+    __slots__=("using",)
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3838,7 +3907,7 @@ class POP(StackingStmt):
     def Pass2(self,asm,debug=False,trace=False):
         if self.using:
             try:
-                asm.bases.pop()
+                asm.bases.pop(line=self.lineno)
             except KeyError:
                 raise assembler.AssemblerError(line=self.lineno,
                     msg="can not POP an empty USING stack")
@@ -3851,6 +3920,7 @@ class POP(StackingStmt):
 #         PRINT  option[,option]..
 
 class PRINT(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -3935,6 +4005,7 @@ class PRINT(ASMStmt):
 # [label] PSWS   sys,key,a,prog,addr[,amode]
 
 class PSWS(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -4009,6 +4080,7 @@ class PSWS(TemplateStmt):
 # [label] PSW360 sys,key,a,prog,addr[,amode]
 
 class PSW360(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -4087,6 +4159,7 @@ class PSW360(TemplateStmt):
 # [label] PSW67  sys,key,a,prog,addr[,amode]
 
 class PSW67(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -4180,6 +4253,7 @@ class PSW67(TemplateStmt):
 # [label] PSWBC  sys,key,mwp,prog,addr[,amode]
 
 class PSWBC(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -4258,6 +4332,7 @@ class PSWBC(TemplateStmt):
 # [label] PSWEC  sys,key,mwp,prog,addr[,amode]
 
 class PSWEC(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -4346,6 +4421,7 @@ class PSWEC(TemplateStmt):
 # [label] PSWE390  sys,key,mwp,prog,addr[,amode]
 
 class PSWBi(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -4488,21 +4564,25 @@ class PSWBi(TemplateStmt):
 
 
 class PSW380(PSWBi):
+    __slots__=()
     def __init__(self,lineno,logline=None):
         super().__init__(lineno,logline=logline)
 
 
 class PSWXA(PSWBi):
+    __slots__=()
     def __init__(self,lineno,logline=None):
         super().__init__(lineno,logline=logline)
 
 
 class PSWE370(PSWBi):
+    __slots__=()
     def __init__(self,lineno,logline=None):
         super().__init__(lineno,logline=logline)
 
 
 class PSWE390(PSWBi):
+    __slots__=()
     def __init__(self,lineno,logline=None):
         super().__init__(lineno,logline=logline)
 
@@ -4517,6 +4597,7 @@ class PSWE390(PSWBi):
 # [label] PSWZ   sys,key,mwp,prog,addr[,amode]
 
 class PSWZ(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -4631,6 +4712,7 @@ class PSWZ(TemplateStmt):
 # [label] PSWZS  sys,key,mwp,prog,addr[,amode]
 
 class PSWZS(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="LQ"      # Valid label field content
@@ -4744,6 +4826,7 @@ class PSWZS(TemplateStmt):
 #         PUSH   [USING][,PRINT][,NOPRINT]
 
 class PUSH(StackingStmt):
+    __slots__=("using",)
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -4783,6 +4866,7 @@ class PUSH(StackingStmt):
 # label REGION  # no operands
 
 class REGION(ASMStmt):
+    __slots__=("region","for_pass2")
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -4843,6 +4927,7 @@ class REGION(ASMStmt):
 # [CSECT] RMODE 24|31|64|ANY
 
 class RMODE(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -4872,6 +4957,7 @@ class RMODE(ASMStmt):
 # &sym(n) SETA  arithmetic expression
 
 class SETA(SETx):
+    __slots__=()
     # Statement processing controls
     typ="MS"       # Statement type identifier
     lfld="S"       # Valid label field content
@@ -4908,6 +4994,7 @@ class SETA(SETx):
 # &sym(n) SETB  binary-expression,...
 
 class SETB(SETx):
+    __slots__=()
     # Statement processing controls
     typ="MS"       # Statement type identifier
     lfld="S"       # Valid label field content
@@ -4940,6 +5027,7 @@ class SETB(SETx):
 # &sym(n) SETC  character expression
 
 class SETC(SETx):
+    __slots__=()
     # Statement processing controls
     typ="MS"      # Statement type identifier
     lfld="S"       # Valid label field content
@@ -4972,6 +5060,7 @@ class SETC(SETx):
 #         SPACE [n]
 
 class SPACE(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -5028,6 +5117,7 @@ class SPACE(TemplateStmt):
 # [label] START [address][,[region]]
 
 class START(ASMStmt):
+    __slots__=("gscope","csect","region")
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="LSQ"     # Valid label field content
@@ -5160,6 +5250,7 @@ class START(ASMStmt):
 #         TITLE  ['new listing title']
 
 class TITLE(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="LMSQ"    # Valid label field content
@@ -5204,6 +5295,7 @@ class TITLE(ASMStmt):
 #         USING  base,reg[,reg]...
 
 class USING(TemplateStmt):
+    __slots__=()
     # Statement processing controls
     typ="TPL"      # Statement type identifier
     lfld="Q"       # Valid label field content
@@ -5290,7 +5382,7 @@ class USING(TemplateStmt):
                     % (cls_str,lineno,regs))
 
         for r in regs:
-            asm.bases.using(r,addr,trace=utrace)
+            asm.bases.using(r,addr,trace=utrace,line=self.lineno)
             addr=addr+4096
 
         if __debug__:
@@ -5307,6 +5399,7 @@ class USING(TemplateStmt):
 #         XMODE  mode,setting
 
 class XMODE(ASMStmt):
+    __slots__=()
     # Statement processing controls
     typ="SPP"      # Statement type identifier
     lfld="L"       # Valid label field content
@@ -305,6 +305,7 @@ class PLitLabelAttrChr(PLitLabelAttr):
 # This latter behavior is used by PLitTID and PLitSmart.  This eliminates the need
 # to do the convertion evertime the expression is evaluated in a macro invocation.
 class PLitSD(pratt3.PLit):
+    constant=True      # Compiled expressions use the converted value directly
     def __init__(self,token):
         super().__init__(token)
         self.sdval=self.src.convert()   # Self-defining term's integer value
@@ -503,7 +504,12 @@ class ArithExpr(pratt3.PExpr):
         super().__init__(desc=name,tokens=tokens)
         # Whether this expression is 'unique'.  Used for unique literals
         self.unique=False
+    # Compile the expression for repeated evaluation, for example by a macro
+    def compile(self):
+        super().compile(ArithExpr.evaluator)
     def evaluate(self,external,debug=False,trace=False):
+        if self.code is not None and not (debug or trace):
+            return self.code.run(external=external)
         return ArithExpr.evaluator.run(\
             self,external=external,debug=debug,trace=trace)
     def token(self,ptok):
@@ -559,7 +565,12 @@ class BinaryExpr(pratt3.PExpr):
     def __init__(self,desc,lineno,tokens=[]):
         name="%s %s" % (desc,lineno)
         super().__init__(desc=name,tokens=tokens)
+    # Compile the expression for repeated evaluation, for example by a macro
+    def compile(self):
+        super().compile(BinaryExpr.evaluator)
     def evaluate(self,external,debug=False,trace=False):
+        if self.code is not None and not (debug or trace):
+            return self.code.run(external=external)
         return BinaryExpr.evaluator.run(\
             self,external=external,debug=debug,trace=trace)
     def token(self,ptok):
@@ -125,6 +125,7 @@ class AsmStats(object):
     def __init__(self):
         self.timers={}       # Active timers
         self.stmts=None      # Number of statements processes
+        self.prof=None       # asmprof.Profiler object when profiling is enabled
 
         # These three timers may be updated with better times from an external source.
         # asma.py understands how to update these timers.  Use it as an example
@@ -141,6 +142,11 @@ class AsmStats(object):
         # Instantiation timers
         self.proc_timer("objects_p")
         self.wall_timer("objects_w")
+        # Lexer and parser construction.  Lexers and parsers are constructed when
+        # first used, so these times are included in the timer running at the time.
+        self.built=0         # Number of lexers and parsers constructed
+        self.built_p=0.0     # Process time constructing lexers and parsers
+        self.built_w=0.0     # Wall-clock time constructing lexers and parsers
 
         # The remaining timers are managed by ASMA and should not be updated
         # from any external source.
@@ -191,6 +197,12 @@ class AsmStats(object):
         timer=self.__fetch(tname,"running")
         return timer.elapsed()
 
+    # Accumulate the time of constructing a lexer or parser
+    def constructed(self,proc,wall):
+        self.built+=1
+        self.built_p+=proc
+        self.built_w+=wall
+
     # Create a process timer
     def proc_timer(self,tname):
         try:
@@ -200,6 +212,12 @@ class AsmStats(object):
         except KeyError:
             self.timers[tname]=AsmProcTimer(tname)
 
+    # Enable the assembly profiler.  Returns the asmprof.Profiler object.
+    def profile(self):
+        if self.prof is None:
+            self.prof=asmprof.Profiler()
+        return self.prof
+
     # Report the available statistics.  An external source of better information
     # should perform the timer updates before calling this method.  Calling this
     # method will implicitly stop the overall timers 'process' and 'wall'.  Calling
@@ -217,6 +235,9 @@ class AsmStats(object):
         string="%s\n  total       %s" % (string,self.__format(wt,time=wt))
         string="%s\n    import    %s" % (string,self.__format(wt,timer="import_w"))
         string="%s\n    objects   %s" % (string,self.__format(wt,timer="objects_w"))
+        string="%s\n    parsers   %s  (%s of %s built)" \
+            % (string,self.__format(wt,time=self.built_w),self.built,\
+                parsers.ParserMgr.available())
         string="%s\n    assembly  %s" % (string,self.__format(wt,time=assembly))
         #string="%s\n      pass 0  %s" % (string,self.__format(wt,timer="pass0_w"))
         string="%s\n      pass 1  %s" % (string,self.__format(wt,timer="pass1_w"))
@@ -229,6 +250,9 @@ class AsmStats(object):
         string="%s\n  total       %s" % (string,self.__format(pt,time=pt))
         string="%s\n    import    %s" % (string,self.__format(pt,timer="import_p"))
         string="%s\n    objects   %s" % (string,self.__format(pt,timer="objects_p"))
+        string="%s\n    parsers   %s  (%s of %s built)" \
+            % (string,self.__format(pt,time=self.built_p),self.built,\
+                parsers.ParserMgr.available())
         string="%s\n    assembly  %s" % (string,self.__format(pt,time=assembly))
         #string="%s\n      pass 0  %s" % (string,self.__format(pt,timer="pass0_p"))
         string="%s\n      pass 1  %s" % (string,self.__format(pt,timer="pass1_p"))
@@ -238,6 +262,45 @@ class AsmStats(object):
 
         return string
 
+    # Report the combined statistics of multiple assemblies.  Failed assemblies
+    # are reported separately and are not included in the statistics.
+    # Method Arguments:
+    #   summaries  A list of dictionaries returned by the summary() method, one
+    #              per successful assembly.
+    #   wall       The wall-clock time in seconds of all assemblies together
+    #   failed     A list of the names of the failed assemblies.  Defaults to an
+    #              empty list.
+    # Returns:
+    #   a string of the combined report
+    @staticmethod
+    def combined(summaries,wall,failed=[]):
+        stmts=0
+        times={}
+        for summary in summaries:
+            stmts+=summary["stmts"] or 0
+            for tname,val in summary["timers"].items():
+                if val is None:
+                    continue
+                times[tname]=times.get(tname,0)+val
+
+        string="\nAssemblies: %s  Total statements: %s\n" % (len(summaries),stmts)
+        if failed:
+            string="%s\nFailed assemblies: %s" % (string,len(failed))
+            for name in failed:
+                string="%s\n    %s" % (string,name)
+            string="%s\n" % string
+        string="%s\nBatch wall clock seconds: %s" % (string,wall)
+        if wall:
+            string="%s\n  rate  %7.4f  (stmt/sec)" % (string,stmts/wall)
+        for title,suffix in [("Wall Clock","w"),("Process","p")]:
+            string="%s\n\n%s sum of seconds" % (string,title)
+            for tname,desc in [("import","import"),("objects","objects"),\
+                               ("parsers","parsers"),("assemble","assembly"),("pass1","  pass 1"),\
+                               ("pass2","  pass 2"),("output","  output")]:
+                val=times.get("%s_%s" % (tname,suffix))
+                string="%s\n    %-10s  %s" % (string,desc,val)
+        return string
+
     # Returns a timer's elapsed time.  If the timer has not been stopped it stops
     # it and provides a warning.  If the timer was never started it returns None.
     def report_time(self,tname):
@@ -275,6 +338,20 @@ class AsmStats(object):
         timer=self.__fetch(tname,"started")
         return timer.started()
 
+    # Returns a dictionary of the number of statements, key 'stmts', and the
+    # elapsed time of each completed timer, key 'timers', for use by the
+    # combined() method.  Timers not started or not stopped have a value of None.
+    def summary(self):
+        timers={}
+        for tname,timer in self.timers.items():
+            if timer.started() and timer.stopped():
+                timers[tname]=timer.elapsed()
+            else:
+                timers[tname]=None
+        timers["parsers_p"]=self.built_p
+        timers["parsers_w"]=self.built_w
+        return {"stmts":self.stmts,"timers":timers}
+
     # Supply the number of assembler statements processed for per/statement stats
     def statements(self,number):
         assert isinstance(number,int),\
@@ -440,6 +517,7 @@ Stats.start("import_p")
 Stats.start("import_w")
 
 # Python imports
+import bisect        # Search the USING base index
 import functools     # Allow sorting of instances
 import os.path       # Access to path management for AsmOut.
 import re            # Regular expression support
@@ -490,6 +568,8 @@ import parsers      # 0.2 - Consolidates parser management module
 import insnbldr     #       Access the machine instruction construction machinery
 import literal      # 0.2 - Access the literal pool support.  See late imports
 import msldb        #       Access the Format class for type checking
+import asmprof      #       Access the optional assembly profiler
+import asmexport    #       Access the assembly result export
 
 Stats.stop("import_w")
 Stats.stop("import_p")
@@ -651,16 +731,53 @@ def isLabel(string):
 
 # This class manages output options directed to the assembler.  None implies the
 # output is not written to the file system (although it might be created internally).
+#
+# When lstream is True, the listing is written to its file while it is created by
+# the stream_listing() method rather than being held in memory until written by the
+# write_listing() method.  lbuffer is the number of listing lines collected before
+# each write.  0 writes each line as created.
 class AsmOut(object):
     def __init__(self,deck=None,image=None,ldipl=None,listing=None,mc=None,rc=None,\
-                 vmc=None):
+                 vmc=None,lstream=False,lbuffer=0,export=None):
         self.deck=deck          # Object deck file name or None
+        self.export=export      # Assembly result export file name or None
         self.image=image        # Image file name or None
         self.ldipl=ldipl        # List directed IPL file and implied base dir. or None
         self.listing=listing    # Assembly listing file or None.
         self.mc=mc              # Management console command file or None
         self.rc=rc              # Hercules RC script file commands or None
         self.vmc=vmc            # Virtual machine STORE commands file or None
+        # Whether the listing is streamed to its file
+        self.lstream=lstream and listing is not None
+        self.lbuffer=lbuffer    # Lines buffered by each streamed listing write
+        self.streamed=False     # Set when the listing file has been streamed
+
+    # Create the listing writing it to the listing file as it is created.  If the
+    # file can not be opened, the listing is created in memory and the failure
+    # reported by the write_listing() method.
+    # Method Argument:
+    #   lm      The asmlist.AsmListing object creating the listing
+    def stream_listing(self,lm):
+        try:
+            fo=open(self.listing,"wt")
+        except OSError:
+            lm.create()
+            return
+
+        try:
+            lm.create(fo=fo,buffer=self.lbuffer)
+        except OSError:
+            print("%s - could not complete writing of listing file: %s" \
+                % (this_module,self.listing))
+            sys.exit(2)
+        finally:
+            try:
+                fo.close()
+            except OSError:
+                print("%s - could not close output file: %s" \
+                    % (this_module,self.listing))
+                sys.exit(2)
+        self.streamed=True
 
     def write_file(self,module,filename,mode,content,desc,silent=False):
         if filename is None:
@@ -696,6 +813,12 @@ class AsmOut(object):
             return
         self.write_file(module,self.deck,"wb",deck,"object deck",silent=silent)
 
+    def write_export(self,module,export,silent=False):
+        if export is None:
+            return
+        self.write_file(module,self.export,"wb",export,"result export",\
+            silent=silent)
+
     def write_image(self,module,image,silent=False):
         self.write_file(module,self.image,"wb",image,"image",silent=silent)
 
@@ -715,6 +838,11 @@ class AsmOut(object):
         return
 
     def write_listing(self,module,listing,silent=False):
+        if self.streamed and listing is None:
+            # The listing was written when created
+            if not silent:
+                print("%s - %s file written: %s" % (module,"listing",self.listing))
+            return
         self.write_file(module,self.listing,"wt",listing,"listing",silent=silent)
 
     def write_mc(self,module,mcfile,silent=False):
@@ -786,6 +914,10 @@ class Assembler(object):
     #   msl         The requested MSL database file
     #   mslpath     Path Manager for  the Machine Specification Language database
     #   aout        AsmOut object describing output characteristics.
+    #   mslcache    Directory of compiled MSL CPU definitions.  If None, the MSL
+    #               database is always built from its source.  Defaults to None.
+    #   maccache    Directory of saved library macro definitions.  If None, macro
+    #               library files are always processed.  Defaults to None.
     #   addr        Size of addresses in this assembly.  Overrides MSL CPU statement
     #   case        Enables case sensitivity for lables, symbolic variables and
     #               sequence symbols.  Defaults to case insensitive.
@@ -820,13 +952,25 @@ class Assembler(object):
     #               continuation in column 72 to a back slash '\'.
     #   stats       Specify True to enable statistics reporting at end of pass 2.
     #               Should be False if an external driver is updating statistics.
+    #   profile     The path of the JSON file to which profile measurements are
+    #               written.  Specifying a path enables the profiler.  If None,
+    #               profiling is disabled.  Defaults to None.
+    #   profsort    The sort order of the profile report: 'self', 'total', 'calls'
+    #               or 'name'.  Defaults to 'self'.
+    #   expansions  A dictionary of the macro expansions recorded by a previous
+    #               assembly of the same source with the same options, possibly
+    #               empty.  Specifying a dictionary enables macro expansion reuse
+    #               and recording.  See asmmacs.ExpansionCache.  If None, macro
+    #               expansions are not reused.  Defaults to None.
     # Path Managers for various input sources:
     #   asmpath     Assembler source COPY directive PathMgr object
     #   maclib      Macro library PathMgr object
     def __init__(self,machine,msl,mslpath,aout,addr=None,case=False,czam=False,\
                  debug=None,defines=[],dump=False,eprint=False,error=2,nest=20,\
                  ccw=None,psw=None,ptrace=[],otrace=[],cpfile=None,cptrans="94C",\
-                 mcall=False,seq=False,stats=False,asmpath=None,maclib=None):
+                 mcall=False,seq=False,stats=False,asmpath=None,maclib=None,\
+                 mslcache=None,maccache=None,profile=None,profsort="self",\
+                 expansions=None):
 
         # Test passing of seq from the command-line to ASMA
         #print("Assembler.__init__() - seq: %s" % seq)
@@ -874,6 +1018,12 @@ class Assembler(object):
         # Statistics flag
         self.stats=stats
 
+        # Profiler options
+        self.profile=profile        # JSON file of profile measurements
+        self.profsort=profsort      # Profile report sort order
+        if profile is not None:
+            Stats.profile()
+
       #
       #   Assembler initialization begins
       #   DO NOT CHANGE THE SEQUENCE!  Dependencies exist between methods
@@ -881,7 +1031,14 @@ class Assembler(object):
 
         # Statement operand parsers. See __init_parsers() method
         self.PM=self.__init_parsers()
-        Assembler.sdterm=self.PM.parsers["sdterm"]
+        if Stats.prof is not None:
+            Stats.prof.parsers(self.PM)
+
+        # Macro expansion reuse (asmmacs.ExpansionCache object).  Its input digest
+        # is updated by the input managers of both processors.
+        self.XC=None
+        if expansions is not None:
+            self.XC=asmmacs.ExpansionCache(expansions)
 
         # Statement processor drives processing
         self.SP=STMTProcessor(self,depth=nest)
@@ -889,10 +1046,10 @@ class Assembler(object):
         self.IM=self.SP.IM     # An asmline.LineMgr object
 
         # MACLIB processor for macro library definitions
-        self.MP=MACLIBProcessor(self)
+        self.MP=MACLIBProcessor(self,cache=maccache)
 
         # Operation Management Framework
-        self.OMF=asmoper.OperMgr(self,machine,msl,mslpath)
+        self.OMF=asmoper.OperMgr(self,machine,msl,mslpath,mslcache=mslcache)
         self.OMF.init_xmode(ccw,psw)      # Initialize XMODE settings
         self.addrsize=self.OMF.addrsize   # Maximum address size in bits
 
@@ -1000,7 +1157,9 @@ class Assembler(object):
     # the assembler.CPTRANS for modules that import assembler.
     def __init_codepage(self):
         global CPTRANS
-        trans=codepage.CODEPAGE().build(trans=self.cptrans,filename=self.cpfile)
+        cp=codepage.CODEPAGE()
+        trans=cp.build(trans=self.cptrans,filename=self.cpfile)
+        self.cpfiles=cp.files       # Code page source files read, if any
         CPTRANS=trans
         return trans
 
@@ -1012,11 +1171,7 @@ class Assembler(object):
         self.otrace=new_list
 
     def __init_parsers(self,debug=False):
-        # These lexical analyzers are assigned to Assembler class attributes.
-        Assembler.lexer=parsers.AsmLexer(self.dm).init()
-
-        # These syntactical analyzers are assigned to Assembler class attributes,
-        # and are not part of the Assembler object's parsers attribute dictionary.
+        # Lexers and parsers are constructed when first used.
         return parsers.ParserMgr(self).init()
 
     # Initialize structure template used by most TemplateStmt subclasses
@@ -1287,6 +1442,8 @@ class Assembler(object):
             image.mc=self.OM.mc_file(self)
         if self.aout.ldipl is not None:
             image.ldipl=self.OM.ldipl(self)
+        if self.aout.export is not None:
+            image.export=asmexport.ExportWriter(self).build()
 
     def _getAttr(self,name,attr,line):
         ste=self._symbol_ref(name)
@@ -1533,6 +1690,34 @@ class Assembler(object):
     def assemble(self,filename):
         return self.SP.run(self,filename)
 
+    # Returns the absolute paths of every file read by the assembly: the source
+    # file and the files it copied, macro library files, MSL database files and
+    # code page files.
+    def dependencies(self):
+        files=[]
+        for processor in [self.SP,self.MP]:
+            for src in processor.IM.LB._files:
+                files.append(os.path.abspath(src.fname))
+        for filepath in self.OMF.mslfiles+self.cpfiles:
+            files.append(os.path.abspath(filepath))
+        return files
+
+    # Returns the file names sought from the COPY and macro library search paths,
+    # whether found or not, as a list of tuples: (variable,name,directories).
+    # The directories are the search path's directories or None when the variable
+    # is not a search path.
+    def lookups(self):
+        found=[]
+        for processor in [self.SP,self.MP]:
+            lb=processor.IM.LB
+            try:
+                dirs=tuple(lb._opath.paths[lb._env].dir_list)
+            except KeyError:
+                dirs=None
+            for name in lb._lookups:
+                found.append((lb._env,name,dirs))
+        return found
+
     # Returns the completed Image instance for processing
     # See asma.py for an example.
     def image(self):
@@ -1802,6 +1987,10 @@ class BaseState(object):
         # example DSECT symbols).  See use_rbase() method
         self.rbases={}    # Active USING assignments to relative bases
 
+        # The BaseIndex object of the active bases.  It is built when first needed
+        # by the index() method and discarded whenever the active bases change.
+        self._index=None
+
     # This method removes a previously registered base.  If it was not
     # previously registered it is silenty ignored.  The effect of the DROP
     # statement is to make a register unavailable for use as a base.  It does
@@ -1828,6 +2017,7 @@ class BaseState(object):
              del based[reg]        # Remove the base assigned to the register
          except KeyError:
              pass
+         self._index=None
          try:
              self.bases[reg]=None  # This means the base is now dropped
          except KeyError:
@@ -1836,6 +2026,12 @@ class BaseState(object):
          # abases and rbases (the internal view) are now in sync with bases
          # (the assembler or user) view.
 
+    # Returns the BaseIndex object of the active bases, building it if needed.
+    def index(self):
+        if self._index is None:
+            self._index=BaseIndex(self)
+        return self._index
+
     # Print to the console the contents of this BaseState object
     def print(self,indent="",string=False):
         s="%sBase State:\n" % indent
@@ -1919,6 +2115,7 @@ class BaseState(object):
     def use_abase(self,reg,baseo):
         self.abases[reg]=baseo
         self.bases[reg]=self.abases
+        self._index=None
 
     # Establish a new register relative USING.
     # Method Arguments:
@@ -1929,6 +2126,95 @@ class BaseState(object):
     def use_rbase(self,reg,baseo):
         self.rbases[reg]=baseo
         self.bases[reg]=self.rbases
+        self._index=None
+
+
+# This class indexes the active bases of a BaseState object by the address each
+# base register is assigned.  Absolute bases are indexed together.  Relative bases
+# are indexed by their section.  Within each, the distinct base addresses are kept
+# in ascending sequence with the list of Base objects assigned each address.
+#
+# The smallest non-negative displacement is provided by the bases with the highest
+# address not exceeding the resolved address.  The smallest negative displacement
+# is provided by the bases with the lowest address exceeding the resolved address.
+# Each is located by a binary search rather than by testing every active base.
+#
+# The index is built from a BaseState object when first used.  The BaseState
+# object discards it whenever a USING or DROP changes its bases.  A state restored
+# by POP USING retains its index because it has not changed since it was saved.
+#
+# Instance Argument:
+#   state   The BaseState object being indexed
+class BaseIndex(object):
+    def __init__(self,state):
+        # Dictionary of indexed bases.  The key is None for absolute bases or the
+        # Section object of relative bases.  The value is a tuple of two lists:
+        #   [0]  the ascending list of base addresses and
+        #   [1]  for each address, the list of Base objects assigned it.
+        self.ranges={}
+
+        groups={}
+        for base in state.abases.values():
+            self.__add(groups,None,base)
+        for base in state.rbases.values():
+            self.__add(groups,base.section,base)
+        for key,bydict in groups.items():
+            addrs=sorted(bydict.keys())
+            self.ranges[key]=(addrs,[bydict[a] for a in addrs])
+
+    # Add a Base object to the groups being indexed
+    def __add(self,groups,key,base):
+        try:
+            bydict=groups[key]
+        except KeyError:
+            bydict=groups[key]={}
+        try:
+            bydict[base.address].append(base)
+        except KeyError:
+            bydict[base.address]=[base,]
+
+    # Returns the list of Base objects providing the best displacement for an
+    # address.  All Base objects in the list provide the same displacement.  An
+    # empty list is returned if no base can resolve the address.
+    # Method Arguments:
+    #   key      None for an absolute address or the Section object of a relative
+    #            address
+    #   target   The address being resolved, as returned by its base() method
+    #   cmin     The minimum displacement supported by the instruction
+    #   cmax     The maximum displacement supported by the instruction
+    def candidates(self,key,target,cmin,cmax):
+        try:
+            addrs,groups=self.ranges[key]
+        except KeyError:
+            return []
+        ndx=bisect.bisect_right(addrs,target)
+        # Smallest non-negative displacement
+        if ndx>0 and cmin <= target-addrs[ndx-1] <= cmax:
+            return groups[ndx-1]
+        # Smallest negative displacement (only when displacements are signed)
+        if ndx<len(addrs) and cmin <= target-addrs[ndx] <= cmax:
+            return groups[ndx]
+        return []
+
+
+# This class records the statements over which a register is assigned a base by a
+# USING directive.  The range starts with the statement establishing the USING and
+# ends with the statement that drops the register, assigns it another base or
+# restores by POP USING a state in which the register is not assigned this base.
+# The recorded ranges are provided to the assembly result export.
+#
+# Instance Arguments:
+#   base    The Base object of the register's assignment
+#   first   The statement number of the statement establishing the assignment
+class UsingRange(object):
+    def __init__(self,base,first):
+        self.base=base          # The Base object assigned the register
+        self.first=first        # First statement of the range
+        self.last=None          # Statement ending the range or None if not ended
+
+    def __str__(self):
+        return "%s(R%s,%s,first=%s,last=%s)" % (self.__class__.__name__,\
+            self.base.reg,self.base.loc,self.first,self.last)
 
 
 # This class manages base registers, USING, DROP, base/disp resolution, USING
@@ -1967,6 +2253,11 @@ class BaseMgr(object):
         # Rather, PUSH only saves the current status of the USING state
         # and restores it upon pop.
 
+        # UsingRange objects of every USING assignment in the sequence established
+        # and those of the currently assigned registers.  See ranges() method.
+        self.usings=[]           # All UsingRange objects
+        self.active={}           # Active UsingRange objects by register
+
         if extended:  # Extended direct mode is supported only on the 360-20
             BaseMgr.direct=BaseMgr.direct8
         else:    # All other systems only support direct mode with register 0
@@ -2012,15 +2303,33 @@ class BaseMgr(object):
         reg=selected.reg
         return (reg,disp)            # Return the base/displacement tuple
 
+    # Start the UsingRange of a register's new base, ending its previous one
+    def __begin(self,reg,base,line):
+        self.__end(reg,line)
+        rng=UsingRange(base,line)
+        self.usings.append(rng)
+        self.active[reg]=rng
+
+    # End the UsingRange of a register's base if the register has a base
+    def __end(self,reg,line):
+        try:
+            rng=self.active[reg]
+        except KeyError:
+            return
+        rng.last=line
+        del self.active[reg]
+
     # This method removes a previously registered base.  If it was not previously
     # registered it is silenty ignored.  The effect of the DROP statement is to
     # make a register unavailable for use as a base.  It does not matter whether
-    # it wss previously available or not.
-    def drop(self,reg,trace=False):
+    # it wss previously available or not.  line is the statement number of the DROP
+    # directive.
+    def drop(self,reg,trace=False,line=None):
          assert isinstance(reg,int),\
             "%s 'reg' argument must be an integer: %s" % (eloc(self,"drop"),reg)
 
          self.cur.drop(reg)
+         self.__end(reg,line)
 
     # Resolve an address into a tuple of two integers (basereg,displacement)
     # If no base is found, a KeyError is raised to alert the caller to the
@@ -2041,7 +2350,35 @@ class BaseMgr(object):
                 % (eloc(self,"find"),addr)
 
         signed = size == 20   # Whether the displacement is signed or not
+        if signed:
+            cmin,cmax=asm.builder.fld_srange[size]
+        else:
+            cmin,cmax=asm.builder.fld_range[size]
 
+        if addr.isAbsolute():
+            key=None
+        else:
+            key=addr.section
+        target=addr.base()
+        assert target is not None,\
+            "%s Base address is None: %s" % (eloc(self,"find"),repr(addr))
+
+        possible=self.cur.index().candidates(key,target,cmin,cmax)
+        if len(possible)>1:
+            # Direct and non-direct bases with the same displacement are ranked by
+            # opposite register rules.  Rank them as the complete search does.
+            direct=[base for base in possible if base.direct is not None]
+            if direct and len(direct)!=len(possible):
+                return self.__search(addr,size,signed,asm,trace=trace)
+        for base in possible:
+            base.disp=target-base.address
+
+        # This can raise an uncaught KeyError when resolution is not possible
+        return self.__select(addr,possible,trace=trace)
+
+    # Resolve an address by testing every active base.  Used by the find() method
+    # when the indexed bases can not be ranked independently of the others.
+    def __search(self,addr,size,signed,asm,trace=False):
         possible=[]
         if addr.isAbsolute():
             for base in self.cur.abases.values():
@@ -2067,19 +2404,44 @@ class BaseMgr(object):
         return self.__select(addr,possible,trace=trace)
 
     # Implement the assembler POP USING operation
+    # Method Argument:
+    #   line   The statement number of the POP directive.
     # Exception:
     #   KeyError   When the internal stack is empty.  The caller should
     #              catch this error and respond as appropriate.
-    def pop(self):
+    def pop(self,line=None):
         if not self.stack:
             raise KeyError
 
         self.cur=self.stack.pop()  # Retrieve the last element and remove it.
         # The last element of the list is the most current state.
 
+        # Registers whose base changed since the PUSH start a new range.  The
+        # ranges of bases unchanged since the PUSH continue.
+        restored={}
+        for reg,bdict in self.cur.bases.items():
+            if bdict is not None:
+                restored[reg]=bdict[reg]
+        for reg in list(self.active.keys()):
+            try:
+                base=restored[reg]
+            except KeyError:
+                self.__end(reg,line)
+                continue
+            if self.active[reg].base is not base:
+                self.__end(reg,line)
+        for reg,base in restored.items():
+            if reg not in self.active:
+                self.__begin(reg,base,line)
+
     def print(self,indent="",string=False):
         return self.cur.print(indent=indent,string=string)
 
+    # Returns the list of UsingRange objects in the sequence their USING was
+    # established.  Ranges not ended continue to the end of the assembly.
+    def ranges(self):
+        return self.usings
+
     # This method saves the current USING state and pushes it to the LIFO
     # stack of USING state.
     def push(self):
@@ -2090,8 +2452,8 @@ class BaseMgr(object):
 
     # This method registers a specific register and its associated base address.
     # Per the semantics of the USING directive, a new registration supercedes
-    # a previous one.
-    def using(self,reg,addr,trace=False):
+    # a previous one.  line is the statement number of the USING directive.
+    def using(self,reg,addr,trace=False,line=None):
         cls_str="assembler.py %s.using() -" % self.__class__.__name__
         # In theory these sanity checks should not be needed.  The USING directive's
         # pass 2 method should only use correct values.  Experience has shown that
@@ -2120,10 +2482,12 @@ class BaseMgr(object):
         except KeyError:
             dbase=None
 
+        base=Base(reg,addr,direct=dbase)
         if addr.isAbsolute():
-            self.cur.use_abase(reg,Base(reg,addr,direct=dbase))
+            self.cur.use_abase(reg,base)
         else:
-            self.cur.use_rbase(reg,Base(reg,addr,direct=dbase))
+            self.cur.use_rbase(reg,base)
+        self.__begin(reg,base,line)
 
 #
 #  +---------------------+
@@ -2253,8 +2617,10 @@ class LocationCounter(object):
 # Section classes, and is a subclass of Binary.  The Content class is never itself
 # instantiated directly.
 
-# This is the base class for all image content.
+# This is the base class for all image content.  Each statement with binary content
+# retains its own Binary object, so the base class attributes are slots.
 class Binary(object):
+    __slots__=("_align","_length","barray","loc","rloc","container")
     def __init__(self,alignment,length):
         super().__init__()
         self._align=alignment      # Alignment within parent container
@@ -2315,6 +2681,14 @@ class Binary(object):
                     print("%s %s finalized %s bytes: %s - %s: %s" \
                         % (cls_str,cls,blen,beg_addr,end_addr,hexdata))
 
+    # Returns the displacement of this content within the image buffer or None if
+    # the content is not part of the image.
+    def img_disp(self):
+        sect=self.container
+        if sect is None or sect.img_loc is None:
+            return None
+        return sect.img_loc+(self.loc-sect.loc)
+
     def make_absolute(self,debug=False):
         if debug:
             prev=self.loc.clone()
@@ -2443,6 +2817,11 @@ class Area(Binary):
             self._length=bin_1st._length
         self.make_barray(trace=trace)
 
+    # The area is not itself in a container.  It occupies the image where its first
+    # element does.
+    def img_disp(self):
+        return self.elements[0].img_disp()
+
     def insert(self,trace=False):
         my_loc=self.loc
         for bin in self.elements:
@@ -2623,6 +3002,20 @@ class Content(Binary):
         raise NotImplementedError("%s subclass %s must implement make_barray_all() "
             "method" % (eloc(self,"make_barray_all"),self.__class__.__name__))
 
+    # Make this container's content the slice of the image buffer that it occupies
+    # rather than a bytearray of its own.  Content inserted into it is placed
+    # directly in the image.
+    # Method Argument:
+    #   view   A memoryview of the entire image buffer
+    def make_view(self,view,trace=False):
+        beg=self.img_loc
+        self.barray=view[beg:beg+len(self)]
+        if __debug__:
+            if trace:
+                print("%s %s '%s' image buffer view [0x%X:0x%X] length: %s" \
+                    % (eloc(self,"make_view"),self.__class__.__name__,self.name,\
+                        beg,beg+len(self),len(self.barray)))
+
     def updtAttr(self,asm,trace=False):
         if self.name=="":
             # Unnamed region or control section not in symbol table,
@@ -2706,8 +3099,8 @@ class Section(Content):
         return "%s %s in %s address: %s length: %s " \
             % (typ,self.name,reg,self.loc,len(self))
 
-    # Insert all of my Binary instance's bytes list into my bytearray.  Convert
-    # it to a bytes when done.
+    # Insert all of my Binary instance's bytes list into my view of the image buffer.
+    # Make it read-only when done.
     def insert(self,trace=False):
         my_loc=self.loc
         for bin in self.elements:
@@ -2739,8 +3132,9 @@ class Section(Content):
 
             self.barray[start:end]=barray
 
-        # Make me immutable
-        self.barray=bytes(self.barray)
+        # Make me immutable.  My content is my part of the image buffer, so the
+        # inserted bytes are already in the image.
+        self.barray=self.barray.toreadonly()
 
         if __debug__:
             if trace:
@@ -2769,8 +3163,17 @@ class Section(Content):
         self._current=address.value
         self._alloc=max(self._alloc,self._current)
 
-    def make_barray_all(self,trace=False):
-        self.make_barray(trace=trace)
+    # Create the content of the section and of each of its Binary elements.  A
+    # CSECT's content is its slice of the image buffer.  A DSECT, not being part of
+    # the image, has a bytearray of its own.
+    # Method Arguments:
+    #   trace  Specify True to trace the creation
+    #   view   A memoryview of the image buffer or None for a bytearray of its own
+    def make_barray_all(self,trace=False,view=None):
+        if view is None:
+            self.make_barray(trace=trace)
+        else:
+            self.make_view(view,trace=trace)
         for b in self.elements:
             b.make_barray(trace=trace)
 
@@ -2851,41 +3254,10 @@ class Region(Content):
     def lval(self):
         return self.loc.lval()
 
-    # Insert all of my CSECT instance's bytes list into my bytearray.  Convert
-    # it to a bytes when done.
+    # My CSECT's insert their Binary content directly into the image buffer of which
+    # my content is a view.  Make my view read-only when they are done.
     def insert(self,trace=False):
-        cls_str="assembler.py - %s.insert() -" % self.__class__.__name__
-        my_loc=self.loc
-        for c in self.elements:
-            c_loc=c.loc
-
-            assert c_loc.isAbsolute(),\
-                "%s enrountered non absolute address: %s" \
-                    % (eloc(self,"insert"),c)
-
-            # Calculate where the data is supposed to go
-            barray=c.barray
-            length=len(barray)
-            start=c_loc-my_loc
-            end=start+length
-            if length==0:
-                # A CSECT could have no data. Just ignore it
-                if __debug__:
-                    if trace:
-                        print("%s %s @ %s inserted CSECT %s [0x%X:0x%X] bytes: %s "
-                            "IGNORED" % (cls_str,self.name,c_loc,c.name,start,end,\
-                                length))
-                continue
-
-            if __debug__:
-                if trace:
-                    print("%s %s @ %s inserted CSECT %s [0x%X:0x%X] bytes: %s " \
-                        % (cls_str,self.name,c_loc,c.name,start,end,length))
-
-            self.barray[start:end]=barray
-
-        # Make me immutable
-        self.barray=bytes(self.barray)
+        self.barray=self.barray.toreadonly()
 
         if trace:
             self.dump()
@@ -2900,10 +3272,14 @@ class Region(Content):
         for n in self.elements:
             n.make_absolute(debug=debug)
 
-    def make_barray_all(self,trace=False):
-        self.make_barray(trace=trace)
+    # Create my content and that of my CSECT's as views of the image buffer.
+    # Method Arguments:
+    #   trace  Specify True to trace the creation
+    #   view   A memoryview of the image buffer
+    def make_barray_all(self,trace=False,view=None):
+        self.make_view(view,trace=trace)
         for c in self.elements:
-            c.make_barray_all(trace=trace)
+            c.make_barray_all(trace=trace,view=view)
 
 # This is the content container for Regions.  It is used to ultimately create
 # the binary image output provided by the Image object.
@@ -2937,43 +3313,23 @@ class Img(Content):
             r.dump_all()
         self.dump()
 
-    # Insert all of my Regions into my binary image byte array.  Convert it to a bytes
-    # list when done.
+    # Insert the content of each CSECT of each Region into the image buffer.  The
+    # Regions and CSECT's are views of the buffer, so each Binary's bytes are copied
+    # once, directly to their place in the image.  The buffer is made read-only when
+    # done.
     def insert(self,trace=False):
-        my_loc=0
         for r in self.elements:
             for c in r.elements:
                 c.insert(trace=trace)   # Insert all the Binary's into the CSECT
-            r.insert(trace=trace)       # Insert all the CSECT's into the Region
-            # Insert each region into the imaga
-
-            r_loc=r.img_loc
-
-            # Calculate where the data is supposed to go
-            barray=r.barray
-            length=len(barray)
-            start=r_loc-my_loc
-            end=start+length
-            self.barray[start:len(barray)]=barray
-
-            # A region could have no data. Just ignore it
-            if length==0:
-                if __debug__:
-                    if trace:
-                        print("%s: %s @ +0x%X inserted region %s [0x%X:0x%X] "
-                            "bytes: %s IGNORED" \
-                            % (eloc(self,"insert"),self.name,r_loc,r.name,start,end,\
-                                length))
-
-                continue
+            r.insert(trace=trace)       # Make the region read-only
 
             if __debug__:
                 if trace:
-                    print("%s %s @ +0x%X inserted region %s [0x%X:0x%X] bytes: %s " \
-                        % (eloc(self,"insert"),self.name,r_loc,r.name,start,end,\
-                            length))
+                    print("%s %s @ +0x%X region %s [0x%X:0x%X] bytes: %s " \
+                        % (eloc(self,"insert"),self.name,r.img_loc,r.name,\
+                            r.img_loc,r.img_loc+len(r),len(r)))
 
-        self.barray=bytes(self.barray)
+        self.barray=memoryview(self.barray).toreadonly()
 
         if trace:
             self.dump()
@@ -2989,10 +3345,13 @@ class Img(Content):
     def lval(self):
         return self.value().address
 
+    # Create the single image buffer.  Each Region and CSECT content is a memoryview
+    # of the part of the buffer it occupies.
     def make_barray_all(self,trace=False):
         self.make_barray(trace=trace)
+        view=memoryview(self.barray)
         for r in self.elements:
-            r.make_barray_all(trace=trace)
+            r.make_barray_all(trace=trace,view=view)
 
     def updtAttr(self,asm,trace=False):
         try:
@@ -3028,9 +3387,6 @@ class Img(Content):
 class LabelSymbol(asmbase.ASMSymEntry):
     def __init__(self,name,entry,length=None,T="U",S=0,I=0):
         super().__init__(name,entry,length=length,T=T,S=S,I=I)
-        # Assembler XREF information
-        self._defined=None       # source statement number defining the symbol
-        self._refs=[]            # source statements referencing this symbol
 
         # Define attributes:
         if length is None:
@@ -3055,14 +3411,6 @@ class LabelSymbol(asmbase.ASMSymEntry):
         raise ValueError("%s unexpected symbol table object '%s': %s" \
             % (eloc(self,"compute"),self.symbol,obj))
 
-    # Add a reference to the symbol
-    def reference(self,line):
-        assert isinstance(line,int),\
-            "%s 'line' argument must be an integer" % eloc(self,"reference")
-
-        if not line in self._refs:
-            self._refs.append(line)
-
 
 #
 #  +---------------+
@@ -3113,6 +3461,7 @@ class Literal(LabelSymbol):
 
         # See parse() method
         self.constant=None     # asmdcds.DCDS_Operand object
+        self.key=None          # Canonical key of the constant
 
         # See Pass0() method
         self.unique=False      # Whether this literal is unique.
@@ -3152,19 +3501,20 @@ class Literal(LabelSymbol):
             "%s Literal.state not 0: %s" \
                 % (assembler.eloc(self,"parse",module=this_module),self.state)
 
+        index=self.asm.LPM.index
         try:
-            scope=self.asm.PM.parse_constants(self.stmt,self.name[1:])
+            operands=index.operands(self.stmt,self.name)
         except AsmParserError as ape:
             raise AssemblerError(line=self.stmt.lineno,\
                 msg="literal operand %s invalid: %s" % (self.ndx+1,ape.msg)) from None
 
-        operands=scope.operands
         if len(operands)>1:
             raise AssemblerError(line=self.stmt.lineno,\
                 msg="literal operand %s has more than one constant type, found: %s"\
                     % (self.ndx+1,len(operands)))
 
         self.constant=operands[0]
+        self.key=index.key(self.name)
         if __debug__:
             if debug:
                 print("%s parsed constant: %s" \
@@ -3227,6 +3577,7 @@ class Image(object):
 
         self.aes=[]          # List of AssemblerError exceptions generated
         self.deck=None       # Supplied by AsmBinary.deck()
+        self.export=None     # Supplied by asmexport.ExportWriter.build()
         self.ldipl=None      # Supplied by AsmBinary.ldipl() - see Note below
         self.listing=None    # Supplied by Assembler.LM.create()
         self.mc=None         # Supplied by AsmBinary.mc_file()
@@ -3235,6 +3586,8 @@ class Image(object):
         self.load=None       # Supplied by Assembler.__finish()
         self.entry=None      # Supplied by Assembler.__finish()
         self.image=None      # Supplied by Assembler.__finish() from imqwip
+        # Note: self.image is a read-only memoryview of the image buffer.  Use
+        # bytes(self.image) where a bytes object is required.
         # Note: self.ldipl when used will contain a list of three element tuples
         # Each tuple will contain:
         #   tuple[0] - file name within the list directed IPL directory
@@ -3254,6 +3607,11 @@ class Image(object):
         for ae in aes:
             print(ae)
 
+    # Returns the number of reported errors excluding informational messages and
+    # warnings
+    def failures(self):
+        return len([ae for ae in self.aes if not (ae.info or ae.warning)])
+
 
 #
 #  +---------------------------------------+
@@ -3351,6 +3709,7 @@ class STMTProcessor(asmbase.ASMProcessor):
     def getStmts0_1(self,asm,fail=False,debug=False):
         fail=asm.fail
         mb=self.MB
+        prof=Stats.prof
         while True:
             ln=self.IM.getLogical(debug=debug)
             # Create the ASMStmt subclass for the operation and populate it
@@ -3364,7 +3723,11 @@ class STMTProcessor(asmbase.ASMProcessor):
                             % (eloc(self,"getStmts0_1"),self.lineno,\
                                 stmtcls.__name__))
             # Create the asmbase.ASMStmt subclass for the operation
-            asm.cur_stmt=s=stmtcls(self.lineno,ln)
+            if prof is None:
+                asm.cur_stmt=s=stmtcls(self.lineno,ln)
+            else:
+                asm.cur_stmt=s=prof.call("create",stmtcls.__name__,\
+                    stmtcls,self.lineno,ln)
             self.lineno+=1       # Increment global statement counter
             # Set the print status for this statement based upon the current
             # global settings and statement data.
@@ -3389,14 +3752,20 @@ class STMTProcessor(asmbase.ASMProcessor):
                 continue
 
             # WARNING: DO NOT set either argument debug or trace here
-            s.Pass0(asm,macro=mb)
+            if prof is None:
+                s.Pass0(asm,macro=mb)
+            else:
+                prof.call("pass0",stmtcls.__name__,s.Pass0,asm,macro=mb)
 
             if s.ignore:
                 # Errors in Pass0() method skipped here
                 continue
 
             # WARNING: DO NOT set either argument debug or trace here
-            s.Pass1(asm)
+            if prof is None:
+                s.Pass1(asm)
+            else:
+                prof.call("pass1",stmtcls.__name__,s.Pass1,asm)
 
     def Pass0_1(self,asm,fail=False,debug=False):
         Stats.start("pass1_p")
@@ -3486,30 +3855,38 @@ class STMTProcessor(asmbase.ASMProcessor):
         asm.cur_loc.establish(lnkbase.AbsAddr(0))
 
     def Pass2(self,asm,fail=False,debug=False):
+        prof=Stats.prof
         for s in asm.stmts:
             if s.ignore:
                 if __debug__:
                     if debug:
                         print("%s [%s] phase %s ignoring:\n    %s"
                            % (eloc(self,"Pass2"),s.lineno,self.cur_phase,s))
+                s.release()
                 continue
 
             asm.cur_stmt=s   # Make current statement referencable globally
 
             asm._track_loc(s)
 
+            if prof is None:
+                pass2=s.Pass2
+            else:
+                pass2=prof.wrapper("pass2",s.__class__.__name__,s.Pass2)
+
             if fail:
                 # WARNING: DO NOT set either argument debug or trace here
-                s.Pass2(asm)
+                pass2(asm)
             else:
                 try:
                     # WARNING: DO NOT set either argument debug or trace here
-                    s.Pass2(asm)
+                    pass2(asm)
                 except AssemblerError as ae:
                     asm._ae_excp(ae,s,string=eloc(self,"Pass2"),debug=False)
 
             asm.cur_loc.increment(s.content)
             asm.cur_stmt=None   # De-reference the current statement
+            s.release()         # Parser intermediates are no longer needed
 
     def Pass2_Post(self,asm,fail=False,debug=False):
         # Complete the image build
@@ -3523,7 +3900,12 @@ class STMTProcessor(asmbase.ASMProcessor):
         Stats.start("output_p")
         Stats.start("output_w")
         asm._finish()    # Complete the Image before providing to listing generator
-        asm.LM.create()  # Generate listing and place it in the final Image object
+        # Generate listing and place it in the final Image object or write it to
+        # the listing file as it is generated.
+        if asm.aout.lstream:
+            asm.aout.stream_listing(asm.LM)
+        else:
+            asm.LM.create()
         Stats.stop("output_w")
         Stats.stop("output_p")
 
@@ -3538,6 +3920,15 @@ class STMTProcessor(asmbase.ASMProcessor):
         if asm.stats:
             print(Stats.report())
 
+        # Report and write the profile measurements if requested
+        if Stats.prof is not None and asm.profile is not None:
+            print(Stats.prof.report(sort=asm.profsort))
+            try:
+                Stats.prof.write(asm.profile,summary=Stats.summary())
+            except OSError as oe:
+                print("%s could not write profile file %s: %s" \
+                    % (eloc(self,"final"),asm.profile,oe))
+
         # Return to asma.py True to indicate successful execution
         return True
 
@@ -3590,8 +3981,14 @@ class STMTProcessor(asmbase.ASMProcessor):
 # used to prematurely close the input source file when prematurely terminating
 # the processing of the maclib file.  Mention is made of this purely for any
 # future changes and something about which to be aware.
+#
+# Instance Arguments:
+#   asm       The assembler.Assembler object
+#   depth     The number of nested input sources allowed.  Defaults to 1.
+#   cache     Directory of saved library macro definitions.  If None, macro library
+#             files are always processed.  Defaults to None.
 class MACLIBProcessor(asmbase.ASMProcessor):
-    def __init__(self,asm,depth=1):
+    def __init__(self,asm,depth=1,cache=None):
         super().__init__(asm)
 
         self.infile=None        # Supplied by the run() method
@@ -3609,6 +4006,11 @@ class MACLIBProcessor(asmbase.ASMProcessor):
         self.IM=asmline.LineMgr(asm,self.MB,depth=depth,env="MACLIB",\
             pathmgr=asm.macpath)
 
+        # Saved library macro definitions (asmmacs.MacroCache object)
+        self.cache=None
+        if cache is not None:
+            self.cache=asmmacs.MacroCache(cache,asm)
+
         # Supplied by run() method
         self.macro=None         # Macro name being defined from library
         self.infile=None        # Supplied by the run() method
@@ -3803,8 +4205,28 @@ class MACLIBProcessor(asmbase.ASMProcessor):
         # Open the macro definition from the MACLIB path
         self.open_same_case(macname)
 
+        # Saved definitions are keyed by the operation synonyms in effect
+        cache=self.cache
+        if cache is not None:
+            # The file just opened is the last one in the input manager
+            filepath=self.IM.LB._files[-1].fname
+            macros=cache.load(filepath)
+            if macros is not None:
+                # Define the saved macros instead of processing the file
+                self.IM.LB.closeSource()  # without BufferEmpty being triggered
+                for mac in macros:
+                    self.MB.addMacro(mac)
+                return None
+            self.MB.added=[]
+
         # Process the MACLIB file
-        result=self.process()
+        try:
+            result=self.process()
+        finally:
+            macros=self.MB.added
+            self.MB.added=None
+        if cache is not None and result is None and len(macros)!=0:
+            cache.save(filepath,macros)
         #print("assembler.MACLIBProcessor.run process result: class %s - %s" \
         #    % (result.__class__.__name__,result))
 
@@ -73,6 +73,10 @@ class Builder(object):
         # tuple of ranges for signed fields
         self.fld_srange=[(None,None),(None,None)]
 
+        # Compiled instruction encoders by (mnemonic, format ID).  None indicates
+        # the instruction can not be compiled.  See the encoder() method.
+        self.encoders={}
+
         # Calculate signed and unsigned values for signed and unsigned fields upto
         # 64-bits, the maximum single field used in any instruction or other structure.
         for n in range(1,65):
@@ -113,13 +117,22 @@ class Builder(object):
         line=stmt.lineno      # Source object of statement's input location
         if trace:
             insn.dump()       # Dump the MSL DB information
+            barray=None
+        else:
+            # Use the compiled encoder when the operand values allow it
+            encoder=self.encoder(insn,fmt)
+            if encoder is None:
+                barray=None
+            else:
+                barray=encoder.encode(stmt.bin_oprs)
 
-        # Marshall what we need to create the instruction
-        i=Instruction(stmt.bin_oprs,insn,fmt,line)
-        if trace:
-            i.dump()
-        # NOW!!! build the instruction
-        barray=i.generate(self)
+        if barray is None:
+            # Marshall what we need to create the instruction
+            i=Instruction(stmt.bin_oprs,insn,fmt,line)
+            if trace:
+                i.dump()
+            # NOW!!! build the instruction
+            barray=i.generate(self)
 
         if trace:
             print("%s: " % insn.mnemonic)
@@ -132,6 +145,27 @@ class Builder(object):
         bin=stmt.content    # Get Binary object from the Stmt
         bin.update(barray,at=0,full=True,finalize=True,trace=trace)
 
+    # Returns the compiled Encoder object of an instruction or None if the
+    # instruction can not be compiled.  The Encoder is created the first time the
+    # instruction and format are used.
+    # Method Arguments:
+    #   insn     The MSLentry object of the instruction
+    #   fmt      The msldb.Format object of the instruction
+    def encoder(self,insn,fmt):
+        key=(insn.mnemonic,fmt.ID)
+        try:
+            return self.encoders[key]
+        except KeyError:
+            pass
+        try:
+            enc=Encoder(insn,fmt,self)
+        except Exception:
+            # The Instruction object reports the problem when the instruction is
+            # built.
+            enc=None
+        self.encoders[key]=enc
+        return enc
+
     # This method performs a check on the presented value for its fit in a field
     # of a specific size.  The check is sensitive to signed and unsigned data.
     # A RangeCheckError is raised if the check fails.  The caller should except the
@@ -323,7 +357,10 @@ class AOper(object):
         self.filtered=filtered
 
     # Returns a list of Field objects with their respective values from the assembly
-    def fields(self,fmt):
+    # Method Arguments:
+    #   fmt    The msldb.Format object of the instruction
+    #   line   The statement number of the instruction
+    def fields(self,fmt,line):
         mach=fmt.mach  # Dictionary of machine field definitions
         my_fields=[]
         # Determine values for all fixed content fields
@@ -557,7 +594,7 @@ class Instruction(object):
         #   Step 2b - add the other fields to the list from the assembler output and
         #             msldb.Format object.
         for aop in self.aops:
-            flds=aop.fields(self.fmt)
+            flds=aop.fields(self.fmt,self.line)
             # Add the operand's fields it is sourcing to the list.
             self.fields.extend(flds)
         # The final fields list now has everything needed to build the instruction.
@@ -582,5 +619,105 @@ class Instruction(object):
         return inst.to_bytes(self.length,byteorder="big",signed=False)
 
 
+# This class is a compiled form of the Instruction class for a specific instruction
+# and format.  The opcode and fixed content fields are combined once into the
+# constant content of the instruction.  Each field sourced from a statement operand
+# is reduced to its precomputed shift, mask and range.  Encoding an instruction
+# packs the operand values without creating AOper or Field objects.
+#
+# Encoding only succeeds when every value is an integer within its field's range.
+# Otherwise the Instruction object must build the instruction so that errors are
+# reported as they always have been.
+#
+# Instance Arguments:
+#   inst   The MSLentry object of the instruction
+#   fmt    The msldb.Format object of the instruction
+#   bldr   The Builder object providing field ranges
+# Exceptions:
+#   Any exception indicates the instruction can not be compiled
+class Encoder(object):
+    def __init__(self,inst,fmt,bldr):
+        self.mnemonic=inst.mnemonic   # Instruction mnemonic
+        self.length=fmt.length        # Instruction length in bytes
+        inst_bits=fmt.length*8
+        mach=fmt.mach                 # Dictionary of msldb.mfield objects
+        self.operands=len(fmt.soper_seq)  # Number of statement operands
+
+        # Constant fields in the order inserted by the Instruction object
+        opc_fields=fmt.opcode
+        const=[Field(mfield=opc_fields["OP"],value=inst.opcode[0]),]
+        if "OPX" in opc_fields:
+            const.append(Field(mfield=opc_fields["OPX"],value=inst.opcode[1]))
+        if self.operands:
+            for mfield,mf in mach.items():
+                if mf.fixed:
+                    const.append(Field(mfield=mf,value=inst.fixed[mfield]))
+        base=0
+        for fld in const:
+            base=fld.insert(self.length,base,bldr,None,signed=fld.signed)
+        self.base=base                # Constant content of the instruction
+
+        # Operand sourced fields.  Each is a tuple:
+        #   (operand index, machine field type, filter method or None, vector,
+        #    left shift, minimum value, maximum value, mask, RXB bit)
+        filtered=inst.filters
+        fields=[]
+        for n,name in enumerate(fmt.soper_seq):
+            for mfield in fmt.soper[name].mfields:
+                mf=mach[mfield]
+                filter_method=None
+                if len(filtered)>0:
+                    filter_name=filtered.get(mfield)
+                    if filter_name:
+                        filter_method=AOper.filters.fms[filter_name]
+                size=mf.end-mf.beg+1
+                if mf.signed:
+                    cmin,cmax=bldr.fld_srange[size]
+                else:
+                    cmin,cmax=bldr.fld_range[size]
+                shift=inst_bits-size-mf.beg
+                fields.append((n,mf.typ,filter_method,mf.typ=="V",shift,\
+                    cmin,cmax,bldr.fld_range[size][1],mf.rxb))
+        self.fields=fields
+
+        # Position of the RXB field of vector register instructions
+        self.rxb=None
+        if "RXB" in mach:
+            mf=mach["RXB"]
+            self.rxb=inst_bits-(mf.end-mf.beg+1)-mf.beg
+
+    # Generate the instruction as a list of bytes.
+    # Method Argument:
+    #   operands   The list of asmbase.Operand objects of the statement
+    # Returns:
+    #   the instruction as a bytes list or None if the Instruction object must
+    #   build the instruction
+    def encode(self,operands):
+        if len(operands)!=self.operands:
+            return None
+        inst=self.base
+        rxb=0
+        for n,typ,filter_method,vector,shift,cmin,cmax,mask,rxb_bit in self.fields:
+            value=operands[n].field(typ)
+            if filter_method is not None:
+                value=filter_method(value)
+            if value.__class__ is not int:
+                return None
+            if vector:
+                if value<0 or value>31:
+                    return None
+                if value>15:
+                    rxb |= rxb_bit
+                value &= 0xF
+            if value<cmin or value>cmax:
+                return None
+            inst |= (value & mask) << shift
+        if rxb:
+            if self.rxb is None:
+                return None
+            inst |= rxb << self.rxb
+        return inst.to_bytes(self.length,byteorder="big",signed=False)
+
+
 if __name__ == "__main__":
     raise NotImplementedError("insnbldr.py - intended for import use only")
@@ -18,12 +18,17 @@
 
 # This module supports literal pools and their management.  Actual Literal objects
 # are defined in the assembler module due to object reference dependencies.
+#
+# Each distinct literal string is parsed once per assembly by the LiteralIndex
+# object of the LiteralPoolMgr.  Literal pool entries are identified by the
+# canonical key of their constant rather than by the literal string.
 
 # Python imports: None
 # SATK imports: None
 # ASMA imports: None
 import asmbase
 import asmline
+import asmtokens
 import assembler
 
 this_module="literal.py"
@@ -43,7 +48,8 @@ class LiteralPool(asmbase.ASMSymTable):
     def __init__(self):
         super().__init__(assembler.Literal,"TtSsIiLl",wo=True,case=True)
         self._align=0        # Required alignment of the pool
-        self.literals={}     # Dictionary of shared literals identified by its string
+        self.literals={}     # Dictionary of shared literals by canonical key
+        self.strings={}      # Dictionary of shared literals by literal string
         self.unique=[]       # List of unshared unqiue literal
         self.ltorg=None      # The asmstmts.LTORG object creating this pool
 
@@ -138,13 +144,21 @@ class LiteralPool(asmbase.ASMSymTable):
             "%s 'lit_str' argument is not a valid literal: '%s'" \
                 % (assembler.eloc(self,"fetch",module=this_module),lit_str)
 
-        lit=self.literals[lit_str]
+        lit=self.strings[lit_str]
         if __debug__:
             if debug:
                 print("%s RETURNING LITERAL OBJECT: %r" \
                     % (assembler.eloc(self,"fetch",module=this_module),lit))
         return lit
 
+    # Return the shared Literal object of a canonical key
+    # Method Argument:
+    #   key   the canonical key of the literal's constant
+    # Exception:
+    #   KeyError if no shared literal has the key
+    def fetch_key(self,key):
+        return self.literals[key]
+
     # Return all of the literals as a list
     def getList(self):
         lst=list(self.literals.values())
@@ -175,6 +189,10 @@ class LiteralPool(asmbase.ASMSymTable):
     #   lit     an assembler.Literal being added to the pool
     #   line    the line number of the initial referencing statement
     def literal_new(self,lit,line,debug=False):
+        # Literals are not held by the symbol table dictionary, but their references
+        # are queried through the pool's cross-reference store
+        if lit._xref is None:
+            self.xrefs.add(lit)
         lit.reference(line)
         if lit.unique:
             self.unique.append(lit)
@@ -184,7 +202,8 @@ class LiteralPool(asmbase.ASMSymTable):
                         % (assembler.eloc(self,"literal_new",module=this_module),\
                             line,self.pool_id,lit))
         else:
-            self.literals[lit.name]=lit
+            self.literals[lit.key]=lit
+            self.strings[lit.name]=lit
             if __debug__:
                 if debug:
                     print("%s [%s] LITERAL POOL %s ADDING: %r" \
@@ -199,6 +218,114 @@ class LiteralPool(asmbase.ASMSymTable):
             self.group(lit)
 
 
+# This class parses each distinct literal string once per assembly.  The parsed
+# asmdcds.DCDS_Operand objects are retained and each Literal object receives a copy
+# of them.  A literal string used in many literal pools, or a unique literal used
+# many times, is not parsed again.
+#
+# Each parsed literal string is assigned the canonical key of its constant: its
+# type, duplication factor, length modifier and nominal values.  Literal strings
+# differing only in how the type is written, for example =f'1' and =F'1', have the
+# same key and share one entry of a literal pool.  Nominal values producing the
+# same constant are also normalized: hexadecimal digits ignore case, embedded
+# spaces are ignored and fixed-point values ignore leading zeros.  For example
+# =X'0a' and =X'0A', or =F'01' and =F'1', share one entry.  Leading zeros of
+# hexadecimal, binary and decimal values are retained because the number of
+# digits determines the implied length of the constant.
+#
+# Instance Argument:
+#   asm    The global assembler.Assembler object
+class LiteralIndex(object):
+    def __init__(self,asm):
+        self.asm=asm         # The global assembler.Assembler object
+        self.parsed={}       # Parsed DCDS_Operand object lists by literal string
+        self.keys={}         # Canonical keys by literal string
+        self.parses=0        # Number of literal strings parsed
+        self.reuses=0        # Number of times a parsed literal string was reused
+
+    def __len__(self):
+        return len(self.parsed)
+
+    # Returns the canonical key of a parsed DCDS_Operand object
+    @staticmethod
+    def canonical(opnd):
+        values=[]
+        for val in opnd._values:
+            if isinstance(val,list):
+                values.append(tuple(ltok.string for ltok in val))
+            else:
+                values.append(LiteralIndex.nominal(val))
+        return (opnd.typ.typ.upper(),\
+                tuple(ltok.string for ltok in opnd._dup_expr),\
+                tuple(ltok.string for ltok in opnd._len_expr),\
+                tuple(values))
+
+    # Count an event in the profiler when profiling
+    @staticmethod
+    def count(name):
+        prof=assembler.Stats.prof
+        if prof is not None:
+            prof.count(name)
+
+    # Returns the canonical form of a nominal value's lexical token.  Values whose
+    # form is not normalized are identified by the token's string.
+    #
+    # An explicit plus sign assembles the same value as no sign.  So does the
+    # unsigned indicator, U, of the binary fixed point types, F, H and FD, whose
+    # nominal values are never negative without a minus sign.  The unsigned
+    # indicator of packed and zoned decimal types selects a different sign code.
+    @staticmethod
+    def nominal(ltok):
+        if isinstance(ltok,asmtokens.DCDS_Hex_Token):
+            return ("X",ltok.digs.upper())
+        if isinstance(ltok,asmtokens.DCDS_Bin_Token):
+            return ("B",ltok.digs)
+        if isinstance(ltok,asmtokens.DCDS_Number_Token):
+            digs=ltok.digs
+            if digs:
+                digs="%d" % int(digs,10)
+            sgn=ltok.sgn
+            if sgn in ("+","U"):
+                sgn=None
+            return ("F",sgn,digs)
+        if isinstance(ltok,asmtokens.DCDS_Dec_Token):
+            sgn=ltok.sgn
+            if sgn=="+":
+                sgn=None
+            return ("P",sgn,ltok.integer,ltok.fraction)
+        return ltok.string
+
+    # Returns the canonical key of a parsed literal string
+    # Exception:
+    #   KeyError if the literal string has not been parsed
+    def key(self,lit_str):
+        return self.keys[lit_str]
+
+    # Returns a list of the asmdcds.DCDS_Operand objects of a literal string's
+    # constants for use by a statement.  The string is parsed when first used.
+    # Method Arguments:
+    #   stmt     The statement referencing the literal
+    #   lit_str  The literal string including its leading equal, =, sign.
+    # Exception:
+    #   assembler.AsmParserError if the literal string can not be parsed.  Strings
+    #   failing to parse are not retained and are parsed again when used again.
+    def operands(self,stmt,lit_str):
+        try:
+            parsed=self.parsed[lit_str]
+            self.reuses+=1
+            LiteralIndex.count("literal parses reused")
+        except KeyError:
+            scope=self.asm.PM.parse_constants(stmt,lit_str[1:])
+            # The parsed operands are retained for copying.  They are not used by
+            # a statement.
+            parsed=self.parsed[lit_str]=scope.operands
+            if len(parsed)==1:
+                self.keys[lit_str]=LiteralIndex.canonical(parsed[0])
+            self.parses+=1
+            LiteralIndex.count("literal parses")
+        return [opnd.clone(stmt) for opnd in parsed]
+
+
 # This object maintains the group of literals in the sequence constructed.
 class LiteralGroup(object):
     def __init__(self,size=None):
@@ -243,6 +370,7 @@ class LiteralPoolMgr(object):
         self.pools=[]        # List of literal pools in the order of creation
         self.cur_pool=None   # Current active literal pool
         self.pool_ndx=None   # Current pool index
+        self.index=LiteralIndex(asm)  # Parsed literal strings
         self.pool_new()      # Create the initial literal pool
 
     # Fetchs from the current literal pool the Literal object for the presented 
@@ -259,6 +387,26 @@ class LiteralPoolMgr(object):
         entry.reference(line)
         return entry
 
+    # Returns the Literal object of the current literal pool sharing the constant
+    # of a newly parsed literal written differently.  The literal string is added
+    # to the pool so later references to it find the shared Literal object.
+    # Method Arguments:
+    #   lit    The parsed assembler.Literal object
+    #   line   The line number of the referencing statement
+    # Exception:
+    #   KeyError if the current pool does not have a literal sharing the constant
+    def share(self,lit,line,debug=False):
+        pool=self.cur_pool
+        entry=pool.fetch_key(lit.key)
+        pool.strings[lit.name]=entry
+        entry.reference(line)
+        if __debug__:
+            if debug:
+                print("%s [%s] LITERAL POOL %s SHARING %r WITH: %r" \
+                    % (assembler.eloc(self,"share",module=this_module),\
+                        line,pool.pool_id,lit.name,entry))
+        return entry
+
     # Generate the pool and create the new pool
     # Returns:
     #   the LiteralPool object corresponding to this pool
@@ -27,6 +27,7 @@ this_module="model.py"
 # ASMA imports:
 import assembler
 import asmbase
+import asminput
 import macopnd
 import macsyms
 
@@ -87,6 +88,13 @@ class Model(object):
         self.roper=None
         self.ropnd=[]
 
+        # Statement template.  See template() method
+        self.dynamic=[]           # Indexes of operands requiring replacement
+        self.fixed=False          # Whether no symbolic replacement ever occurs
+        self.fixed_ok=False       # Whether fixed fields allow pre-split operands
+        self.opnd_col=None        # Operand field start of the generated line
+        self.static=None          # Generated (lines,presplit) of a fixed model
+
         # Handle loud comment model statements here
         self.loud=None
         logline=stmt.logline
@@ -147,7 +155,9 @@ class Model(object):
 
     # Generate one or more physical lines for macro source object
     # Returns:
-    #   a list of strings, one per "physical line" from the macro source
+    #   a list of strings, one per "physical line" from the macro source, or
+    #   a list of one asminput.ModelLine object whose operands have already been
+    #   located from the template
     def create(self,debug=False):
         ddebug=self.debug or debug
         if self.loud is not None:
@@ -158,11 +168,30 @@ class Model(object):
                             self.loud))
             return [self.loud,]
 
+        if self.static is not None:
+            # Fixed model statement, reuse the lines generated the first time
+            lines,presplit=self.static
+        else:
+            lines=self.lines(debug=debug)
+            presplit=self.presplit(lines)
+            if self.fixed:
+                self.static=(lines,presplit)
+
+        if presplit is None:
+            return list(lines)
+        return [asminput.ModelLine(lines[0],presplit),]
+
+    # Generate the physical lines of the statement from the replaced fields
+    # Returns:
+    #   a list of strings, one per "physical line" from the macro source
+    def lines(self,debug=False):
+        ddebug=self.debug or debug
+
         # Generate the model statement fields
         label=self.rlbl.ljust(max(8,len(self.rlbl)))
         if __debug__:
             if ddebug:
-                cls_str=assembler.eloc(self,"create",module=this_module)
+                cls_str=assembler.eloc(self,"lines",module=this_module)
                 print("%s label: '%s'" % (cls_str,label))
 
         line="%s %s" % (label,self.roper)
@@ -182,6 +211,7 @@ class Model(object):
             if self.debug:
                 print("%s operands: '%s'" % (cls_str,operands))
 
+        self.opnd_col=len(line)+1
         line="%s %s" % (line,operands)
         if __debug__:
             if ddebug:
@@ -216,7 +246,7 @@ class Model(object):
         # pline is the last or maybe only physical line.  It gets the comment
         assert pline is not None,\
             "%s last generated physical line with operands not present" \
-                % assembler.eloc(self,"create",module=this_module)
+                % assembler.eloc(self,"lines",module=this_module)
 
         if self.comment_pos is not None:
             ndx=0
@@ -253,7 +283,7 @@ class Model(object):
 
         assert pline is not None,\
             "%s last generated physical line with comments not present" \
-               % assembler.eloc(self,"create",module=this_module)
+               % assembler.eloc(self,"lines",module=this_module)
 
         # Add the last physical line to the list
         plines.append(pline)
@@ -262,7 +292,7 @@ class Model(object):
             if ddebug:
                 for n,p in enumerate(plines):
                     print('%s returning[%s]: "%s"' \
-                        % (assembler.eloc(self,"create",module=this_module),n,p))
+                        % (assembler.eloc(self,"lines",module=this_module),n,p))
 
         return plines
 
@@ -324,6 +354,7 @@ class Model(object):
         self.parse_label(asm,stmt,debug=ddebug)
         self.parse_operands(asm,stmt,debug=ddebug)
         self.find_comment(stmt,debug=ddebug)
+        self.template(debug=ddebug)
 
     # Performs a symbolic replacement parse of the label field
     def parse_label(self,asm,stmt,debug=False):
@@ -381,9 +412,42 @@ class Model(object):
         result.prepare(stmt,"[%s] model-%s" % (stmt.lineno,desc))
         return result.ctoken()
 
+    # Locate the operands within the single generated physical line so that the
+    # assembler need not separate them again with the asmline.cfsm parser.
+    # Returns:
+    #   a tuple of the operand field starting index, a list of the located operands
+    #   and the comment field starting index (or None), or
+    #   None if the generated line must be scanned by the assembler because it is
+    #   continued or symbolic replacement may have altered the operand boundaries
+    def presplit(self,lines):
+        if not self.fixed_ok or len(lines)!=1 or lines[0][-1]=="\\":
+            return None
+        ropnd=self.ropnd
+        if len(ropnd)==0 or not ropnd[-1]:
+            # Omitted trailing operands are subject to the operation's format
+            return None
+        if not self.roper or " " in self.roper or " " in self.rlbl:
+            return None
+        for n in self.dynamic:
+            if not Model.separable(ropnd[n]):
+                return None
+
+        opnds=[]
+        ndx=self.opnd_col
+        for opnd in ropnd:
+            if opnd:
+                opnds.append((opnd,ndx))
+            else:
+                opnds.append(None)
+            ndx+=len(opnd)+1
+        return (self.opnd_col,opnds,self.comment_pos)
+
     # Perform any required symbolic replacement
     def replace(self,exp,debug=False):
         ddebug=self.debug or debug
+        if self.static is not None:
+            # Fixed model statement lines have already been generated
+            return
         # Make sure my fields are empty
         self.rlbl=""
         self.roper=None
@@ -423,6 +487,48 @@ class Model(object):
                             self.stmt.lineno,n,res))
             self.ropnd.append(res)
 
+    # Determines whether an operand remains a single operand when recognized by
+    # the asmline.cfsm parser without regard to the statement's operand format.
+    # Operands with spaces or quotes are never considered separable.
+    # Returns:
+    #   True if the operand's boundaries are unaffected by its content
+    #   False if the operand must be scanned
+    @staticmethod
+    def separable(opnd):
+        if " " in opnd or "'" in opnd:
+            return False
+        parens=0
+        for c in opnd:
+            if c=="(":
+                parens+=1
+            elif c==")":
+                parens-=1
+                if parens<0:
+                    return False
+            elif c=="," and parens==0:
+                return False
+        return parens==0
+
+    # Establish the model statement template from the parsed fields.  Fixed
+    # fields are those without symbolic replacement.  Operands requiring symbolic
+    # replacement are the template's substitution points.
+    def template(self,debug=False):
+        self.dynamic=[]
+        fixed_ok=True
+        for n,opnd in enumerate(self.operands):
+            if isinstance(opnd,str):
+                fixed_ok=fixed_ok and Model.separable(opnd)
+            else:
+                self.dynamic.append(n)
+        self.fixed_ok=fixed_ok
+        self.fixed=len(self.dynamic)==0 and isinstance(self.label_fld,str) \
+            and isinstance(self.oper_fld,str)
+        if __debug__:
+            if debug:
+                print("%s [%s] fixed: %s fixed_ok: %s substitutions: %s" \
+                    % (assembler.eloc(self,"template",module=this_module),\
+                        self.stmt.lineno,self.fixed,self.fixed_ok,self.dynamic))
+
 
 if __name__ == "__main__":
     raise NotImplementedError("%s - this module only supports import usage" \
@@ -114,7 +114,11 @@
 
 # PYthon imports:
 import argparse          # Access the command line parser
+import copy              # Access shallow copies for compiled database creation
 import functools         # Allow sorting of objects
+import hashlib           # Access digests of MSL files for the compiled cache
+import os                # Access file system operations for the compiled cache
+import pickle            # Access persistence of the compiled database
 import re                # Access regular expression support (see Format.source_proc)
 import sys               # Access to exit() method to terminate run
 
@@ -1676,5 +1680,202 @@ class xref(object):
     def check(self):
         return len(self.refs)>0 or self.top
 
+
+#
+#  +---------------------------------------+
+#  |                                       |
+#  |   Compiled MSL Database Persistence   |
+#  |                                       |
+#  +---------------------------------------+
+#
+
+# Dictionary of compiled database entries.  Each entry is held in its pickled
+# form until it is first accessed.  This allows a compiled CPUX object to be
+# loaded without recreating all of its Inst and Format objects.  Only those
+# actually used by an assembly are recreated.
+class CPUXdict(dict):
+    def __getitem__(self,key):
+        item=super().__getitem__(key)
+        if isinstance(item,bytes):
+            item=pickle.loads(item)
+            super().__setitem__(key,item)
+        return item
+
+    def get(self,key,default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        return [(key,self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+
+# This class manages a directory of compiled, expanded CPU definitions.  A
+# compiled CPU definition is the CPUX object returned by the MSL.expand() method
+# saved in a file.  A file is identified by the requested MSL file name, the
+# expanded CPU and the MSL search path directories.  The file is valid only if
+# every MSL file read while building the database, the primary file and its
+# included files, has not changed since the compiled file was created.
+#
+# Warning: compiled files are Python pickles.  The cache directory must not be
+# writable by untrusted users.
+#
+# Instance Arguments:
+#   directory   The directory in which compiled CPU definitions reside.  It is
+#               created if it does not exist.
+#   debug       Specify True to print cache activity messages.
+class CPUXcache(object):
+    version=1        # Compiled file format version.  Increment on any change.
+    ext=".mslc"      # Compiled file extension
+
+    def __init__(self,directory,debug=False):
+        self.directory=directory  # Directory containing compiled files
+        self.debug=debug          # Print cache activity
+        self.files=[]             # MSL files of the CPUX object returned by load()
+
+    # Return the file system path of the compiled file for a request.
+    def __cache_file(self,mslfile,cpu,dirs):
+        key="%s|%s|%s|%s|%s" \
+            % (CPUXcache.version,sys.hexversion,mslfile,cpu,os.pathsep.join(dirs))
+        name=hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory,"%s%s" % (name,CPUXcache.ext))
+
+    # Return the digest of a file's contents or None if the file can not be read
+    @staticmethod
+    def digest(filepath):
+        try:
+            with open(filepath,"rb") as fo:
+                return hashlib.sha1(fo.read()).hexdigest()
+        except OSError:
+            return None
+
+    # Return the search path directories used by an MSL object for includes
+    @staticmethod
+    def dirs(msl):
+        try:
+            return msl.opath.paths[msl.soplpath].dir_list
+        except KeyError:
+            return []
+
+    # Locate the primary MSL file the same way SOPL does when opening it.
+    # Returns the path of the file or None if not found.
+    @staticmethod
+    def locate(mslfile,dirs):
+        if os.path.isabs(mslfile) or len(dirs)==0:
+            if os.path.isfile(mslfile):
+                return mslfile
+            return None
+        for d in dirs:
+            filepath=os.path.join(d,mslfile)
+            if os.path.isfile(filepath):
+                return filepath
+        return None
+
+    # Returns a previously compiled CPUX object or None if one is not available
+    # or is not valid for the current MSL files.
+    # Method Arguments:
+    #   msl      The MSL object that would build the database.  It supplies the
+    #            search path.  The object itself is not built.
+    #   mslfile  The requested MSL file name
+    #   cpu      The CPU ID being expanded
+    def load(self,msl,mslfile,cpu):
+        dirs=CPUXcache.dirs(msl)
+        cfile=self.__cache_file(mslfile,cpu,dirs)
+        try:
+            with open(cfile,"rb") as fo:
+                compiled=pickle.load(fo)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            if self.debug:
+                print("msldb.py - CPUXcache.load() - ignoring unreadable "
+                    "compiled file %s: %s" % (cfile,e))
+            return None
+
+        try:
+            if compiled["version"]!=CPUXcache.version:
+                return None
+            files=compiled["files"]
+            cpux=compiled["cpux"]
+        except (TypeError,KeyError):
+            return None
+
+        # The primary file must still be the one found in the search path and
+        # no file used to build the database may have changed.
+        if len(files)==0 or files[0][0]!=CPUXcache.locate(mslfile,dirs):
+            return None
+        for filepath,digest in files:
+            if CPUXcache.digest(filepath)!=digest:
+                if self.debug:
+                    print("msldb.py - CPUXcache.load() - MSL file changed: %s" \
+                        % filepath)
+                return None
+
+        if self.debug:
+            print("msldb.py - CPUXcache.load() - using compiled file: %s" % cfile)
+        self.files=[filepath for filepath,digest in files]
+        return cpux
+
+    # Saves a CPUX object in the cache.  The supplied CPUX object is not altered.
+    # Returns True if the compiled file was written, False otherwise.
+    # Method Arguments:
+    #   msl      The MSL object that built the database for the CPUX object.
+    #   mslfile  The requested MSL file name
+    #   cpu      The CPU ID that was expanded
+    #   cpux     The CPUX object being saved.
+    def save(self,msl,mslfile,cpu,cpux):
+        assert isinstance(cpux,CPUX),\
+            "msldb.py - %s.save() - 'cpux' argument must be a CPUX object: %s" \
+                % (self.__class__.__name__,cpux)
+
+        files=[]
+        for filepath in msl.files:
+            digest=CPUXcache.digest(filepath)
+            if digest is None:
+                return False
+            files.append((filepath,digest))
+
+        # Compiled entries do not need the SOPL statements from which they were
+        # built.
+        compiled=copy.copy(cpux)
+        compiled.inst=CPUXdict()
+        for key,inst in cpux.inst.items():
+            c=copy.copy(inst)
+            c.els=None
+            compiled.inst[key]=pickle.dumps(c,protocol=pickle.HIGHEST_PROTOCOL)
+        compiled.formats=CPUXdict()
+        for key,fmt in cpux.formats.items():
+            c=copy.copy(fmt)
+            c.els=None
+            compiled.formats[key]=pickle.dumps(c,protocol=pickle.HIGHEST_PROTOCOL)
+
+        data={"version":CPUXcache.version,"files":files,"cpux":compiled}
+        cfile=self.__cache_file(mslfile,cpu,CPUXcache.dirs(msl))
+        # Write a temporary file and rename it so that concurrent assemblies
+        # never see a partially written compiled file.
+        tfile="%s.%s" % (cfile,os.getpid())
+        try:
+            os.makedirs(self.directory,exist_ok=True)
+            with open(tfile,"wb") as fo:
+                pickle.dump(data,fo,protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tfile,cfile)
+        except OSError as e:
+            if self.debug:
+                print("msldb.py - CPUXcache.save() - could not write compiled "
+                    "file %s: %s" % (cfile,e))
+            try:
+                os.remove(tfile)
+            except OSError:
+                pass
+            return False
+
+        if self.debug:
+            print("msldb.py - CPUXcache.save() - compiled file written: %s" % cfile)
+        return True
+
 if __name__ == "__main__":
     raise NotImplementedError("msldb.py - intended for import use only")
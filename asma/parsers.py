@@ -20,8 +20,9 @@
 
 this_module="parsers.py"
 
-# Python imports: None
-# SATK imports: None
+# Python imports:
+import time        # Measure lexer and parser construction
+# SATK imports:
 import fsmparser   # Access Finite-State Machine based parsers
 import lexer       # Access lexical analyzers
 import pratt3      # Access pratt exceptions
@@ -758,11 +759,109 @@ class START_Scope(asmbase.AsmCtxScope):
 #  +-----------------------------+
 #
 
+# Lexers shared by all ParserMgr objects of the process.  See the snapshot() function.
+SNAPSHOT={}
+
+# Build the lexers shared by all later ParserMgr objects of the process.  Lexers
+# depend only upon the debug manager's lexer debug settings, so a ParserMgr uses
+# the snapshot only when lexer debugging is disabled and the assembly is not being
+# profiled.  A process assembling multiple sources, for example asmabatch.py, builds
+# the snapshot once before the assemblies start.
+# Function Argument:
+#   dm   The debug manager used to build the lexers
+def snapshot(dm):
+    if ParserMgr.shareable(dm):
+        for name,lexcls in ParserMgr.lexer_classes.items():
+            if name not in SNAPSHOT:
+                SNAPSHOT[name]=lexcls(dm).init()
+    return SNAPSHOT
+
+
+# A dictionary of lexers or parsers in which each is created by the first reference
+# to its name.  Only the lexers and parsers actually used by an assembly are built.
+#
+# Instance Arguments:
+#   pm      The ParserMgr object creating the lexers or parsers
+#   build   The ParserMgr method creating a lexer or parser by name
+#   names   The list of names that may be created
+class LazyDict(dict):
+    def __init__(self,pm,build,names):
+        super().__init__()
+        self.pm=pm
+        self.build=build
+        self.names=names
+
+    def __missing__(self,name):
+        if name not in self.names:
+            raise KeyError(name)
+        obj=self.pm.measure(self.build,name)
+        self[name]=obj
+        return obj
+
+
 class ParserMgr(object):
+    # Lexer classes by name.  Each is constructed with the debug manager.
+    lexer_classes={"lexer":AsmLexer,
+                   "cslex":CSLA,
+                   "opnd": asmopnd.OperandLexer,
+                   "macs": macopnd.MacroCSLexer}
+    # Parser names in the sequence of the __build_parser() method
+    parser_names=["addr","mnote","opnd","mparms","mproto","sdterm",\
+                  "dcds","mopnd","start"]
+
     def __init__(self,asm):
         self.asm=asm      # The assembler object
-        self.parsers={}   # Dictionary of parsers by name (see init() method)
-        self.lexers={}    # Dictionary of lexers (see __init_lexers() method)
+        # Dictionary of parsers by name (see __build_parser() method)
+        self.parsers=LazyDict(self,self.__build_parser,ParserMgr.parser_names)
+        # Dictionary of lexers (see __build_lexer() method)
+        self.lexers=LazyDict(self,self.__build_lexer,ParserMgr.lexer_classes)
+        self.prof=None    # asmprof.Profiler object measuring parsers and lexers
+        self.depth=0      # Depth of nested lexer and parser construction
+
+    # Returns a newly constructed lexer
+    def __build_lexer(self,name):
+        dm=self.asm.dm
+        if self.prof is None and ParserMgr.shareable(dm):
+            try:
+                return SNAPSHOT[name]
+            except KeyError:
+                pass
+        lex=ParserMgr.lexer_classes[name](dm).init()
+        if self.prof is not None:
+            self.prof.lexer(name,lex)
+        return lex
+
+    # Returns a newly constructed parser
+    def __build_parser(self,name):
+        dm=self.asm.dm
+        # Single context FSM parsers                         Lexer
+        if name=="addr":
+            prsr=AddressParser(dm,self)             # END     "lexer"
+        elif name=="mnote":
+            prsr=MNOTEParser(dm,self)               # MNOTE   "lexer"
+        elif name=="opnd":
+            prsr=asmopnd.OperandParser(dm,self)     #         "opnd"
+        elif name=="mparms":
+            prsr=macsyms.MacroOperands()            # asmstmts.MacroStmt
+        elif name=="mproto":
+            prsr=macsyms.ProtoParser()              # asmstmts.MacroProto
+        elif name=="sdterm":
+            prsr=SDParser(dm,self)                  #         "lexer"
+
+        # Context sensitive FSM parsers
+        elif name=="dcds":
+            prsr=asmdcds.DCDS_Parser(dm,self)       # DC/DS   "cslex"
+        elif name=="mopnd":
+            prsr=macopnd.MacroParser(dm,self)       #         "macs"
+        elif name=="start":
+            prsr=START_Parser(dm,self)              # START   "cslex"
+        else:
+            raise ValueError("%s undefined parser: '%s'" \
+                % (assembler.eloc(self,"__build_parser",module=this_module),name))
+
+        if self.prof is not None:
+            self.prof.parser(name,prsr)
+        return prsr
 
     def __fetch_parser(self,parser):
         try:
@@ -771,26 +870,6 @@ class ParserMgr(object):
             cls_str=assembler.eloc(self,"__parse",module=this_module)
             raise ValueError("%s undefined parser: '%s'" % (cls_str,parser))
 
-    def __init_lexers(self,dm):
-        self.lexers["lexer"]=AsmLexer(dm).init()
-        self.lexers["cslex"]=CSLA(dm).init()
-        self.lexers["opnd"]=asmopnd.OperandLexer(dm).init()
-        self.lexers["macs"]=macopnd.MacroCSLexer(dm).init()
-
-    def __init_parsers(self,dm):
-        # Single context FSM parsers                                   Lexer
-        self.parsers["addr"]=AddressParser(dm,self)         # END     "lexer"
-        self.parsers["mnote"]=MNOTEParser(dm,self)          # MNOTE   "lexer"
-        self.parsers["opnd"]=asmopnd.OperandParser(dm,self) #         "opnd"
-        self.parsers["mparms"]=macsyms.MacroOperands()      # asmstmts.MacroStmt
-        self.parsers["mproto"]=macsyms.ProtoParser()        # asmstmts.MacroProto
-        self.parsers["sdterm"]=SDParser(dm,self)            #         "lexer"
-
-        # Context sensitive FSM parsers
-        self.parsers["dcds"]=asmdcds.DCDS_Parser(dm,self)   # DC/DS   "cslex"
-        self.parsers["mopnd"]=macopnd.MacroParser(dm,self)  #         "macs"
-        self.parsers["start"]=START_Parser(dm,self)         # START   "cslex"
-
     def __parse(self,parser,string,scope=None):
         if isinstance(parser,str):
             try:
@@ -822,10 +901,25 @@ class ParserMgr(object):
             raise assembler.AssemblerError(line=stmt.lineno,linepos=le.ltok.linepos,\
                 msg=le.msg) from None
 
-    def init(self):
-        dm=self.asm.dm
-        self.__init_lexers(dm)
-        self.__init_parsers(dm)
+    # Returns the number of lexers and parsers that may be constructed
+    @staticmethod
+    def available():
+        return len(ParserMgr.lexer_classes)+len(ParserMgr.parser_names)
+
+    # Returns whether the lexers of the SNAPSHOT may be used with a debug manager
+    @staticmethod
+    def shareable(dm):
+        return not (dm.isdebug("tdebug") or dm.isdebug("ldebug"))
+
+    # Lexers and parsers are created when first used.  See the LazyDict class.
+    # Method Argument:
+    #   lazy   Specify False to create all lexers and parsers now.  Defaults to True.
+    def init(self,lazy=True):
+        if not lazy:
+            for name in ParserMgr.lexer_classes:
+                self.lexers[name]
+            for name in ParserMgr.parser_names:
+                self.parsers[name]
         return self
 
     # Creates an asmtokens.ArithExpr object from a list of lexical token objects
@@ -860,6 +954,26 @@ class ParserMgr(object):
         loc=asmstr.ndx2loc(ltok.linepos)
         ltok.update_loc(stmt.lineno,loc)
 
+    # Construct a lexer or parser measuring the time taken.  Nested construction,
+    # a parser creating its lexer, is included in the outermost measurement.
+    # Method Arguments:
+    #   build   The method constructing the lexer or parser
+    #   name    The name of the lexer or parser
+    # Returns:
+    #   the constructed lexer or parser
+    def measure(self,build,name):
+        if self.depth:
+            return build(name)
+        self.depth+=1
+        start_p=time.process_time()
+        start_w=time.time()
+        try:
+            return build(name)
+        finally:
+            self.depth-=1
+            assembler.Stats.constructed(time.process_time()-start_p,\
+                time.time()-start_w)
+
     # This provides direct access to the macro parser for conditional branch
     # operand recognition.  It is used to recognize the computed vs. unconditional
     # AGO first operand.  This is simply a wrapper providing access to the
@@ -0,0 +1,53 @@
+* Copyright (C) 2026 Harold Grovesteen
+*
+* This file is part of SATK.
+*
+*     SATK is free software: you can redistribute it and/or modify
+*     it under the terms of the GNU General Public License as published by
+*     the Free Software Foundation, either version 3 of the License, or
+*     (at your option) any later version.
+*
+*     SATK is distributed in the hope that it will be useful,
+*     but WITHOUT ANY WARRANTY; without even the implied warranty of
+*     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+*     GNU General Public License for more details.
+*
+*     You should have received a copy of the GNU General Public License
+*     along with SATK.  If not, see <http://www.gnu.org/licenses/>.
+
+* This source exercises the reuse of macro expansions by incremental assembly.
+* See the asm script in this directory.
+
+         MACRO
+&LABEL   COUNT &VALUE
+         GBLA  &CALLS
+&CALLS   SETA  &CALLS+1
+&LABEL   DC    F'&VALUE',A(&CALLS)
+.*  Each invocation generates its own unique label
+CNT&SYSNDX DC  H'&SYSNDX'
+         MEND
+
+         MACRO
+&LABEL   PAIR  &A,&B
+&LABEL   COUNT &A
+         COUNT &B
+         MEND
+
+         MACRO
+&LABEL   STAMP
+         GBLA  &CALLS
+&LABEL   DC    C'&SYSDATE',A(&CALLS)
+         MEND
+
+TEST     START 0
+         USING TEST,15
+         L     1,FIRST
+         L     2,SECOND
+         BR    14
+FIRST    COUNT 1
+SECOND   PAIR  2,3
+* EDIT
+THIRD    COUNT 4
+DATE     STAMP
+LAST     PAIR  5,6
+         END
@@ -44,6 +44,7 @@ satkutil.pythonpath("tools/lang")
 satkutil.pythonpath("tools/ipl")
 
 # ASMA imports
+import asmcache     # Incremental assembly results
 import asmconfig    # Usage by ASMA of the configuration system
 import assembler    # The actual assembler
 
@@ -76,36 +77,60 @@ class ASMA(object):
 
         self.aout=assembler.AsmOut(\
             deck=args["object"],\
+            export=args["export"],\
             image=args["image"],\
             ldipl=args["gldipl"],\
             listing=args["listing"],\
             mc=args["store"],\
             rc=args["rc"],\
-            vmc=args["vmc"])
+            vmc=args["vmc"],\
+            lstream=args["lstream"],\
+            lbuffer=args["lbuffer"])
 
         msl,cpu=self.target()
         mslpath=args["mslpath"]     # MSL PathMgr object
         cptrans,cpfile=self.code_page("94C")
         defn=self.defines()
 
-        self.assembler=assembler.Assembler(cpu,msl,mslpath,self.aout,\
-            addr=args["addr"],\
-            case=args["case"],\
-            debug=dm,\
-            defines=defn,\
-            dump=args["dump"],\
-            error=args["error"],\
-            nest=args["nest"],\
-            otrace=args["oper"],\
-            cpfile=cpfile,\
-            cptrans=cptrans,\
-            seq=args["seq"],\
-            mcall=args["mcall"],\
-            asmpath=args["asmpath"],\
-            maclib=args["maclib"])
-
         self.source=args["input"]       # Source input file
 
+        # Reuse the results of a previous assembly if nothing has changed
+        self.cache=None             # asmcache.AsmCache object
+        self.cached=None            # asmcache.CachedImage object of reused results
+        if args["asmcache"] is not None:
+            self.cache=asmcache.AsmCache(args["asmcache"])
+            self.options=(msl,cpu,args["addr"],args["case"],defn,args["dump"],\
+                args["error"],args["nest"],args["oper"],cptrans,cpfile,\
+                args["seq"],args["mcall"],\
+                asmcache.AsmCache.search(mslpath,"MSLPATH"),\
+                asmcache.AsmCache.search(args["asmpath"],"ASMPATH"),\
+                asmcache.AsmCache.search(args["maclib"],"MACLIB"),\
+                self.outputs())
+            self.cached=self.cache.load(self.source,self.options)
+
+        self.assembler=None
+        if self.cached is None:
+            self.assembler=assembler.Assembler(cpu,msl,mslpath,self.aout,\
+                addr=args["addr"],\
+                case=args["case"],\
+                debug=dm,\
+                defines=defn,\
+                dump=args["dump"],\
+                error=args["error"],\
+                nest=args["nest"],\
+                otrace=args["oper"],\
+                cpfile=cpfile,\
+                cptrans=cptrans,\
+                seq=args["seq"],\
+                mcall=args["mcall"],\
+                asmpath=args["asmpath"],\
+                maclib=args["maclib"],\
+                mslcache=args["mslcache"],\
+                maccache=args["maccache"],\
+                profile=args["profile"],\
+                profsort=args["profsort"],\
+                expansions=self.cache.expansions if self.cache else None)
+
         # Gather together time related data saved outside this object.
         self.process_start=process_start
         self.wall_start=wall_start
@@ -131,6 +156,13 @@ class ASMA(object):
             return (default,None)
         return self.sep(cp,"--cp",optional=2)
 
+    # Returns a tuple identifying the requested outputs.  Only requested outputs are
+    # generated, so saved results are reused only for the same requested outputs.
+    def outputs(self):
+        aout=self.aout
+        return tuple(x is not None for x in [aout.deck,aout.export,aout.image,\
+            aout.ldipl,aout.listing,aout.mc,aout.rc,aout.vmc])
+
     # Process -D command-line arguments
     def defines(self):
         lst=[]
@@ -140,33 +172,42 @@ class ASMA(object):
         return lst
 
     # Execute the assembler
+    # Returns:
+    #   the exit code of the assembly: 0 if no errors were reported, 1 if errors
+    #   were reported or 2 if the input source could not be assembled
     def run(self):
         if self.clstats:
             stats=assembler.Stats
             stats.start("assemble_p")
             stats.start("assemble_w")
 
-        try:
-            result=self.assembler.assemble(filename=self.source)
-        except Exception:
-            # This attempts to give a clue where the error occurred
-            print(self.assembler._error_passn())
-            # Now output the exception information
-            raise
-            
-        if result!=True:
-            return  # return without outputting stats or any other output
-            # Note: This is used when the initial input file can not be opened.
-            # Any error message has already been printed but an exception is not
-            # raised.
+        if self.cached is None:
+            try:
+                result=self.assembler.assemble(filename=self.source)
+            except Exception:
+                # This attempts to give a clue where the error occurred
+                print(self.assembler._error_passn())
+                # Now output the exception information
+                raise
+
+            if result!=True:
+                return 2  # return without outputting stats or any other output
+                # Note: This is used when the initial input file can not be
+                # opened. Any error message has already been printed but an
+                # exception is not raised.
+
+            # Retrieve the assembler.Image object containing the generated output
+            img=self.assembler.image()
+        else:
+            img=self.cached
+            print("%s - assembly results reused for: %s" \
+                % (this_module,self.source))
 
         self.assemble_end_w=time.time()
         self.assemble_end=time.process_time()
 
         self.out_start=time.process_time()
         self.out_start_w=time.time()
-        # Retrieve the assembler.Image object containing the generated output
-        img=self.assembler.image()
 
         # Output the requested output format(s)
         self.aout.write_listing(this_module,img.listing)
@@ -176,21 +217,32 @@ class ASMA(object):
         self.aout.write_vmc(this_module,img.vmc)
         self.aout.write_mc(this_module,img.mc)
         self.aout.write_ldipl(this_module,img.ldipl)
+        self.aout.write_export(this_module,img.export)
+
+        # Save the results once the outputs exist
+        if self.cache is not None and self.cached is None:
+            self.cache.save(self.source,self.options,self.assembler)
 
         # Provide the error report to the command-line if error-level is 2.
         # For error levels 0 or 1, error(s) have already been displayed.
         # For error level 3 errors are only reported in the listing
-        if self.args["error"]==2:
+        # Reused results report errors at error levels 1 and 2.
+        if self.args["error"]==2 or (self.cached and self.args["error"]==1):
             img.errors()
 
         self.out_end_w=time.time()
         self.out_end=time.process_time()
 
-        # Report assembler stats if requested by the --stats argument
-        if self.clstats:
+        # Report assembler stats if requested by the --stats argument.  Reused
+        # results have no assembler statistics.
+        if self.clstats and self.cached is None:
             # Manually change to False to output stats from the assembler
             self.stats(update=True)
 
+        if img.failures():
+            return 1
+        return 0
+
     # This method separates a name[=value] or name=value string into a tuple of one 
     # or two strings: (name,value) or (name,None)
     # Method Arguments:
@@ -203,10 +255,11 @@ class ASMA(object):
     # or (name,value) Two strings, one for the name and for for the value
     #
     # Used for --cp, --cpu and -D command-line arguments
-    def sep(self,string,argument,optional=None):
+    @staticmethod
+    def sep(string,argument,optional=None):
         assert isinstance(string,str) and len(string)!=0,\
-            "%s 'string' argument must be a non-empty string: %s" \
-                % (assembler.eloc(self,"set",module=this_module),string)
+            "%s - ASMA.sep() - 'string' argument must be a non-empty string: %s" \
+                % (this_module,string)
 
         seps=string.count("=")
         if optional and seps==0:
@@ -247,9 +300,15 @@ class ASMA(object):
 
     # Determine target cpu and MSL database file from --target or --cpu
     def target(self):
+        return ASMA.msl_target(self.args)
+
+    # Determine target cpu and MSL database file from a tool's configuration
+    # Returns:
+    #   a tuple of the MSL database file name and the cpu
+    @staticmethod
+    def msl_target(args):
         msl=None
         cpu=None
-        args=self.args
 
         # Try the --target argument
         try:
@@ -260,7 +319,7 @@ class ASMA(object):
         # If present try --cpu argument
         arg_cpu=args["cpu"]
         if arg_cpu is not None:
-            msl,cpu=self.sep(arg_cpu,"--cpu",optional=None)
+            msl,cpu=ASMA.sep(arg_cpu,"--cpu",optional=None)
 
         if msl is None or cpu is None:
             print("argument error: could not identify target instruction set by "
@@ -0,0 +1,292 @@
+#!/usr/bin/python3
+# This file is part of SATK.
+#
+#     SATK is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     SATK is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with SATK.  If not, see <http://www.gnu.org/licenses/>.
+
+# This module assembles multiple ASMA sources in parallel using a pool of
+# processes.  Each assembly is described by the same command-line arguments
+# accepted by asma.py.  Assemblies are supplied either by manifest files or by
+# source files sharing the same asma.py arguments.
+#
+# Manifest files contain one assembly per line.  Empty lines and lines starting
+# with a '#' are ignored.  A line contains the asma.py command-line arguments of
+# one assembly, quoted as for a shell.  The line may start with the option
+# '-C DIR' or '--directory DIR' identifying the working directory of the assembly.
+# A relative directory is relative to the directory containing the manifest.  For
+# example:
+#
+#    # Assemble the s370 and s390x versions of pgm5
+#    -C samples/guide/pgm5/s370  -t s370  -l pgm5.lst -i pgm5.bin pgm5.asm
+#    -C samples/guide/pgm5/s390x -t s390x -l pgm5.lst -i pgm5.bin pgm5.asm
+#
+# Source files supplied on the command line use the arguments of the --args
+# option.  The string '{name}' within the arguments is replaced by the source
+# file name without its directory or extension.  For example:
+#
+#    asmabatch.py --args "-t s370 -l {name}.lst" hello.asm sos.asm
+#
+# Before assemblies begin, the modules of the assembler are imported and the MSL
+# CPU definitions and lexers required by the assemblies are built once.  Each
+# assembly occurs in its own process created from this prepared process.  Where
+# the platform supports it, the process is forked, sharing the prepared state
+# without rebuilding it.  Otherwise each process prepares its own.
+#
+# The console output of each assembly is displayed in the order the assemblies
+# were supplied.  When --stats is used, combined statistics of the successful
+# assemblies are reported.  Failed assemblies are listed separately.
+
+this_module="asmabatch.py"
+
+# Python imports
+import sys
+if sys.hexversion<0x03030000:
+    raise NotImplementedError("%s requires Python version 3.3 or higher, "
+        "found: %s.%s" % (this_module,sys.version_info[0],sys.version_info[1]))
+import argparse
+import io
+import multiprocessing
+import os
+import shlex
+import time
+import traceback
+
+# SATK imports:
+import asma          # Access the ASMA command-line interface (sets PYTHONPATH)
+# ASMA imports
+import asmoper       # Access the operation manager for MSL preparation
+import assembler     # Access the assembler statistics
+import parsers       # Access the shared lexer snapshot
+
+
+# A single assembly
+#
+# Instance Arguments:
+#   number     The number of the assembly in the batch
+#   directory  The working directory of the assembly
+#   args       The list of asma.py command-line arguments
+class Job(object):
+    def __init__(self,number,directory,args):
+        self.number=number
+        self.directory=directory
+        self.args=args
+
+    def __str__(self):
+        return "[%s] %s: %s" % (self.number,self.directory," ".join(self.args))
+
+
+# The results of a single assembly returned by a worker process
+#
+# Instance Arguments:
+#   job     The Job object of the assembly
+class JobResult(object):
+    def __init__(self,job):
+        self.job=job
+        self.rc=0           # Exit code of the assembly
+        self.output=""      # Console output of the assembly
+        self.summary=None   # assembler.AsmStats.summary() of the assembly
+
+
+# Perform a single assembly.  This function is the worker process function.
+# Returns:
+#   a JobResult object
+def assemble(job):
+    result=JobResult(job)
+    out=io.StringIO()
+    stdout=sys.stdout
+    sys.stdout=out
+    try:
+        os.chdir(job.directory)
+        sys.argv=["asma.py"]+job.args
+        start_p=time.process_time()
+        start_w=time.time()
+        # Statistics and timers start with the assembly, not the batch.  The
+        # modules were imported before the process was created.
+        assembler.Stats=assembler.AsmStats()
+        for tname in ["import_p","import_w"]:
+            assembler.Stats.start(tname)
+            assembler.Stats.stop(tname)
+        asma.process_start=asma.import_start=asma.objects_start=start_p
+        asma.wall_start=asma.import_start_w=asma.objects_start_w=start_w
+
+        dm=assembler.Assembler.DM()
+        tool=asma.parse_args(dm=None)
+        result.rc=asma.ASMA(tool,dm).run()
+        if tool["stats"]:
+            result.summary=assembler.Stats.summary()
+    except SystemExit as se:
+        if se.code is None:
+            result.rc=0
+        elif isinstance(se.code,int):
+            result.rc=se.code
+        else:
+            print(se.code)
+            result.rc=1
+    except Exception:
+        traceback.print_exc(file=out)
+        result.rc=1
+    finally:
+        sys.stdout=stdout
+    result.output=out.getvalue()
+    return result
+
+
+# This class drives the batch of assemblies.
+#
+# Instance Argument:
+#   args   The argparse Namespace object of the command-line arguments
+class BATCH(object):
+    def __init__(self,args):
+        self.args=args
+        self.jobs=[]           # List of Job objects
+        self.stats=args.stats  # Whether combined statistics are reported
+
+        # Determine the number of worker processes
+        if args.jobs is None:
+            self.processes=os.cpu_count() or 1
+        else:
+            self.processes=max(1,args.jobs)
+
+        for manifest in args.manifest:
+            self.read_manifest(manifest)
+        template=shlex.split(args.args)
+        cwd=os.getcwd()
+        for source in args.source:
+            name=os.path.splitext(os.path.basename(source))[0]
+            jargs=[arg.replace("{name}",name) for arg in template]
+            self.add(cwd,jargs+[source,])
+
+    # Add an assembly to the batch
+    def add(self,directory,jargs):
+        if self.stats and "--stats" not in jargs:
+            jargs=["--stats",]+jargs
+        self.jobs.append(Job(len(self.jobs)+1,directory,jargs))
+
+    # Build the MSL CPU definitions required by the assemblies and the shared
+    # lexers before the worker processes are created.
+    def prepare(self):
+        parsers.snapshot(assembler.Assembler.DM())
+        cwd=os.getcwd()
+        argv=sys.argv
+        stdout=sys.stdout
+        for job in self.jobs:
+            sys.stdout=io.StringIO()   # Suppress the configuration notices
+            try:
+                os.chdir(job.directory)
+                sys.argv=["asma.py"]+job.args
+                tool=asma.parse_args(dm=None)
+                msl,cpu=asma.ASMA.msl_target(tool)
+                asmoper.OperMgr.prepare(cpu,msl,tool["mslpath"],\
+                    mslcache=tool["mslcache"])
+            except (SystemExit,Exception):
+                # The error is reported when the assembly is attempted
+                pass
+            finally:
+                sys.stdout=stdout
+                os.chdir(cwd)
+        sys.argv=argv
+
+    # Read a manifest file adding its assemblies to the batch
+    def read_manifest(self,manifest):
+        base=os.path.dirname(os.path.abspath(manifest))
+        try:
+            with open(manifest,"rt") as fo:
+                lines=fo.readlines()
+        except OSError as oe:
+            print("%s - could not read manifest %s: %s" % (this_module,manifest,oe))
+            sys.exit(1)
+
+        for lineno,line in enumerate(lines,start=1):
+            line=line.strip()
+            if len(line)==0 or line[0]=="#":
+                continue
+            try:
+                jargs=shlex.split(line)
+            except ValueError as ve:
+                print("%s - %s[%s] - %s" % (this_module,manifest,lineno,ve))
+                sys.exit(1)
+            directory=base
+            if len(jargs)>=2 and jargs[0] in ["-C","--directory"]:
+                directory=os.path.join(base,jargs[1])
+                jargs=jargs[2:]
+            self.add(directory,jargs)
+
+    # Perform the assemblies
+    # Returns:
+    #   the exit code of the batch: 0 if all assemblies succeeded, 1 otherwise
+    def run(self):
+        if len(self.jobs)==0:
+            print("%s - no assemblies supplied" % this_module)
+            return 1
+
+        start_w=time.time()
+        self.prepare()
+
+        # Each assembly uses a new process so that the global state of one
+        # assembly never influences another.
+        try:
+            context=multiprocessing.get_context("fork")
+        except ValueError:
+            context=multiprocessing.get_context()
+        processes=min(self.processes,len(self.jobs))
+        rc=0
+        summaries=[]
+        failed=[]      # Failed assemblies are not included in the statistics
+        with context.Pool(processes=processes,maxtasksperchild=1) as pool:
+            for result in pool.imap(assemble,self.jobs):
+                print("%s rc=%s" % (result.job,result.rc))
+                if result.output:
+                    print(result.output,end="")
+                if result.rc!=0:
+                    rc=1
+                    failed.append(result.job)
+                elif result.summary is not None:
+                    summaries.append(result.summary)
+
+        if self.stats:
+            print(assembler.AsmStats.combined(summaries,time.time()-start_w,\
+                failed=failed))
+        return rc
+
+
+# Parse the command line arguments
+# Returns:
+#   argparse Namespace object
+def parse_args():
+    parser=argparse.ArgumentParser(prog=this_module,
+        description="assemble multiple ASMA sources in parallel")
+
+    parser.add_argument("source",nargs="*",default=[],metavar="FILEPATH",\
+        help="input assembler source path assembled with the --args arguments")
+
+    parser.add_argument("-a","--args",default="",metavar="ARGS",\
+        help="asma.py arguments used for each input source.  '{name}' is "
+             "replaced by the source file name without its extension")
+
+    parser.add_argument("-m","--manifest",action="append",default=[],\
+        metavar="FILEPATH",\
+        help="file of asma.py arguments, one assembly per line (may be used "
+             "multiple times)")
+
+    parser.add_argument("-j","--jobs",type=int,default=None,metavar="N",\
+        help="number of concurrent assemblies.  Defaults to the number of CPUs")
+
+    parser.add_argument("--stats",action="store_true",default=False,\
+        help="report statistics of each assembly and combined statistics")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args=parse_args()
+    sys.exit(BATCH(args).run())
@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+# This file is part of SATK.
+#
+#     SATK is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     SATK is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with SATK.  If not, see <http://www.gnu.org/licenses/>.
+
+# This module measures the memory used by ASMA when assembling a large generated
+# source.  The source defines a macro generating machine instructions and constants
+# and invokes it the requested number of times.  Each assembly occurs in its own
+# process.  The peak resident set size of the process is reported.
+#
+# Assemblies by different SATK installations may be compared by supplying the
+# --satk option multiple times.  For example, to compare the current SATK with an
+# earlier version checked out in /tmp/satk-old:
+#
+#    asmamem.py --satk /tmp/satk-old --satk . --invocations 50000
+#
+# Peak resident set size is only available on platforms supporting os.wait4().
+
+this_module="asmamem.py"
+
+# Python imports
+import sys
+if sys.hexversion<0x03030000:
+    raise NotImplementedError("%s requires Python version 3.3 or higher, "
+        "found: %s.%s" % (this_module,sys.version_info[0],sys.version_info[1]))
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+# SATK imports:
+import satkutil       # Access the SATK root directory
+
+
+# The macro and open code of the generated source.  The macro generates eight
+# statements per invocation.
+MACRO="""\
+         MACRO
+&LABEL   GEN   &N,&REG
+&LABEL   LA    &REG,DATA&N
+         L     &REG+1,0(,&REG)
+         ST    &REG+1,4(,&REG)
+         MVC   0(4,&REG),4(&REG)
+         B     NEXT&N
+DATA&N   DC    F'&N',A(DATA&N)
+         DC    CL8'GEN&N'
+NEXT&N   DS    0H
+         MEND
+"""
+
+
+# Write the generated source to a file.
+# Function Arguments:
+#   filepath     The path of the source file
+#   invocations  The number of macro invocations
+def generate(filepath,invocations):
+    with open(filepath,"wt") as fo:
+        fo.write(MACRO)
+        fo.write("MEMTEST  START 0\n")
+        fo.write("         USING MEMTEST,15\n")
+        for n in range(invocations):
+            # Restart the base register before it runs out of addressability
+            if n % 100 == 0 and n:
+                fo.write("         DROP  15\n")
+                fo.write("         BASR  15,0\n")
+                fo.write("         USING *,15\n")
+            fo.write("         GEN   %s,%s\n" % (n,2+(n % 4)*2))
+        fo.write("         END\n")
+
+
+# Assemble the generated source with one SATK installation
+# Function Arguments:
+#   satk     The SATK root directory
+#   source   The path of the generated source
+#   target   The asma.py --target option value
+#   listing  The listing file path or None
+# Returns:
+#   a tuple: (exit code, peak resident set size in KiB or None, elapsed seconds)
+def measure(satk,source,target,listing):
+    cmd=[sys.executable,os.path.join(satk,"tools","asma.py"),"-t",target]
+    if listing is not None:
+        cmd.extend(["-l",listing])
+    cmd.append(source)
+    env=dict(os.environ)
+    env["SATK_DIR"]=satk
+    start=time.time()
+    proc=subprocess.Popen(cmd,env=env,stdout=subprocess.DEVNULL,\
+        stderr=subprocess.DEVNULL)
+    try:
+        pid,status,usage=os.wait4(proc.pid,0)
+        rss=usage.ru_maxrss
+        if sys.platform=="darwin":
+            rss=rss//1024      # macOS reports bytes
+        rc=os.waitstatus_to_exitcode(status)
+    except AttributeError:
+        rc=proc.wait()
+        rss=None
+    return (rc,rss,time.time()-start)
+
+
+# Parse the command line arguments
+# Returns:
+#   argparse Namespace object
+def parse_args():
+    parser=argparse.ArgumentParser(prog=this_module,
+        description="measure ASMA peak memory use assembling a generated source")
+
+    parser.add_argument("-n","--invocations",type=int,default=20000,metavar="N",\
+        help="number of generated macro invocations (8 statements each).  "
+             "Defaults to 20000")
+
+    parser.add_argument("-s","--satk",action="append",default=[],metavar="DIR",\
+        help="SATK root directory whose assembler is measured (may be used "
+             "multiple times).  Defaults to the SATK containing this module")
+
+    parser.add_argument("-t","--target",default="s390x",metavar="ISA",\
+        help="asma.py target instruction set.  Defaults to s390x")
+
+    parser.add_argument("-l","--listing",action="store_true",default=False,\
+        help="also create the assembly listing")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args=parse_args()
+    dirs=args.satk
+    if len(dirs)==0:
+        dirs=[satkutil.satkroot(),]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source=os.path.join(tmp,"memtest.asm")
+        generate(source,args.invocations)
+        if args.listing:
+            listing=os.path.join(tmp,"memtest.lst")
+        else:
+            listing=None
+        print("statements generated: %s" % (args.invocations*8))
+        print("   rc  peak RSS KiB   seconds  SATK")
+        for satk in dirs:
+            satk=os.path.abspath(satk)
+            rc,rss,secs=measure(satk,source,args.target,listing)
+            if rss is None:
+                rss="unknown"
+            print(" %4s  %12s  %8.2f  %s" % (rc,rss,secs,satk))
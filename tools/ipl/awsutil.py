@@ -33,8 +33,16 @@
 #    ckdutil.py    Handles writing and reading of CKD image files.
 #
 # See media.py for usage of AWS tape file images
+#
+# The awsreader class provides random access to the blocks and files of an existing
+# AWS tape image using an awsindex object.
 
-#import struct
+# Python imports:
+import array       # Access compact arrays of the block index
+import mmap        # Access memory mapped tape images
+import os          # Access file status and replacement
+import struct      # Access AWS header fields
+import sys         # Access the platform byte order
 
 this_module="awsutil.py"
 
@@ -80,11 +88,15 @@ class awstape(object):
     @staticmethod
     def mount(filename,ro=True):
         awstape._check_filename(filename)
+        if ro:
+            mode="rb"
+        else:
+            mode="r+b"
         try:
-            fo=open(self.filename,"rb")
+            fo=open(filename,mode)
         except IOError:
             raise IOError(\
-                "Could not open existing AWS tape: %s" % self.filename)
+                "Could not open existing AWS tape: %s" % filename)
         return awstape(fo,ro)
 
     @staticmethod
@@ -232,7 +244,8 @@ class awstape(object):
     def fsf(self):
         self._check_loaded("fsf")
         while not self.fsb():
-            return True
+            pass
+        return True
             
     # Retrieve a saved block buffer
     def get_buffer(self):
@@ -368,13 +381,14 @@ class header(object):
         flag2=hdrbytes[5]  # Flag 2
         
         # Perform some sanity checks
-        if (flag1!=header.block) or (flag1!=header.tapemark):
-            raise ValueError("Invalid flag 1: %s" % header._aws(hdr))
+        hdr=(prvlen,curlen,flag1,flag2)
+        if (flag1!=header.block) and (flag1!=header.tapemark):
+            raise ValueError("Invalid flag 1: %s" % header._aws(hdr,pos))
         if flag2!=0:
-            raise ValueError("Invalid flag 2: %s" % header._aws(hdr))
+            raise ValueError("Invalid flag 2: %s" % header._aws(hdr,pos))
         if flag1==header.tapemark and curlen!=0:
             raise ValueError(\
-               "Invalid current TM block length: %s" % header._aws(hdr))
+               "Invalid current TM block length: %s" % header._aws(hdr,pos))
 
         return header(cur=curlen,prv=prvlen,tapemark=flag1==header.tapemark)
 
@@ -408,7 +422,342 @@ class header(object):
     def __str__(self):
         return "prev=%s,cur=%s,TM=%s @%s" % \
             (self.prvlen,self.curlen,self.tapemark,self.filepos)
-        
+
+# This class indexes the blocks of an AWS tape image.  Each header delimited item
+# of the tape, a data block or a tape mark, is identified by its block number,
+# starting with 0 at the load point.  A data block may be written as multiple
+# segments, each with its own header.  The index is built by a single pass over the
+# image's headers and may be saved in a sidecar cache file next to the image.  A
+# cache file is only used while the image's size and modification time are those
+# recorded in it.
+#
+# Instance Argument:
+#   filename   The path of the AWS tape image being indexed
+#   cache      Whether the sidecar cache file is used (True) or not (False).
+#              Defaults to True.
+class awsindex(object):
+    ext=".idx"          # Sidecar cache file name suffix
+    magic=b"AWSX"       # Sidecar cache file identifier
+    version=2           # Sidecar cache file format version
+    # magic,version,array item sizes,image size,mtime,blocks,files
+    cachefmt="<4sH4sQQQQ"
+    hdrfmt=struct.Struct("<HHBB")   # AWS header fields
+    # Flag 1 bits
+    new_rec=0x80        # Header starts a block
+    tm=0x40             # Header is a tape mark
+    end_rec=0x20        # Header ends a block
+    # Index entry flags
+    TM=0x01             # Block is a tape mark
+    SEG=0x02            # Block is written as multiple segments
+
+    # Returns the sidecar cache file path of an AWS tape image
+    @staticmethod
+    def cache_file(filename):
+        return "%s%s" % (filename,awsindex.ext)
+
+    def __init__(self,filename,cache=True):
+        self.filename=filename
+        st=os.stat(filename)
+        self.size=st.st_size         # Image file size when indexed
+        self.mtime=st.st_mtime_ns    # Image file modification time when indexed
+        self.pos=array.array("Q")    # File position of each block's first header
+        self.length=array.array("I") # Data length of each block (0 for a TM)
+        self.flags=array.array("B")  # Index entry flags of each block
+        self.files=array.array("Q")  # Block number of the first block of each file
+
+        if cache and self.load():
+            return
+        self.build()
+        if cache:
+            self.save()
+
+    def __len__(self):
+        return len(self.pos)
+
+    # Returns the arrays saved in the sidecar cache file in the order saved
+    def __arrays(self):
+        return [self.pos,self.length,self.flags,self.files]
+
+    # Returns the item sizes of the saved arrays as a bytes sequence.  Item sizes
+    # depend upon the platform, so a cache file is only used when they match.
+    def __itemsizes(self):
+        return bytes([a.itemsize for a in self.__arrays()])
+
+    # Build the index from the AWS tape image
+    # Exception:
+    #   ValueError if the image contains an invalid or truncated header or block
+    def build(self):
+        pos=self.pos
+        length=self.length
+        flags=self.flags
+        files=self.files
+        del pos[:],length[:],flags[:],files[:]
+        files.append(0)
+        hdrlen=header.length
+        unpack=awsindex.hdrfmt.unpack_from
+        size=self.size
+        if size==0:
+            return
+        with open(self.filename,"rb") as fo:
+            with mmap.mmap(fo.fileno(),0,access=mmap.ACCESS_READ) as image:
+                offset=0
+                start=None          # Position of the open segmented block
+                while offset<size:
+                    if offset+hdrlen>size:
+                        raise ValueError("%s - awsindex.build() - truncated header "
+                            "at %s: %s" % (this_module,offset,self.filename))
+                    curlen,prvlen,flag1,flag2=unpack(image,offset)
+                    if flag1 & awsindex.tm:
+                        if start is not None or curlen!=0:
+                            raise ValueError("%s - awsindex.build() - invalid tape "
+                                "mark at %s: %s" % (this_module,offset,self.filename))
+                        pos.append(offset)
+                        length.append(0)
+                        flags.append(awsindex.TM)
+                        files.append(len(pos))
+                        offset+=hdrlen
+                        continue
+                    if flag1 & awsindex.new_rec:
+                        if start is not None:
+                            raise ValueError("%s - awsindex.build() - unended "
+                                "block at %s: %s" % (this_module,start,self.filename))
+                        start=offset
+                        datalen=0
+                        segs=0
+                    elif start is None:
+                        raise ValueError("%s - awsindex.build() - segment without "
+                            "block start at %s: %s" \
+                                % (this_module,offset,self.filename))
+                    datalen+=curlen
+                    segs+=1
+                    offset+=hdrlen+curlen
+                    if offset>size:
+                        raise ValueError("%s - awsindex.build() - truncated block "
+                            "at %s: %s" % (this_module,start,self.filename))
+                    if flag1 & awsindex.end_rec:
+                        pos.append(start)
+                        length.append(datalen)
+                        if segs>1:
+                            flags.append(awsindex.SEG)
+                        else:
+                            flags.append(0)
+                        start=None
+                if start is not None:
+                    raise ValueError("%s - awsindex.build() - unended block at "
+                        "%s: %s" % (this_module,start,self.filename))
+
+    # Load the index from the sidecar cache file.
+    # Returns:
+    #   True if the index was loaded, False if the cache file is missing, unreadable
+    #   or does not match the image.
+    def load(self):
+        try:
+            with open(awsindex.cache_file(self.filename),"rb") as fo:
+                data=fo.read()
+        except OSError:
+            return False
+        hdrsize=struct.calcsize(awsindex.cachefmt)
+        if len(data)<hdrsize:
+            return False
+        magic,version,itemsizes,size,mtime,blocks,files=\
+            struct.unpack_from(awsindex.cachefmt,data,0)
+        if magic!=awsindex.magic or version!=awsindex.version \
+           or itemsizes!=self.__itemsizes() \
+           or size!=self.size or mtime!=self.mtime:
+            return False
+        arrays=[(self.pos,blocks),(self.length,blocks),(self.flags,blocks),\
+                (self.files,files)]
+        offset=hdrsize
+        for a,n in arrays:
+            end=offset+n*a.itemsize
+            if end>len(data):
+                return False
+            a.frombytes(data[offset:end])
+            if sys.byteorder!="little":
+                a.byteswap()
+            offset=end
+        return True
+
+    # Save the index in the sidecar cache file.  Failure to save the index is not
+    # an error.
+    # Returns:
+    #   True if the cache file was written, False otherwise.
+    def save(self):
+        cfile=awsindex.cache_file(self.filename)
+        tfile="%s.%s" % (cfile,os.getpid())
+        try:
+            with open(tfile,"wb") as fo:
+                fo.write(struct.pack(awsindex.cachefmt,awsindex.magic,\
+                    awsindex.version,self.__itemsizes(),self.size,self.mtime,\
+                    len(self.pos),len(self.files)))
+                for a in self.__arrays():
+                    if sys.byteorder!="little":
+                        a=array.array(a.typecode,a)
+                        a.byteswap()
+                    fo.write(a.tobytes())
+            os.replace(tfile,cfile)
+        except OSError:
+            try:
+                os.remove(tfile)
+            except OSError:
+                pass
+            return False
+        return True
+
+
+# This class provides read-only random access to an existing AWS tape image.  The
+# image is memory mapped and positioned by an awsindex object, so locating a file
+# or block does not depend upon the blocks preceding it.  Blocks are identified
+# either by their block number on the tape or by a file number and the block's
+# number within the file.  Tape marks occupy a block number but are not part of
+# any file's blocks.  A memoryview returned for a block remains usable after
+# close(), the memory map being closed when the last such view is released.
+#
+# Instance Arguments:
+#   filename   The path of the existing AWS tape image
+#   cache      Whether the awsindex sidecar cache file is used.  Defaults to True.
+class awsreader(object):
+    def __init__(self,filename,cache=True):
+        self.filename=filename
+        self.index=awsindex(filename,cache=cache)
+        self.fo=open(filename,"rb")
+        if self.index.size:
+            self.image=mmap.mmap(self.fo.fileno(),0,access=mmap.ACCESS_READ)
+            self.view=memoryview(self.image)
+        else:
+            self.image=self.view=None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __str__(self):
+        return "AWS tape %s: blocks=%s files=%s" \
+            % (self.filename,len(self.index),self.files())
+
+    # Returns the content of a data block or None for a tape mark.
+    # Method Argument:
+    #   n    the block number on the tape
+    # Returns:
+    #   a memoryview of the mapped block unless the block was written in segments.
+    #   The content of a segmented block is returned as bytes.
+    # Exception:
+    #   IndexError if the block does not exist
+    def block(self,n):
+        self.__check(n,"block")
+        index=self.index
+        flags=index.flags[n]
+        if flags & awsindex.TM:
+            return None
+        pos=index.pos[n]+header.length
+        if not flags & awsindex.SEG:
+            return self.view[pos:pos+index.length[n]]
+        # Gather the segments of the block
+        unpack=awsindex.hdrfmt.unpack_from
+        segs=[]
+        pos-=header.length
+        while True:
+            curlen,prvlen,flag1,flag2=unpack(self.view,pos)
+            pos+=header.length
+            segs.append(self.view[pos:pos+curlen])
+            pos+=curlen
+            if flag1 & awsindex.end_rec:
+                return b"".join(segs)
+
+    # Returns the number of data blocks in a file
+    def blocks(self,fileno):
+        first,last=self.__file_range(fileno)
+        return last-first
+
+    # Release the mapped image and close the image file
+    def close(self):
+        image=self.image
+        view=self.view
+        self.image=self.view=None
+        try:
+            if image is not None:
+                view.release()
+                try:
+                    image.close()
+                except BufferError:
+                    # Block views returned by block() still reference the map.  It
+                    # is closed when the last of them is released.
+                    pass
+        finally:
+            self.fo.close()
+
+    # Returns the content of each data block of a file as a list
+    # Method Argument:
+    #   fileno   the file number on the tape
+    def file(self,fileno):
+        first,last=self.__file_range(fileno)
+        return [self.block(n) for n in range(first,last)]
+
+    # Returns the number of files on the tape.  A file follows each tape mark
+    # unless it is the last item on the tape.
+    def files(self):
+        index=self.index
+        files=len(index.files)
+        if files>1 and index.files[-1]==len(index):
+            files-=1
+        return files
+
+    # Returns the tape block number of a file's block.
+    # Method Arguments:
+    #   fileno   the file number on the tape
+    #   blockno  the block number within the file.  Defaults to 0.
+    # Exception:
+    #   IndexError if the file or its block does not exist
+    def locate(self,fileno,blockno=0):
+        first,last=self.__file_range(fileno)
+        n=first+blockno
+        if blockno<0 or n>=last:
+            raise IndexError("%s - awsreader.locate() - file %s block %s does not "
+                "exist: %s" % (this_module,fileno,blockno,self.filename))
+        return n
+
+    # Returns the content of a file's block.
+    # Method Arguments:
+    #   fileno   the file number on the tape
+    #   blockno  the block number within the file
+    def read(self,fileno,blockno):
+        return self.block(self.locate(fileno,blockno))
+
+    # Returns whether a tape block is a tape mark
+    # Exception:
+    #   IndexError if the block does not exist
+    def tapemark(self,n):
+        self.__check(n,"tapemark")
+        return (self.index.flags[n] & awsindex.TM)!=0
+
+    # Validates a tape block number
+    # Exception:
+    #   IndexError if the block does not exist
+    def __check(self,n,method):
+        if n<0 or n>=len(self.index):
+            raise IndexError("%s - awsreader.%s() - block %s does not exist: %s" \
+                % (this_module,method,n,self.filename))
+
+    # Returns a tuple of the first tape block number of a file and the tape block
+    # number ending its data blocks
+    def __file_range(self,fileno):
+        index=self.index
+        if fileno<0 or fileno>=self.files():
+            raise IndexError("%s - awsreader - file %s does not exist: %s" \
+                % (this_module,fileno,self.filename))
+        first=index.files[fileno]
+        try:
+            last=index.files[fileno+1]-1     # Block number of the tape mark
+        except IndexError:
+            last=len(index)
+        return (first,last)
+
+
 # media.py expects this function to be available
 def register_devices(dtypes):
     lst=[0x3410,0x3420,0x3422,0x3430,0x3480,0x3490,0x3590,0x8809,0x9347]
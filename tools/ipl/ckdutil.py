@@ -33,6 +33,7 @@
 #
 # See media.py for usage of CKD image filed
 
+import collections # Access the ordered dictionary for the track cache
 import functools   # Access compare to key function for sorting
 import hexdump     # Access dump utility
 import os          # Access OS functions
@@ -57,10 +58,12 @@ class ckd(object):
     #
     # ckd Instance Methods:
     #
-    #   detach   Flushes to the image updated cache and closes image file
+    #   detach   Flushes to the image updated cached tracks and closes image file
     #   read     Reads a (key,data) tuple from a cached track image
-    #   seek     Flushes an updated cache image to the file and reads into
-    #            the cache a new track image
+    #   seek     Makes a track the current track, reading it into the track
+    #            cache if it is not already cached.  When the cache is full the
+    #            least recently used track is removed from the cache, being
+    #            flushed to the image file if updated.
     #   update   Updates a record's data in a cached track image.  Data is
     #            padded or truncated as required to maintain the data's
     #            length.
@@ -74,6 +77,7 @@ class ckd(object):
     geometry={}     # Built when ckdev instances are created
     record="ckd"    # recsutil class name of ckd records
     autodump=False  # Master switch to enable dumps
+    cached=64       # Default number of parsed tracks retained in the cache
     #
     # Private Static Methods
     @staticmethod
@@ -83,19 +87,22 @@ class ckd(object):
         except KeyError:
             raise TypeError("unrecognized CKD device type: %s" % typ)
     @staticmethod
-    def __init(fo,dtype,size=None,comp=False,progress=False,debug=False):
+    def __init(fo,dtype,size=None,comp=False,progress=False,sparse=True,\
+               debug=False):
         dev=ckd.__devtyp(dtype)
         if not size is None:
             cyls=size
         else:
             cyls=dev.ecyl
+        if sparse:
+            return ckd.__init_sparse(fo,dev,cyls,progress=progress)
         fo.truncate(0)
         try:
             fo.write(dev.devhdr())
         except IOError:
             raise IOError("writing CKD device header")
         init_cyls=0
-        for x in xrange(cyls):
+        for x in range(cyls):
             for y in range(dev.eheads):
                 #print "track (%s,%s)" % (x,y)
                 t=track(dev,x,y,r0=True)
@@ -115,15 +122,51 @@ class ckd(object):
             print("%s CKD image initialized with %s cylinders: %s" \
                 % (dev.edtype,init_cyls,fo.name))
         return cyls
+    @staticmethod
+    def __init_sparse(fo,dev,cyls,progress=False):
+        # Initializes the image as a sparse file.  The file is extended to its
+        # full size, leaving every track as binary zeros without writing them.
+        # Only the first sector of each track, containing the home address, R0
+        # and the end of track marker, is written.  The sector is built once and
+        # only its cylinder and head fields are changed for each track.
+        heads=dev.eheads
+        trksize=dev.etrksize
+        fo.seek(0)
+        fo.truncate(0)
+        try:
+            fo.write(dev.devhdr())
+            fo.truncate(512+(cyls*heads*trksize))
+        except IOError:
+            raise IOError("writing CKD device header")
+        sector=dev.empty_track()
+        ccdd=struct.Struct(">HH")
+        pos=512
+        for x in range(cyls):
+            for y in range(heads):
+                ccdd.pack_into(sector,home.ha_ccdd,x,y)
+                ccdd.pack_into(sector,home.hdrsize,x,y)
+                try:
+                    fo.seek(pos)
+                    fo.write(sector)
+                except IOError:
+                    raise IOError("writing track image: (%s,%s)" % (x,y))
+                pos+=trksize
+            if progress and ((x%100)==0):
+                print("Cylider initialized: %s" % x)
+        fo.flush()
+        if progress:
+            print("%s CKD image initialized with %s cylinders: %s" \
+                % (dev.edtype,cyls,fo.name))
+        return cyls
     #
     # ckd Static Methods
     @staticmethod
-    def attach(filename,ro=True,debug=False):
+    def attach(filename,ro=True,cached=None,debug=False):
         # Access an existing CKD emulating media file for reading or writing.
         if ro:
             mode="rb"
         else:
-            mode="a+b"
+            mode="r+b"
         try:
             fo=open(filename,mode)
         except IOError:
@@ -136,7 +179,7 @@ class ckd(object):
         tracks,excess=divmod(filesize-512,trksize)
         if excess!=0:
             print("WARNING: malformed CKD image file, incomplete track: %s" \
-                % self.fo.name)
+                % fo.name)
         cyls,excess=divmod(tracks,heads)
         if excess!=0:
             raise ValueError(\
@@ -153,21 +196,32 @@ class ckd(object):
             raise ValueError(\
                 "CKD header track size incompatible with device "
                 "type %s size %s: %s" \
-                % (dev.edtype,dev.etrksize,etrksize))
-        return ckd(fo,dev,cyls,ro)
+                % (dev.edtype,dev.etrksize,trksize))
+        return ckd(fo,dev,cyls,ro,cached=cached)
     @staticmethod
     def dump(enable=False):
         ckd.autodump=enable
     @staticmethod
-    def new(filename,dtype,size=None,comp=False,progress=False):
-        # Create a new CKD image file, overwriting an existing file
+    def new(filename,dtype,size=None,comp=False,progress=False,sparse=None,\
+            cached=None):
+        # Create a new CKD image file, overwriting an existing file.  By default
+        # the image is created as a sparse file unless it is intended for
+        # compression, comp=True.  Specify sparse=False to write every track image
+        # in full.  Specifying both sparse=True and comp=True raises ValueError.
+        if sparse is None:
+            sparse=not comp
+        elif comp and sparse:
+            raise ValueError(\
+                "CKD image intended for compression can not be sparse: %s" \
+                    % filename)
         try:
             fo=open(filename,"w+b")
         except IOError:
             raise IOError(\
                 "Could not open new CKD image: %s" % filename)
-        cyls=ckd.__init(fo,dtype,size=size,comp=comp,progress=progress)
-        return ckd(fo,ckd.__devtyp(dtype),cyls,ro=False)
+        cyls=ckd.__init(fo,dtype,size=size,comp=comp,progress=progress,\
+            sparse=sparse)
+        return ckd(fo,ckd.__devtyp(dtype),cyls,ro=False,cached=cached)
     @staticmethod
     def size(dtype,hwm=None,comp=False):
         # Size a new device by providing the number of required cylinders 
@@ -186,13 +240,18 @@ class ckd(object):
         return dev.eheads
     #
     # ckd instance methods
-    def __init__(self,fo,dev,cyls,ro=True):
+    def __init__(self,fo,dev,cyls,ro=True,cached=None):
         self.fo=fo          # Open file object from new or attach
         self.dev=dev        # ckdev instance for this volume
         self.cyls=cyls      # Number of cylinders in the emulated CKD device
         self.ro=ro          # Set read-only (True) or read-write (False)
-        # Cached track instance
+        # Current track instance
         self.cache=None
+        # Track cache: track instances by (cyl,head) in least recently used order
+        self.tracks=collections.OrderedDict()
+        if cached is None:
+            cached=ckd.cached
+        self.cached=max(cached,1)  # Maximum number of tracks in the cache
     def __str__(self):
         return "CKD %s cyl=%s" % (self.dev.edtype,self.cyls)
     def __check_cache(self):
@@ -217,20 +276,26 @@ class ckd(object):
         if self.cache.cyl!=cyl or self.cache.head!=head:
             raise NotImplementedError(\
                 "track (%s,%s) requires record for same track: (%s,%s)" \
-                % (self.cache.cyl,self.cache.head,record.cyl,record.head))
+                % (self.cache.cyl,self.cache.head,cyl,head))
+    def __flush(self,trk,debug=False,dump=False):
+        # Writes an updated track to the image file
+        if trk.updated:
+            self.dev.write(self.fo,trk,debug=debug,dump=dump)
+            trk.updated=False
     def detach(self,debug=False):
         if debug:
-            print("ckdutil.py: debug: ckd.detach: self.cache=%s" \
-                % self.cache)
-            #if self.cache != None:
-            #    print("ckdutil.py: debug: ckd.detach: self.cache.updated=%s" \
-            #        % self.cache.updated)
-        if (self.cache!= None) and self.cache.updated:
-            self.dev.write(self.fo,self.cache,debug=debug)
+            print("ckdutil.py: debug: ckd.detach: self.cache=%s tracks=%s" \
+                % (self.cache,len(self.tracks)))
+        # Write updated tracks in file sequence
+        for key in sorted(self.tracks.keys()):
+            self.__flush(self.tracks[key],debug=debug)
+        self.tracks.clear()
+        self.cache=None
         try:
             self.fo.close()
         except IOError:
-            raise IOError("IOError detaching %s CKD image %s" % self.fo.name)
+            raise IOError("IOError detaching %s CKD image %s" \
+                % (self.dev.edtype,self.fo.name))
     def read(self,recno):
         # Trys to find a record from a cached track image.
         # On success, returns a tuple (key,data)
@@ -241,45 +306,44 @@ class ckd(object):
         if rec is None:
             raise IndexError("Could not find on track (%s,%s) record: %s" \
                 % (self.cache.cyl,self.cache.head,recno))
-        return (rec.key,rec.data)
+        return (bytes(rec.key),bytes(rec.data))
     def seek(self,cc,hh,debug=False,dump=False):
         dodump=dump or ckd.autodump
         self.__check_cyl(cc)
         self.__check_head(hh)
-        if self.cache is None:
+        key=(cc,hh)
+        tracks=self.tracks
+        try:
+            trk=tracks[key]
+            tracks.move_to_end(key)
             if debug:
                 print("ckdutil.py: debug: ckd.seek(%s,%s) - " \
-                    "initial seek" \
-                    % (cc,hh))
-            self.cache=self.dev.read(self.fo,cc,hh,debug=debug,dump=dodump)
-        else:
+                    "track cached" % (cc,hh))
+        except KeyError:
+            if len(tracks)>=self.cached:
+                oldkey,old=tracks.popitem(last=False)
+                if debug and old.updated:
+                    print("ckdutil.py: debug: ckd.seek(%s,%s) - " \
+                        "updating least recently used track (%s,%s)" \
+                        % (cc,hh,old.cyl,old.head))
+                self.__flush(old,debug=debug,dump=dodump)
             if debug:
                 print("ckdutil.py: debug: ckd.seek(%s,%s) - " \
-                    "current track (%s,%s)" \
-                    % (cc,hh,self.cache.cyl,self.cache.head))
-            if (cc!=self.cache.cyl or hh!=self.cache.head):
-                if self.cache.updated:
-                    if debug:
-                        print("ckdutil.py: debug: ckd.seek(%s,%s) - " \
-                            "updating current track" \
-                            % (cc,hh))
-                    self.dev.write(self.fo,self.cache,debug=debug,dump=dodump)
-                if debug:
-                    print("ckdutil.py: debug: ckd.seek(%s,%s) - " \
-                        "reading track" \
-                        % (cc,hh))
-                self.cache=self.dev.read(self.fo,cc,hh,debug=debug,dump=dodump)
-    def update(self,recno,data=""):
+                    "reading track" \
+                    % (cc,hh))
+            trk=tracks[key]=self.dev.read(self.fo,cc,hh,debug=debug,dump=dodump)
+        self.cache=trk
+    def update(self,recno,data=b""):
         # Trys to update a cached track image record's data.  
         # Raises an exception if it fails
         self.__check_ro()
         self.__check_rec(recno)
-        self.__check_cached()
+        self.__check_cache()
         if not self.cache.update(recno,data):
              raise IndexError(\
                  "Failed to update track (%s,%s) record: %s" \
                  % (self.cache.cyl,self.cache.head,recno))
-    def write(self,cc,hh,r,key="",data="",debug=False):
+    def write(self,cc,hh,r,key=b"",data=b"",debug=False):
         # Trys to write a new record to a cached track image
         # Raises an exception if it fails
         self.__check_ro()
@@ -469,11 +533,11 @@ class ckdev(object):
     #
     # header struct formats
     devfmt="<8sLLccH"  # Device header format
-    recfmt=">HHccH"    # Record header format
-    trkfmt=">cHH"      # Track header format
+    recfmt=">HHBBH"    # Record header format
+    trkfmt=">BHH"      # Track header format
     # header related information
     hdrdev={}          # This maps the device header type field to instances
-    hdrID="CKD_P370"   # Constant in a Hercules CKD device header
+    hdrID=b"CKD_P370"  # Constant in a Hercules CKD device header
     hdrsize=20         # Size of device image header
     @staticmethod
     def ckfmt(fmt,field,length):
@@ -567,7 +631,7 @@ class ckdev(object):
         # (This module supports only one image file for a volume)
         self.elfs=self.lfs()
         # Header device type
-        self.devtyp=chr(devtyp&0xFF)
+        self.devtyp=bytes([devtyp&0xFF])
         #
         # Register myself with the ckd class
         ckdev.register(self)
@@ -655,9 +719,21 @@ class ckdev(object):
                         self.eheads,\
                         self.etrksize,\
                         self.devtyp,\
-                        "\x00",
+                        b"\x00",
                         0)
-        return "%s%s" % (hdr,492*"\x00")
+        return hdr+492*b"\x00"
+    def empty_track(self):
+        # returns the first 512-byte sector of an initialized track for
+        # cylinder 0 head 0: the home address, the standard R0 and the end of
+        # track marker followed by binary zeros.  The remainder of the track
+        # image is binary zeros.
+        sector=bytearray(512)
+        struct.pack_into(ckdev.trkfmt,sector,0,0,0,0)
+        pos=home.hdrsize
+        struct.pack_into(ckdev.recfmt,sector,pos,0,0,0,0,len(track.r0data))
+        pos+=record.hdrsize+len(track.r0data)
+        sector[pos:pos+8]=8*b"\xFF"
+        return sector
     def lfs(self):
         # This method determines if Large File System is required for this
         # device.  It uses the same rules as Hercules dasdutil.c create_ckd().
@@ -887,18 +963,18 @@ class pos_2(devcap):
 class home(object):
     # This class abstracts the track home address
     hdrsize=5
+    ha_ccdd=1     # Offset of the cylinder and head in the home address
     def parse(trkimg,debug=False):
-        header=trkimg[:home.hdrsize]
-        bin,cyl,head=struct.unpack(ckdev.trkfmt,header)
+        # Returns the home instance of a track image without copying it
+        bin,cyl,head=struct.unpack_from(ckdev.trkfmt,trkimg,0)
         if debug:
             print("ckdutil.py: debug: home.parse: " \
                 "HOME BIN=0x%02X CYL=%s HEAD=%s" \
-                % (ord(bin),cyl,head))
-        if bin!="\x00":
+                % (bin,cyl,head))
+        if bin!=0:
             raise ValueError("invalid home address for track: (%s,%s)" \
                 % (cyl,head))
-        ha=home(cyl,head)
-        return (ha,trkimg[home.hdrsize:])
+        return home(cyl,head)
     parse=staticmethod(parse)
     def __init__(self,cyl,head):
         self.cyl=cyl
@@ -912,32 +988,35 @@ class home(object):
         #  1,2  =  cyl (big-endian)
         #  3,4  =  head (big-endian)
         # 
-        return struct.pack(ckdev.trkfmt,"\x00",self.cyl,self.head)
+        return struct.pack(ckdev.trkfmt,0,self.cyl,self.head)
     def vsize(self):
         return home.hdrsize
 
 class record(object):
     # This class abstracts a CKD record
     hdrsize=8
-    def parse(trkimg,debug=True):
-        header,trk=track.sever(trkimg,record.hdrsize)
-        cyl,head,rec,klen,dlen=struct.unpack(ckdev.recfmt,header)
-        rec=ord(rec)
-        klen=ord(klen)
+    def parse(trkimg,pos,debug=True):
+        # Returns a tuple of the record starting at a track image position and
+        # the position following it.  The track image must be a memoryview.  The
+        # record's key and data are memoryview slices of it, not copies.
+        end=pos+record.hdrsize
+        if end>len(trkimg):
+            raise IndexError("track image truncated at record header: %s" % pos)
+        cyl,head,rec,klen,dlen=struct.unpack_from(ckdev.recfmt,trkimg,pos)
         if debug:
             print("ckdutil.py: debug: record.parse: " \
                 "Record CYL=%s HEAD=%s REC=%s key=%s data=%s" \
                 % (cyl,head,rec,klen,dlen))
-        key=""
-        data=""
-        if klen!=0:
-            key,trk=track.sever(trk,klen)
-        if dlen!=0:
-            data,trk=track.sever(trk,dlen)
+        key=trkimg[end:end+klen]
+        end+=klen
+        data=trkimg[end:end+dlen]
+        end+=dlen
+        if end>len(trkimg):
+            raise IndexError("track image truncated in record %s: %s" % (rec,pos))
         r=record(cyl,head,rec,key=key,data=data)
-        return (r,trk)
+        return (r,end)
     parse=staticmethod(parse)
-    def __init__(self,cyl,head,rec,key="",data=""):
+    def __init__(self,cyl,head,rec,key=b"",data=b""):
         self.cyl=cyl
         self.head=head
         self.rec=rec
@@ -957,34 +1036,39 @@ class record(object):
         #   5   =  key length
         #  6,7  =  data length
         #
-        return struct.pack(ckdev.recfmt,self.cyl,self.head,chr(self.rec),\
-             chr(len(self.key)),len(self.data))
-    def update(self,data=""):
-        newdata=data
+        return struct.pack(ckdev.recfmt,self.cyl,self.head,self.rec,\
+             len(self.key),len(self.data))
+    def update(self,data=b""):
+        newdata=bytes(data)
         pad=len(self.data)-len(data)
         if pad>0:
-            pad=pad*"\x00"
-            newdata="%s%s" % (newdata,pad)
+            newdata+=pad*b"\x00"
         self.data=newdata[:len(self.data)]
     def vsize(self):
         return record.hdrsize+len(self.key)+len(self.data)
         
 class track(object):
     # This class abstracts a CKD track image
-    eightFF=8*"\xFF"
-    r0data=8*"\x00"
+    eightFF=8*b"\xFF"
+    r0data=8*b"\x00"
     @staticmethod
-    def end_of_track(trkimg):
-        if len(trkimg)<8:
-            raise IndexError("track image truncated: %s" % len(trkimg))
-        return trkimg[:8]==track.eightFF
+    def end_of_track(trkimg,pos=0):
+        if len(trkimg)-pos<8:
+            raise IndexError("track image truncated: %s" % (len(trkimg)-pos))
+        return trkimg[pos:pos+8]==track.eightFF
     @staticmethod
     def parse(trkimg,dev,debug=False):
-        ha,trk=home.parse(trkimg,debug=debug)
+        # The track image is accessed through a memoryview.  Records are located
+        # by their position within it, so the image is never copied.
+        trkimg=memoryview(trkimg)
+        ha=home.parse(trkimg,debug=debug)
         trko=track(dev,ha.cyl,ha.head,debug=debug)
-        while not track.end_of_track(trk):
-           r,trk=record.parse(trk,debug=debug)
-           trko.add(r,debug=debug)
+        pos=home.hdrsize
+        while not track.end_of_track(trkimg,pos):
+           r,pos=record.parse(trkimg,pos,debug=debug)
+           if not trko.add(r,debug=debug):
+               raise ValueError("record %s exceeds capacity of track: (%s,%s)" \
+                   % (r.rec,ha.cyl,ha.head))
         return trko
     @staticmethod
     def sever(trkimg,length):
@@ -1010,6 +1094,7 @@ class track(object):
             print("ckdutil.py: debug: track.__start: initializing track (%s,%s)"\
                 % (self.cyl,self.head))
         self.recs=[]
+        self.index={}    # Dictionary of record instances by record number
         self.eused=0
         self.rused=0
         self.rbal=self.dev.rlen
@@ -1051,6 +1136,8 @@ class track(object):
                     self.eused+size))
             return False
         self.recs.append(rec)
+        if isinstance(rec,record):
+            self.index[rec.rec]=rec
         self.eused+=size
         self.rused=rused
         self.rbal=rbal
@@ -1065,47 +1152,38 @@ class track(object):
                 "creating track image for (%s,%s): records=%s" \
                 % (self.cyl,self.head,len(self.recs)))
         size=self.dev.etrksize
-        image=""
+        parts=[]
         for x in self.recs:
             if debug:
                 print("ckdutil.py: debug: track.pack: %s" % x)
-            image="%s%s" % (image,x.pack())
-        image="%s%s" % (image,track.eightFF)
+            parts.append(x.pack())
+        parts.append(track.eightFF)
+        image=b"".join(parts)
         if len(image)>size:
             raise ValueError("packed track larger than track image %s: %s" \
                 % (size,len(image)))
         pad=size-len(image)
-        image+=pad*"\x00"
+        image+=pad*b"\x00"
         return image
     def read(self,recno):
-        for x in self.recs:
-            if isinstance(x,record) and x.rec==recno:
-                return x
-        return None  # Not found
-    def update(self,recno,data=""):
+        return self.index.get(recno)  # None if not found
+    def update(self,recno,data=b""):
         # updates the data of a record.  Returns True/False
-        for x in range(len(self.recs)):
-            r=self.recs[x]
-            if isinstance(r,record) and r.rec==recno:
-                r.update(data)
-                self.updated=True
-                return True
-        return False
+        r=self.index.get(recno)
+        if r is None:
+            return False
+        r.update(data)
+        self.updated=True
+        return True
     def write(self,rec,debug=False):
         # Writes a new record on the track.  Returns True/False
         if not isinstance(rec,record):
             raise TypeError("track.update requires record instance: %s" % rec)
-        for x in range(len(self.recs)):
-            r=self.recs[x]
-            if isinstance(r,home):
-                continue
-            if isinstance(r,record) and r.rec<rec.rec:
-                continue
-            break
-        if x==len(self.recs)-1:
+        # Records preceding the new record remain on the track
+        newtrk=[r for r in self.recs if isinstance(r,record) and r.rec<rec.rec]
+        if len(newtrk)==len(self.recs)-1:
             succeeded=self.add(rec,warn=debug,debug=debug)
         else:
-            newtrk=self.recs[2:x+1]  # Ignore home and r0 instances
             self.__start(debug=debug)
             for x in newtrk:
                 if not self.add(x,warn=debug,debug=False):
@@ -36,8 +36,10 @@
 this_module="fbautil.py"
 
 # Python imports:
+import mmap                  # Access to memory mapped files
 import os                    # Access to the OS functions
 import stat                  # Access to file stat data
+import sys                   # Access to the standard output file
 
 # SATK imports:
 import hexdump               # Get the dump function for hex display
@@ -102,37 +104,51 @@ def filesize(fo):
 
 
 # This function dumps an FBA image file by physical sector or an extent within the
-# image file by both logical and physical sector numbers.
+# image file by both logical and physical sector numbers.  Sectors are read and
+# dumped one at a time, so the image file is never held in memory.
 # Function Arbuments:
-#   path    the path to the image file being dumped
-#   extent  An fbadscb.Extent object
-def image_dump(path,extent=None):
+#   path     the path to the image file being dumped
+#   extent   An fbadscb.Extent object
+#   out      An open text file object to which the dump is written.  Defaults to
+#            None, the dump is written to sys.stdout.
+#   chars    'ascii' or 'ebcdic' to add a character column to the dump.  Defaults
+#            to None, no character column.
+#   suppress Specify True to suppress duplicate lines within each sector.  Defaults
+#            to False.
+def image_dump(path,extent=None,out=None,chars=None,suppress=False):
+    if out is None:
+        out=sys.stdout
     fo=open(path,"rb")
-    image=fo.read()
     image_size=filesize(fo)
-    fo.close()
 
     if extent is None:
         # Print physical volume sectors
-        print("\nImage File %s\n" % path)
-        for n,rba in enumerate(range(0,image_size,512)):
-            hdr="%s PSEC" % n
-            chunk=image[rba:min(rba+512,image_size)]
-            dump(chunk,hdr=hdr)
+        out.write("\nImage File %s\n\n" % path)
+        pbeg=None
+        beg=0
+        end=image_size
     else:
         # Prnt extent from the volume
         assert isinstance(extent,Extent),\
             "%s - image_dump() - 'extent' argument must be an Extent object: %s" \
                 % (this_module,extent)
 
-        print("\n%s in Image File %s\n" % (extent,path))
+        out.write("\n%s in Image File %s\n\n" % (extent,path))
         pbeg=extent.lower
         beg=pbeg*512
         end=(extent.upper+1)*512
-        for n,rba in enumerate(range(beg,end,512)):
+
+    fo.seek(beg)
+    for n,rba in enumerate(range(beg,end,512)):
+        if pbeg is None:
+            hdr="%s PSEC" % n
+        else:
             hdr="%s LSEC  %s PSEC" % (n,pbeg+n)
-            chunk=image[rba:min(rba+512,image_size)]
-            dump(chunk,hdr=hdr)
+        chunk=fo.read(max(min(512,image_size-rba),0))
+        out.write("%s\n" % hdr)
+        hexdump.dump_write(out,chunk,chars=chars,suppress=suppress)
+        out.write("\n")
+    fo.close()
 
 
 #
@@ -157,6 +173,15 @@ def image_dump(path,extent=None):
 # The fba class must be instantiated by means of either the attach() or new()
 # methods.  After accesses are complete, the instance method detach() terminates
 # access to the image, completes pending writes to the image file and closes it.
+#
+# Both attach() and new() accept mapped=True to access the image file through a
+# memory map rather than by file reads and writes.  A mapped image performs no
+# I/O operation for a sector access.  Reads return read-only memoryview slices of
+# the mapped image instead of bytes sequences unless a bytearray is requested, so
+# the image is changed only by a write.  Writes update the mapped image in place.
+# The flush() method synchronizes the mapped image with the image file.  A
+# memoryview returned by a read remains usable after detach(), the memory map
+# being closed when the last such view is released.
 #   
 # Following creation of the fba object, the following methods are available for
 # single physical sector accesses:
@@ -211,6 +236,7 @@ class fba(object):
 
     record=["fba"]    # recsutil class name of fba records
     pad=512*b"\x00"   # Sector pad
+    init_sectors=2048 # Sectors written by each write of a non-sparse init()
 
     # Dump bytes/bytearray object content as hexadecimal digits with byte positions
     # Method Arguments:
@@ -225,7 +251,7 @@ class fba(object):
             s="%s%s\n" % (indent,hdr)
         else:
             s=""
-        s="%s%s\n" % (s,dump(byts,indent=indent))
+        s="%s%s\n" % (s,hexdump.dump(byts,indent=indent))
         if string:
             return s
         print(s)
@@ -281,8 +307,10 @@ class fba(object):
     #   filename  The path to the existing FBA volume image file
     #   ro        Whether access is read-only (True) or read-write (False).  Defaults
     #             to True.
+    #   mapped    Whether the image file is accessed through a memory map (True) or
+    #             by file reads and writes (False).  Defaults to False.
     @classmethod
-    def attach(cls,filename,ro=False):
+    def attach(cls,filename,ro=False,mapped=False):
         # Access an existing FBA emulating media file for reading or writing.
         if ro:
             mode="rb"
@@ -293,24 +321,37 @@ class fba(object):
         except IOError:
             raise IOError(\
                 "Could not open existing FBA image: %s" % filename) from None
-        return fba(fo,ro)
+        return fba(fo,ro,mapped=mapped)
 
     # Initialize all sectors in an FBA image file to binary zeros.
     # Method Arguments:
-    #   fo     A fba object created by methods new() or attach().  Or a Python
-    #          file object opened for writing.
-    #   dtype  The FBA device type being emulated as a string or the non-standard
-    #          FBA image size as an integer.
-    #   comp   Whether the image file is intended for compression by a Hercules
-    #          utility.  Defaults to False.
+    #   fo       A fba object created by methods new() or attach().  Or a Python
+    #            file object opened for writing.
+    #   dtype    The FBA device type being emulated as a string or the non-standard
+    #            FBA image size as an integer.
+    #   comp     Whether the image file is intended for compression by a Hercules
+    #            utility.  Defaults to False.
+    #   progress Whether initialization progress is reported.  Defaults to False.
+    #   sparse   Whether the image file is created as a sparse file by setting its
+    #            size without writing the sectors (True) or by writing every sector
+    #            (False).  Defaults to None, creating a sparse file unless the image
+    #            is intended for compression.
+    # Exceptions:
+    #   ValueError if both sparse=True and comp=True are specified
     @classmethod
-    def init(cls,fo,dtype,size=None,comp=False):
+    def init(cls,fo,dtype,size=None,comp=False,progress=False,sparse=None):
+        if sparse is None:
+            sparse=not comp
+        elif comp and sparse:
+            raise ValueError(\
+                "%s - %s.init() - FBA image intended for compression can not be "
+                    "sparse" % (this_module,cls.__name__))
         if isinstance(fo,fba):
-            if fba.ro:
+            if fo.ro:
                 raise ValueError(\
                     "%s - %s.init() - can not initialize a read-only FBA image" \
                         % (this_module,cls.__name__))
-            f=fba.fo
+            f=fo.fo
         else:
             f=fo
 
@@ -341,15 +382,32 @@ class fba(object):
             if excess!=0:
                 sectors=(grps+1)*blkgrp
 
-        f.truncate()
-        for x in range(sectors):
+        f.seek(0)
+        f.truncate(0)
+        if sparse:
+            # Binary zeros are implied by extending the file to its full size
             try:
-                f.write(fba.pad)
+                f.truncate(sectors*512)
             except IOError:
                 raise IOError(\
-                    "%s - %s.init() - error initializing FBA image sector %s: %s" \
-                        % (this_module,cls.__name__,x,f.name))
+                    "%s - %s.init() - error initializing FBA image: %s" \
+                        % (this_module,cls.__name__,f.name)) from None
+        else:
+            # Write the sectors in groups of fba.init_sectors
+            group=fba.init_sectors
+            pad=group*fba.pad
+            for x in range(0,sectors,group):
+                try:
+                    f.write(pad[:min(group,sectors-x)*512])
+                except IOError:
+                    raise IOError(\
+                        "%s - %s.init() - error initializing FBA image sector %s: %s" \
+                            % (this_module,cls.__name__,x,f.name)) from None
+                if progress and ((x//group)%100)==0:
+                    print("Sectors initialized: %s" % x)
         f.flush()
+        if progress:
+            print("FBA image initialized with %s sectors: %s" % (sectors,f.name))
 
     # Create a new FBA image file and initialize all sector to binary zeros.
     # Method Arguments:
@@ -359,11 +417,27 @@ class fba(object):
     #             FBA image size as an integer.
     #   comp      Whether the image file is intended for compression by a Hercules
     #             utility.  Defaults to False.
+    #   progress  Whether initialization progress is reported.  Defaults to False.
+    #   sparse    Whether the image file is created as a sparse file.  Defaults to
+    #             None, creating a sparse file unless the image is intended for
+    #             compression.
+    #   mapped    Whether the image file is accessed through a memory map (True) or
+    #             by file reads and writes (False).  Defaults to False.
     # Returns:
     #   the fba object providing access to the emulated FBA image
+    # Exceptions:
+    #   ValueError if both sparse=True and comp=True are specified
     # Note: size is retained for media.py compatibility.
     @classmethod
-    def new(cls,filename,dtype,size=None,comp=False):
+    def new(cls,filename,dtype,size=None,comp=False,progress=False,sparse=None,\
+            mapped=False):
+        # Detected before an existing file is overwritten
+        if sparse is None:
+            sparse=not comp
+        elif comp and sparse:
+            raise ValueError(\
+                "%s - %s.new() - FBA image intended for compression can not be "
+                    "sparse: %s" % (this_module,cls.__name__,filename))
         try:
             fo=open(filename,"w+b")
         except IOError:
@@ -371,11 +445,11 @@ class fba(object):
                 "%s - %s.new() - could not open new FBA image: %s" \
                     % (this_module,cls.__name__,filename)) from None
 
-        fba.init(fo,dtype,size=size,comp=comp)
-        return fba(fo,ro=False,pending=True)
+        fba.init(fo,dtype,size=size,comp=comp,progress=progress,sparse=sparse)
+        return fba(fo,ro=False,pending=True,mapped=mapped)
 
     # See the description above for 
-    def __init__(self,fo,ro=True,pending=False):
+    def __init__(self,fo,ro=True,pending=False,mapped=False):
         # Image file controls and status
         self.filename=fo.name        # Remember the filename of the image file
         # Image file size in bytes
@@ -387,6 +461,24 @@ class fba(object):
         self.fo=fo               # Open file object from new() or attach()
         self.pending=pending     # Whether file object writes may be pending
 
+        # Memory mapped image file
+        self.map=None            # mmap object of a mapped image file
+        self.view=None           # memoryview of the mapped image file
+        if mapped and self.filesize:
+            if self.pending:
+                self._flush()
+            if ro:
+                access=mmap.ACCESS_READ
+            else:
+                access=mmap.ACCESS_WRITE
+            try:
+                self.map=mmap.mmap(fo.fileno(),self.filesize,access=access)
+            except (OSError,ValueError) as me:
+                raise IOError("%s could not memory map FBA image %s: %s" \
+                    % (eloc(self,"__init__",module=this_module),self.filename,\
+                        me)) from None
+            self.view=memoryview(self.map)
+
         # Emulation controls and status
         self.ro=ro              # Set read-only (True) or read-write (False)
         self.last=sectors-1     # Last physical sector number
@@ -436,17 +528,30 @@ class fba(object):
                 "%s extent upper boundary is not within the FBA image (0-%s): %s"\
                     % (eloc(self,"_ck_extent",module=this_module),self.last,upper))
 
-    # Perform the actual forcing of possible pending writes to occur
+    # Perform the actual forcing of possible pending writes to occur.  A mapped
+    # image is synchronized with the image file.
     def _flush(self):
-        self.fo.flush()
+        if self.map is not None:
+            self.map.flush()
+        else:
+            self.fo.flush()
         self.pending=False
 
     # Performs a low level read.
     # Method Argument:
     #   size   the number of bytes to read from the image file current position
     # Returns:
-    #   the bytes read
+    #   the bytes read.  A mapped image returns a read-only memoryview of them.
     def _read(self,size):
+        if self.view is not None:
+            pos=self.sector*512
+            byts=self.view[pos:pos+size].toreadonly()
+            if len(byts)!=size:
+                raise ValueError(\
+                    "%s did not read requested bytes (%s) from image file: %s"
+                        % (eloc(self,"_read",module=this_module),size,len(byts)))
+            return byts
+
         # Force writing any pending writes before attempting to read the file
         # otherwise, the image file may have stale sector data.
         if self.pending:
@@ -497,19 +602,20 @@ class fba(object):
 
     # Performs the low level write.
     # Method Argument:
-    #   data   a bytes sequence being written.  Must be bytes not bytearray
+    #   data   a bytes, bytearray or memoryview sequence being written.  It is
+    #          written without being copied.
     def _write(self,data):
-        # Ensure bytes sequence is being written not bytearray.  Python requires
-        # a bytes sequence.  Sequence can not be bytearray.  This give the using
-        # software the freedom to use either sequence.
-        if isinstance(data,bytearray):
-            byts=bytes(data)
-        else:
-            byts=data
-        assert isinstance(byts,bytes),\
+        byts=data
+        assert isinstance(byts,(bytes,bytearray,memoryview)),\
             "%s 'data' argument must be a bytes/bytearray sequence for sector %s: %s" \
                 % (eloc(self,"_write",module=this_module),byts,self.sector)
 
+        # Update a mapped image in place
+        if self.view is not None:
+            pos=self.sector*512
+            self.view[pos:pos+len(byts)]=byts
+            return
+
         # Write the bytes
         try:
             self.fo.write(byts)
@@ -529,9 +635,23 @@ class fba(object):
 
         if self.extent:
             self.ds_close()
+        mapobj=self.map
+        view=self.view
+        self.map=self.view=None
         try:
-            self.fo.flush()
-            self.fo.close()
+            try:
+                if mapobj is not None:
+                    mapobj.flush()
+                    view.release()
+                    try:
+                        mapobj.close()
+                    except BufferError:
+                        # Sector views returned by read() still reference the map.
+                        # It is closed when the last of them is released.
+                        pass
+                self.fo.flush()
+            finally:
+                self.fo.close()
         except IOError:
             raise IOError(\
                 "%s IOError detaching %s FBA image: %s" \
@@ -595,7 +715,7 @@ class fba(object):
         if __debug__:
             if self._trace:
                 sec=self.sector
-                fpos=self.fo.tell()
+                fpos=self.sector*512
 
         # Read the physical sector using the low-level routine
         data=self._read(512)
@@ -632,12 +752,14 @@ class fba(object):
                     self.filesize))
 
         # Perform the positioning by physical sector number in this object and
-        # position the file object accordingly
-        try:
-            self.fo.seek(sector_loc)
-        except IOError:
-            raise IOError("%s IOError while positioning to FBA sector: %s" \
-                % (eloc(self,"seek",module=this_module),self.sector))
+        # position the file object accordingly.  A mapped image is accessed by
+        # the physical sector number alone.
+        if self.map is None:
+            try:
+                self.fo.seek(sector_loc)
+            except IOError:
+                raise IOError("%s IOError while positioning to FBA sector: %s" \
+                    % (eloc(self,"seek",module=this_module),self.sector))
 
         self.sector=sector
 
@@ -645,7 +767,7 @@ class fba(object):
         if __debug__:
             if self._trace:
                 print("%s SEEK: sector: %s  file pos: %s" \
-                    % (eloc(self,"seek",module=this_module),sector,self.fo.tell()))
+                    % (eloc(self,"seek",module=this_module),sector,self.sector*512))
 
     # Return the current physical sector position
     def tell(self):
@@ -658,7 +780,7 @@ class fba(object):
     # Write content to the next sector or a specified sector.  Following the write
     # operation the image is positioned at the next physical sector.
     # Method Arguments:
-    #   byts     A bytes/bytearray sequence of the content to be written
+    #   byts     A bytes/bytearray/memoryview sequence of the content to be written
     #   sector   Specify a physical sector number to which the content is written.
     #            Specify None to write to the next sector to which the image is
     #            positioned based upon the previously accessed sector.  Defaults to
@@ -681,7 +803,7 @@ class fba(object):
         data=byts
         if len(data)!=512:
             if pad:
-               data=data+fba.pad
+               data=bytes(data)+fba.pad
                data=data[:512]
             else:
                 raise ValueError("%s FBA image sector must be 512 bytes: %s"\
@@ -696,7 +818,7 @@ class fba(object):
                     padded=""
                 print("%s WRITE: sector: %s  file pos: %s%s" \
                     % (eloc(self,"write",module=this_module),\
-                        sector,self.fo.tell(),padded))
+                        sector,self.sector*512,padded))
                 if self._tdump:
                     dump(data,indent="    ")
 
@@ -785,20 +907,23 @@ class fba(object):
                     s="%s DS_ERASING: logical sector:%s  physical sector: %s"\
                         "file pos:%s  with:%02X" \
                             % (eloc(self,"ds_read",module=this_module),\
-                                sector,p_first,self.fo.tell(),f)
+                                sector,p_first,self.sector*512,f)
                 else:
                     s="%s DS_ERASING: logical sectors:%s-%s  physical sectors: %s-%s" \
                         "  sectors:%s  file pos:%s  with:0x%02X" \
                             % (eloc(self,"ds_read",module=this_module),\
-                                sector,l_last,p_first,p_last,secs,self.fo.tell(),\
+                                sector,l_last,p_first,p_last,secs,self.sector*512,\
                                     f)
                 print(s)
 
-        # Erase the requested sectors' content
-        for n in range(secs):
-            self._write(byts)
-            self.sector+=1
-            self.ds_sector+=1
+        # Erase the requested sectors' content in groups of fba.init_sectors
+        group=fba.init_sectors
+        grpbyts=byts*min(secs,group)
+        for n in range(0,secs,group):
+            count=min(group,secs-n)
+            self._write(memoryview(grpbyts)[:count*512])
+            self.sector+=count
+            self.ds_sector+=count
 
     # This method returns an Extent object for a specific range of physical sectors
     # Method Arguments:
@@ -862,7 +987,8 @@ class fba(object):
     # Programming Note: use array=True if the user plans to update the content
     # Returns:
     #   a bytes/bytearray sequence (as requested) of the sector or sectors content
-    #   form the image file
+    #   form the image file.  A mapped image returns a read-only memoryview slice
+    #   of the mapped image rather than a bytes sequence.
     # Exception:
     #   ValueError for various detected errors.  See _to_physical() method 
     #              for detected errors.
@@ -890,12 +1016,12 @@ class fba(object):
                 if sectors == 1:
                     s="%s DS_READ: logical sector:%s  physical sector: %s"\
                     "  file pos:%s" % (eloc(self,"ds_read",module=this_module),\
-                            sec,p_first,self.fo.tell())
+                            sec,p_first,self.sector*512)
                 else:
                     s="%s DS_READ: logical sectors:%s-%s  physical sectors: %s-%s" \
                         "  sectors:%s  file pos: %s"\
                             % (eloc(self,"ds_read",module=this_module),\
-                                sec,l_last,p_first,p_last,sectors,self.fo.tell())
+                                sec,l_last,p_first,p_last,sectors,self.sector*512)
                 print(s)
 
         # Read the sector' or sectors' content
@@ -973,12 +1099,12 @@ class fba(object):
                 if sectors == 1:
                     s="%s DS_WRITE: logical sector:%s  physical sector: %s"\
                         "file pos: %s" % (eloc(self,"ds_write",module=this_module),\
-                            sector,p_first,self.fo.tell())
+                            sector,p_first,self.sector*512)
                 else:
                     s="%s DS_WRITE: logical sectors:%s-%s  physical sectors: %s-%s" \
                         "sectors:%s  file pos:%s" \
                             % (eloc(self,"ds_write",module=this_module),sector,\
-                                l_last,p_first,p_last,sectors,self.fo.tell())
+                                l_last,p_first,p_last,sectors,self.sector*512)
                 print(s)
                 if self._tdump:
                     dump(byts,indent="    ")
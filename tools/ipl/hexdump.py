@@ -386,40 +386,112 @@ class bstruct3(bstruct):
         
 bstructx=bstruct.init()
 
-def dump(barray,start=0,mode=24,indent=""):
-    #isstring=isinstance(barray,type(""))
-    isstring=not isinstance(barray,(bytes,bytearray))
+# Character column translation tables of the dump engine by character set name.
+# Bytes without a printable ASCII character are displayed as a period.
+def _dump_table(codec):
+    table=bytearray(b".")*256
+    for n in range(256):
+        c=bytes([n]).decode(codec)
+        if " "<=c<="~":
+            table[n]=ord(c)
+    return bytes(table)
+
+_dump_chars={"ascii":_dump_table("latin-1"),"ebcdic":_dump_table("cp037")}
+_dump_block=4096      # Lines converted to hexadecimal by each bulk conversion
+
+# The dump engine: yields the lines of a hex dump of a binary sequence, without
+# line ends.  Each line displays 16 bytes as four words of hexadecimal digits
+# preceded by the line's address.  The bytes of each block of lines are converted
+# with a single bytes.hex() call, so the time taken is proportional to the size of
+# the sequence and only the current block is held as text.
+# Function Arguments:
+#   barray    the bytes, bytearray, memoryview or str sequence being dumped.  A
+#             str must only contain characters with ordinals less than 256.
+#   start     the initial starting address.  Defaults to 0
+#   mode      the "address mode" used for the dump.  Accepts 24,31,64.
+#             Defaults to 24
+#   indent    a string constituting the line indent
+#   chars     'ascii' or 'ebcdic' to add a column of the line's characters in that
+#             character set.  Defaults to None, no character column.
+#   suppress  Specify True to replace consecutive lines identical to the line
+#             preceding them with a single line identifying the suppressed
+#             addresses.  Defaults to False, all lines are displayed.
+def dump_lines(barray,start=0,mode=24,indent="",chars=None,suppress=False):
+    if isinstance(barray,str):
+        barray=barray.encode("latin-1")
+    data=memoryview(barray)
+    if data.ndim!=1 or data.itemsize!=1:
+        data=data.cast("B")
     if mode==31:
-        format="%s%s%08X %s\n"
+        digits=8
+    elif mode==64:
+        digits=16
     else:
-        if mode==64:
-           format="%s%s%016X %s\n"
-        else:
-           format="%s%s%06X %s\n"
-    string=""
-    addr=start
-    strlen=len(barray)
-    #print("strlen: %s" % strlen)
-    strend=strlen-1
-    for x in range(0,strlen,16):
-        #print("x=%s" % x)
-        linestr=""
-        for y in range(x,x+15,4):
-            #print("y=%s" % y)
-            wordstr=""
-            if y>strend:
-                continue
-            last=min(y+4,strlen)
-            for z in range(y,last,1):
-                #print("z=%s" % z)
-                if isstring: 
-                    wordstr="%s%02X" % (wordstr,ord(barray[z]))
-                else:
-                    wordstr="%s%02X" % (wordstr,barray[z])
-            linestr="%s %s" % (linestr,wordstr)
-        string=format % (string,indent,addr,linestr)
-        addr+=16
-    return string[:-1]
+        digits=6
+    if chars is None:
+        table=None
+    else:
+        try:
+            table=_dump_chars[chars]
+        except KeyError:
+            raise ValueError("hexdump.py - dump_lines() - unrecognized 'chars' "
+                "argument: %s" % chars) from None
+    line_fmt="%s%0*X  %s"
+    same_fmt="%s%0*X-%0*X  same as above"
+
+    datalen=len(data)
+    blklen=_dump_block*16
+    prev=None          # Data of the last displayed line when suppressing
+    same=None          # Address of the first suppressed line
+    for blk in range(0,datalen,blklen):
+        block=data[blk:blk+blklen]
+        # Each 16-byte line is 35 characters followed by a separating blank
+        hexstr=block.hex(" ",-4).upper()
+        if table is not None:
+            chrstr=bytes(block).translate(table).decode("ascii")
+        for x in range(0,len(block),16):
+            if suppress:
+                line=block[x:x+16]
+                if line==prev:
+                    if same is None:
+                        same=start+blk+x
+                    continue
+                if same is not None:
+                    yield same_fmt % (indent,digits,same,digits,start+blk+x-1)
+                    same=None
+                prev=line
+            n=x//16
+            hexline=hexstr[n*36:n*36+35]
+            if table is None:
+                yield line_fmt % (indent,digits,start+blk+x,hexline)
+            else:
+                yield "%s%0*X  %-35s  *%s*" \
+                    % (indent,digits,start+blk+x,hexline,chrstr[x:x+16])
+    if same is not None:
+        yield same_fmt % (indent,digits,same,digits,start+datalen-1)
+
+# Produce a hex dump of a binary sequence as a string without a final line end.
+# See dump_lines() for the function arguments.
+def dump(barray,start=0,mode=24,indent="",chars=None,suppress=False):
+    return "\n".join(dump_lines(barray,start=start,mode=mode,indent=indent,\
+        chars=chars,suppress=suppress))
+
+# Write a hex dump of a binary sequence to an open text file object, one line at a
+# time.  No more of the dump than the engine's current block is held in memory.
+# Function Arguments:
+#   fo        the open text file object to which the dump is written
+#   barray    the sequence being dumped
+#   Other keyword arguments are those of dump_lines().
+# Returns:
+#   the number of lines written
+def dump_write(fo,barray,**kwds):
+    lines=0
+    write=fo.write
+    for line in dump_lines(barray,**kwds):
+        write(line)
+        write("\n")
+        lines+=1
+    return lines
 
 #
 # These methods operate on individual big-endian fields.
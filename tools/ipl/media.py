@@ -408,7 +408,8 @@ class fba_handler(handler):
             self.dev.write(r.content,sector=r.recid)
     def media(self,devcls,size=None,progress=False):
         # create the device object
-        self.dev=fbautil.fba.new(self.path,self.dtype,size=size,comp=False)
+        self.dev=fbautil.fba.new(self.path,self.dtype,size=size,comp=False,\
+            progress=progress,mapped=True)
     def sequence(self,reclst):
         # sequence the fba record instances for placement on the media
         sorted_list=[]
@@ -336,6 +336,13 @@ class Unrecognized(Token):
 #    tcls    Class instantiated for a recognized token of this type.  Defaults to
 #            Token
 class Type(object):
+    # Used by the alternative() method to adapt a pattern to a combined expression
+    flag_letters=[(re.IGNORECASE,"i"),(re.MULTILINE,"m"),(re.DOTALL,"s"),\
+                  (re.VERBOSE,"x"),(re.ASCII,"a")]
+    global_re=re.compile(r"^(\(\?[aiLmsux]+\))+")
+    named_re=re.compile(r"\(\?P<[A-Za-z_][A-Za-z0-9_]*>")
+    backref_re=re.compile(r"\\[1-9]")
+
     def __init__(self,tid,pattern,flags=0,eol=False,ignore=False,mo=False,\
         tcls=Token,debug=False):
         # Lexer attributes
@@ -375,7 +382,6 @@ class Type(object):
         if self.debug:
             print("Type '%s' match(string,pos=%s,line=%s,eolpos=%s)" \
                 % (self.tid,pos,line,eolpos))
-        eols=0
         res=None
 
         # Try to recognize a token with my Regular Expression match pattern
@@ -390,9 +396,58 @@ class Type(object):
             raise LexerError(pos,line,pos-eolpos)
 
         # Build the Token instance for the recognized token
-        string=mo.group()
         if self.mo:
             res=mo
+        return self.token(mo.group(),mo.start(),mo.end(),pos,line,eolpos,res)
+
+    # Returns the regular expression pattern of this type suitable for use as one
+    # alternative within a combined regular expression or None if the type must be
+    # matched by itself.  Any compilation flags, including global inline flags at
+    # the start of the pattern, are converted into a scoped inline flag group.
+    # Named groups within the pattern become non-capturing groups.  Patterns using
+    # back references or conditional groups are not combined.
+    def alternative(self):
+        if self.cre is None or type(self).match is not Type.match:
+            # A subclass recognizing tokens in its own way must be used directly
+            return None
+        pattern=self.pattern
+        if not isinstance(pattern,str) or self.debug:
+            return None
+        if "(?P=" in pattern or "(?(" in pattern \
+           or Type.backref_re.search(pattern) is not None:
+            return None
+
+        flags=""
+        for flag,letter in Type.flag_letters:
+            if self.cre.flags & flag:
+                flags="%s%s" % (flags,letter)
+        pattern=Type.global_re.sub("",pattern,count=1)
+        pattern=Type.named_re.sub("(?:",pattern)
+        if flags:
+            # The new line ends any comment in a verbose pattern
+            pattern="(?%s:%s\n)" % (flags,pattern)
+
+        # Make sure the pattern can stand alone as a group
+        try:
+            re.compile("(?P<t>%s)" % pattern)
+        except re.error:
+            return None
+        return pattern
+
+    # Accessor method to dynamically set debug status
+    def setDebug(self,value):
+        self.debug=value
+
+    # Returns the Token (or subclass) instance for a string recognized by this type.
+    # Method arguments:
+    #   string  The recognized string
+    #   beg     The starting position of the recognized string
+    #   end     The ending position of the recognized string
+    #   pos     The position at which recognition started
+    #   line    The line number of the recognized string
+    #   eolpos  The position of the start of the current line
+    #   mo      The match object preserved in the token or None
+    def token(self,string,beg,end,pos,line,eolpos,mo):
         if self.debug:
             print("matched string '%s' creating tcls: %s" % (string,self.tcls))
             
@@ -412,8 +467,8 @@ class Type(object):
             print("created token: %s()" % tok.__class__.__name__)
 
         relpos=pos-eolpos
-        tok.init(self.tid,string,mo.start(),mo.end(),\
-            line=line,linepos=relpos,eols=eols,ignore=self.ignore,mo=res)
+        tok.init(self.tid,string,beg,end,\
+            line=line,linepos=relpos,eols=0,ignore=self.ignore,mo=mo)
 
         if self.eol:
             tok._newline()
@@ -421,10 +476,6 @@ class Type(object):
         if self.debug:
             print("Type '%s' match(): recognized Token:\n   %s" % (self.tid,tok))
         return tok
-        
-    # Accessor method to dynamically set debug status
-    def setDebug(self,value):
-        self.debug=value
 
 class EmptyType(Type):
     def __init__(self,tid="EMPTY",tcls=Empty,debug=False):
@@ -442,6 +493,95 @@ class EOSType(Type):
         tok.init(self.tid,pos,line,0)
         return tok
 
+# +-----------------------------------------------+
+# |                                               |
+# |  COMPILED SINGLE PASS TOKEN TYPE RECOGNITION  |
+# |                                               |
+# +-----------------------------------------------+
+
+# This class recognizes one token from a sequence of Type instances using a single
+# regular expression match in place of trying each Type in turn.  Consecutive types
+# whose patterns may be combined are placed in one alternation of named groups.
+# Python regular expression alternation selects the first alternative that
+# matches, preserving the priority of the types.  The name of the last matched
+# group identifies the recognizing type.  Types that can not be combined, see
+# Type.alternative(), are matched individually in their original sequence.
+#
+# A type that preserves its match object in the Token is matched again by itself
+# so the Token's groups are those of the type's own regular expression.
+#
+# Instance Argument:
+#   typs   The list of Type instances in recognition priority sequence.
+class Dispatcher(object):
+    def __init__(self,typs):
+        # List of tuples: (compiled regular expression, list of types).  A
+        # compiled regular expression of None indicates the single type must be
+        # matched by itself.
+        self.segments=[]
+
+        alts=[]     # Patterns of the current combined expression
+        types=[]    # Types of the current combined expression
+        for typ in typs:
+            pattern=typ.alternative()
+            if pattern is None:
+                self.__combine(alts,types)
+                alts=[]
+                types=[]
+                self.segments.append((None,[typ,]))
+                continue
+            alts.append("(?P<T%s>%s)" % (len(types),pattern))
+            types.append(typ)
+        self.__combine(alts,types)
+
+    # Add a segment for a combined regular expression of one or more types
+    def __combine(self,alts,types):
+        if len(types)==0:
+            return
+        if len(types)==1:
+            self.segments.append((None,types))
+            return
+        try:
+            cre=re.compile("|".join(alts))
+        except re.error:
+            # Should not happen, but individually matched types always work
+            for typ in types:
+                self.segments.append((None,[typ,]))
+            return
+        self.segments.append((cre,types))
+
+    # Returns the Token recognized by the first matching type or None if no type
+    # matches at the position.
+    def match(self,string,pos,line,linepos):
+        for cre,types in self.segments:
+            if cre is None:
+                try:
+                    return types[0].match(string,pos,line,linepos)
+                except LexerError:
+                    continue
+            mo=cre.match(string,pos)
+            if mo is None:
+                continue
+            ndx=int(mo.lastgroup[1:])
+            typ=types[ndx]
+            if typ.mo:
+                return typ.match(string,pos,line,linepos)
+            return typ.token(mo.group(),mo.start(),mo.end(),pos,line,linepos,None)
+        return None
+
+
+# Compare a token from compiled recognition with the token from recognition by
+# trying each type in sequence.  Raises a LexerError if they differ.
+def verify(compiled,sequential,pos,line,linepos):
+    if compiled is None and sequential is None:
+        return
+    if compiled is None or sequential is None \
+       or compiled.tid!=sequential.tid \
+       or compiled.beg!=sequential.beg or compiled.end!=sequential.end \
+       or compiled.__class__ is not sequential.__class__:
+        raise LexerError(pos=pos,line=line,linepos=linepos,\
+            msg="compiled recognition %s differs from sequential recognition %s" \
+                % (compiled,sequential))
+
 # +--------------------------------------------+
 # |                                            |
 # |  THE CONTEXT INSENSITIVE LEXICAL ANALYZER  |
@@ -486,11 +626,20 @@ class EOSType(Type):
 #              specification
 #    ucls      The class that is instantiated for unrecognized character strings.
 #              Defaults to Unrecognized.
+#    compiled  Specify True to recognize types using a single combined regular
+#              expression.  Specify False to try each type in sequence.  Defaults
+#              to True.
+#    verify    Specify True to perform both compiled and sequential recognition
+#              and raise a LexerError if they differ.  Defaults to False.
 class Lexer(object):
-    def __init__(self,dup=False,grammar=False,ucls=Unrecognized):
+    def __init__(self,dup=False,grammar=False,ucls=Unrecognized,compiled=True,\
+                 verify=False):
         self.dup=dup   # Indicate whether duplicate token type id's are allowed
         self.ucls=ucls # Class instantiated for unrecognized character sequences
         self.grammar=grammar # Ensure Type instance tis is an uppercase name
+        self.compiled=compiled  # Use combined regular expression recognition
+        self.verify=verify      # Verify compiled against sequential recognition
+        self.dispatcher=None    # Dispatcher object built when first needed
         
         # Parser compatible token type tid's must start with a letter and may be
         # by any number of letters, 'a'-'z' or 'A'-'Z', numbers, '0'-'9' or 
@@ -672,6 +821,25 @@ class Lexer(object):
     #    line    The line number associated with the pos argument.  Defaults to 0.
     #    linepos The position within the current being recognized. Defaults to 0.
     def recognize(self,string,pos=0,line=0,linepos=0):
+        if not self.compiled:
+            tok=self.recognize_types(string,pos,line,linepos)
+        else:
+            if self.dispatcher is None:
+                self.dispatcher=Dispatcher(\
+                    [typ for typ in self.typs if not isinstance(typ,EOSType)])
+            tok=self.dispatcher.match(string,pos,line,linepos)
+            if self.verify:
+                verify(tok,self.recognize_types(string,pos,line,linepos),\
+                    pos,line,linepos)
+        if tok is None:
+            # None of the associated types matches the string
+            raise LexerError(pos=pos,line=line,linepos=linepos)
+        return tok
+
+    # Returns an instance of Token when one of the associated types is recognized
+    # by trying each type in sequence or None if no type is recognized.
+    # Method arguments are the same as the recognize() method.
+    def recognize_types(self,string,pos=0,line=0,linepos=0):
         for typ in self.typs:
             if self.eos and isinstance(typ,EOSType):  # put pseudo token type test here
                 continue
@@ -679,8 +847,7 @@ class Lexer(object):
                 return typ.match(string,pos,line,linepos)
             except LexerError:
                 continue
-        # None of the associated types matches the string
-        raise LexerError(pos=pos,line=line,linepos=linepos)
+        return None
 
     # Prematurely stops tokenizing iterator without an exception
     def stop(self):
@@ -751,6 +918,7 @@ class Lexer(object):
                     "already registered" % self.emptytype.tid)
         else:
             self.typs.append(t)
+            self.dispatcher=None    # Rebuild with the new type when next used
         self.tids.append(t.tid)
 
     # Print the list of registered tokens
@@ -768,12 +936,23 @@ class Lexer(object):
 # This stateless recognizer operates on a specific position within a string and
 # determines if any of its registered token types matches.  It provides a single
 # 'context' in which recognition occurs.
+#
+# Instance Arguments:
+#   name      The name of the context
+#   debug     Recognizer debug flag
+#   compiled  Specify True to recognize types using a single combined regular
+#             expression.  Specify False to try each type in sequence.
+#   verify    Specify True to raise a LexerError if compiled and sequential
+#             recognition differ.
 class Recognizer(object):
-    def __init__(self, name,debug=False):
+    def __init__(self, name,debug=False,compiled=True,verify=False):
         self.name=name      # Name of the context specific recognizer
         self.debug=debug    # Recognizer debug flag
         self.typs=[]        # List of Type instances for recognized tokens
         self.tids=[]        # List of Type tids for detection of duplicates
+        self.compiled=compiled  # Use combined regular expression recognition
+        self.verify=verify      # Verify compiled against sequential recognition
+        self.dispatcher=None    # Dispatcher object built when first needed
 
     # Returns an instance of Token when one of the associated types is recognized
     # in the supplied string.  Othewise, a LexerError exception is raised.
@@ -788,13 +967,19 @@ class Recognizer(object):
     # Exception:
     #    LexerError if no match is found and fail is True
     def recognize(self,string,pos=0,line=0,linepos=0,fail=False):
-        for typ in self.typs:
-            # Recognition of the EOS (end-of-string) condition occurs before entry
-            # to this method
-            try:
-                return typ.match(string,pos,line,linepos)
-            except LexerError:
-                continue
+        # Recognition of the EOS (end-of-string) condition occurs before entry
+        # to this method
+        if not self.compiled:
+            tok=self.recognize_types(string,pos,line,linepos)
+        else:
+            if self.dispatcher is None:
+                self.dispatcher=Dispatcher(self.typs)
+            tok=self.dispatcher.match(string,pos,line,linepos)
+            if self.verify:
+                verify(tok,self.recognize_types(string,pos,line,linepos),\
+                    pos,line,linepos)
+        if tok is not None:
+            return tok
 
         # None of the token types associated with this context matches the string
         if fail:
@@ -811,6 +996,16 @@ class Recognizer(object):
         unrecognized._extend(bad,0)
         return unrecognized
 
+    # Returns an instance of Token when one of the associated types is recognized
+    # by trying each type in sequence or None if no type is recognized.
+    def recognize_types(self,string,pos=0,line=0,linepos=0):
+        for typ in self.typs:
+            try:
+                return typ.match(string,pos,line,linepos)
+            except LexerError:
+                continue
+        return None
+
     # Associates the supplied Type instance with the Lexer for token recognition.
     # Method arguments:
     #   t  a Type instance to be recognized.  Whether type ids of the
@@ -834,6 +1029,7 @@ class Recognizer(object):
 
         self.typs.append(t)
         self.tids.append(t.tid)
+        self.dispatcher=None    # Rebuild with the new type when next used
         
     # Print the list of registered tokens
     def types(self):
@@ -845,9 +1041,18 @@ class Recognizer(object):
 # Context Sensitive Lexical Analyzer.  Expects to be subclassed.
 # It is the responsibility of the user of the subclass to determine when the 
 # recognition context changes.
+#
+# Instance Arguments:
+#   eostype   The Type class used for the end-of-string token
+#   compiled  Specify True for contexts to recognize types using a single combined
+#             regular expression.  Specify False to try each type in sequence.
+#   verify    Specify True to have contexts verify compiled recognition against
+#             sequential recognition.
 class CSLA(object):
-    def __init__(self,eostype=EOSType):
+    def __init__(self,eostype=EOSType,compiled=True,verify=False):
         self.ctxs={}      # Defined stateless recognizers
+        self.compiled=compiled  # Contexts use combined regular expressions
+        self.verify=verify      # Contexts verify compiled recognition
         
         # Current string being recognized under different contexts
         # See start() method
@@ -874,7 +1079,8 @@ class CSLA(object):
             cls_str="%s - %s.ctx() -" % (this_module,self.__class__.__name__)
             raise ValueError("%s context already created: %s" % (cls_str,name))
         except KeyError:
-            self.ctxs[name]=Recognizer(name,debug=debug)
+            self.ctxs[name]=Recognizer(name,debug=debug,\
+                compiled=self.compiled,verify=self.verify)
 
     # Allows the subclass to initalize the various contexts.  Must return self
     # if expected to be used with the syntax subclass().init()
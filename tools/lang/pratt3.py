@@ -340,6 +340,11 @@ class Operator(PToken):
 #            derive this object in its overriding value() method, returning the 
 #            derived object.
 class PLit(PToken):
+    # A subclass whose value() method always returns the same value, regardless of
+    # the external helper object, sets this to True.  Such literals are evaluated
+    # once when an expression is compiled.  See the PParser.compile() method.
+    constant=False
+
     def __init__(self,src=None):
         super().__init__(src)
 
@@ -929,6 +934,7 @@ class PExpr(object):
     def __init__(self,desc="nodesc",tokens=[]):
         self.name=desc     # A description of this expression
         self.toks=[]       # List of PToken ojbects defining the expression
+        self.code=None     # PCode object of the compiled expression, if compiled
 
         # If True, binding attributes have been applied to the Operator objects.
         self._isinit=False
@@ -980,6 +986,15 @@ class PExpr(object):
 
         self._isinit=True  # Expression is initialized and ready for use.
         
+    # Compile the expression for repeated evaluation.  The PCode object replaces
+    # the PParser.run() method for evaluation.  If the expression can not be
+    # compiled the self.code attribute remains None and the expression is evaluated
+    # by the PParser.run() method, reporting any error it contains.
+    # Method Argument:
+    #   pparser   The PParser object that evaluates the expression
+    def compile(self,pparser):
+        self.code=pparser.compile(self)
+
     # Used to identify an return the only token when the expression is just one
     # token.  The user must know how to invoke the token's value() method.
     def quick(self):
@@ -993,6 +1008,77 @@ class PExpr(object):
         else:
             self.toks.append(tok)
         self._isinit=False
+        self.code=None
+
+
+# This class is a compiled expression created by the PParser.compile() method.  The
+# expression's PToken objects are placed in postfix order with parentheses removed.
+# Evaluation executes the resulting instructions using a stack.  No PCtx object is
+# created and no operator binding powers are examined.  Sub-expressions consisting
+# only of constant literals are evaluated when compiled.
+#
+# Each instruction is a tuple: (opcode,ptoken,value).
+#
+#   Opcode      Action
+#   PCode.CON   push value (the result of a constant literal or sub-expression)
+#   PCode.LIT   push the result of the ptoken's value() method
+#   PCode.NUD   replace the top of the stack with the ptoken's calc_nud() result
+#   PCode.LED   replace the top two stack entries with the ptoken's calc_led()
+#               result
+#
+# Operator calc_nud() and calc_led() methods are passed None as their PCtx object.
+#
+# Instance Argument:
+#   code    A list of instruction tuples
+class PCode(object):
+    # Instruction opcodes
+    CON=0
+    LIT=1
+    NUD=2
+    LED=3
+
+    def __init__(self,code):
+        self.code=code
+
+    def __str__(self):
+        string="%s(instructions=%s)" % (self.__class__.__name__,len(self.code))
+        names=["CON","LIT","NUD","LED"]
+        for opcode,ptok,value in self.code:
+            if opcode==PCode.CON:
+                string="%s\n    CON %s" % (string,value)
+            else:
+                string="%s\n    %s %s" % (string,names[opcode],ptok)
+        return string
+
+    # Evaluate the compiled expression
+    # Method Argument:
+    #   external  The external helper object shared with all PTokens
+    # Returns:
+    #   the result of the expression evaluation
+    # Exception:
+    #   PParserError if the object detects an error during evaluation.
+    #   Other exceptions are possible if subclasses implement them.
+    def run(self,external=None):
+        LIT=PCode.LIT
+        CON=PCode.CON
+        LED=PCode.LED
+        stack=[]
+        push=stack.append
+        pop=stack.pop
+        try:
+            for opcode,ptok,value in self.code:
+                if opcode==LIT:
+                    push(ptok.value(external=external))
+                elif opcode==LED:
+                    right=pop()
+                    stack[-1]=ptok.calc_led(None,stack[-1],right)
+                elif opcode==CON:
+                    push(value)
+                else:
+                    stack[-1]=ptok.calc_nud(None,stack[-1])
+        except PEvaluationError as ee:
+            raise PParserError(ptok=ptok,msg=ee.msg) from None
+        return stack[0]
 
 
 # This class is the base class of the operator precedence evaluator.
@@ -1194,6 +1280,87 @@ class PParser(object):
 
         return left
 
+    # Compiles a sub-expression bounded by PToken binding properties.  The same
+    # tokens are consumed and the same syntax errors detected as the _expression()
+    # method when evaluating the sub-expression.
+    # Method Arguments:
+    #   ctx     PCtx object containing the compilation state
+    #   bp      PTokens whose left binding property exceed this binding property
+    #           value are compiled.  See the _expression() method.
+    # Returns:
+    #   a list of PCode instruction tuples
+    def _compile(self,ctx,bp=0):
+        t=ctx.ptoken
+        next_tok=ctx.ptoken=ctx.next()
+
+        if isinstance(t,Operator) and t.isunary and isinstance(next_tok,PEnd):
+            raise PParserError(ptok=t,msg="operand required for operator")
+
+        # Compile the unary operator or operand
+        if isinstance(t,PLit):
+            if t.constant:
+                left=[(PCode.CON,t,t.value()),]
+            else:
+                left=[(PCode.LIT,t,None),]
+        elif isinstance(t,Operator):
+            if not t.isunary:
+                raise PParserError(ptok=t,msg=" is not a unary operator")
+            right=self._compile(ctx,bp=t.rbp)
+            if isinstance(t,PLParen):
+                # The sub-expression's value is the value of the parentheses
+                ctx.match(PRParen)
+                left=right
+            else:
+                left=self._fold(right+[(PCode.NUD,t,None),])
+        else:
+            raise PParserError(ptok=t,msg="not an operand or operator")
+
+        while True:
+            if isinstance(ctx.ptoken,PLit):
+                raise PParserError(ptok=ctx.ptoken,msg="not an operator")
+            if not bp < ctx.ptoken.lbp:
+                break
+            t=ctx.ptoken
+            if isinstance(t,PEnd):
+                break
+            next_token=ctx.next()
+            if isinstance(next_token,PEnd):
+                raise PParserError(ptok=ctx.ptoken,\
+                    msg="operand required for operator")
+            ctx.ptoken=next_token
+
+            # Compile infix operator
+            if not t.isinfix:
+                raise PParserError(ptok=t,msg="is not an infix operator")
+            right=self._compile(ctx,bp=t.lbp)
+            left=self._fold(left+right+[(PCode.LED,t,None),])
+
+        return left
+
+    # Replaces an operator applied only to constant values by the operator's
+    # constant result.  The operator is not replaced if its calculation fails,
+    # allowing the failure to be reported when the expression is evaluated, or if
+    # the result is not an integer or logical value.
+    # Method Argument:
+    #   code    A list of PCode instruction tuples ending with the operator
+    # Returns:
+    #   the list of PCode instruction tuples with the operator folded if possible
+    def _fold(self,code):
+        opcode,ptok,value=code[-1]
+        try:
+            if opcode==PCode.NUD and len(code)==2 and code[0][0]==PCode.CON:
+                result=ptok.calc_nud(None,code[0][2])
+            elif opcode==PCode.LED and len(code)==3 \
+                 and code[0][0]==PCode.CON and code[1][0]==PCode.CON:
+                result=ptok.calc_led(None,code[0][2],code[1][2])
+            else:
+                return code
+        except Exception:
+            return code
+        if not isinstance(result,int):
+            return code
+        return [(PCode.CON,ptok,result),]
+
     # Occasionally this class needs to create a PToken object.  This method
     # applies the same processes to it as does the Expr._init() method.
     #def _gen(self,tokcls):
@@ -1298,6 +1465,22 @@ class PParser(object):
     #    raise PParserError(ptok,msg="Expected %s, encountered: %s" \
     #        %  (PParser.token_id(ptok),PParser.token_id(self.ptoken)))
 
+    # Compiles an expression into a PCode object for repeated evaluation.  The
+    # result of evaluating the PCode object is the same as the run() method.
+    # Method Argument:
+    #   expr    A PExpr object defining the expression being compiled
+    # Returns:
+    #   a PCode object or None if the expression contains a syntax error.  The error
+    #   is reported when the expression is evaluated by the run() method.
+    def compile(self,expr):
+        try:
+            ctx=PCtx(self,expr)
+            code=self._compile(ctx,bp=0)
+            ctx.ck_parens()
+        except Exception:
+            return None
+        return PCode(code)
+
     # Establishes the binding definition of an opertor based upon is class.
     # See the class Binding for details of the argument usage.
     #
@@ -326,7 +326,9 @@ class Title(object):
 # that instantiates other classes or their subclasses found in this module.  It deals
 # strictly in entire output lines.  It expects to provide all line formatting
 # characters.  The report is built in memory and returned to the subclass or written
-# to a file.  It operates on a "pull" design.  The lines are requested from the
+# to a file.  Alternatively the stream() method writes each line to an open file as
+# it is created, never holding the report in memory.  It operates on a "pull"
+# design.  The lines are requested from the
 # subclass as the listing file needs them, hence "pulling" them from the subclass.
 #
 # There is no requirement to utilize the various Column related classes when using
@@ -408,6 +410,32 @@ class Listing(object):
     def eject(self):
         self.pagelines=0
 
+    # Generate the report writing each line to an open file as it is created.  The
+    # file content is identical to that written by the generate() method.
+    # Method Arguments:
+    #   fo      An open file object to which the report is written.  It is not
+    #           closed by this method.
+    #   buffer  The number of lines collected before they are written to the file.
+    #           Specify 0 to write each line as created.  Defaults to 0.
+    # Exception:
+    #   OSError if the file can not be written.
+    def stream(self,fo,buffer=0):
+        writer=ListingWriter(fo,buffer=buffer)
+        self.report=writer
+        self.pagelines=0
+
+        while True:
+            det=self.detail()
+            if det is None:
+                break
+            self.__line(det)
+
+        # Add a final FF to report
+        if writer:
+            writer.append("\f")
+        writer.flush()
+        self.report=[]
+
     # Generate the report and return it as a string if filename is not provided,
     # otherwise write the listing to the supplied filenmame with supplied filemode.
     def generate(self,filename=None,filemode="wt"):
@@ -444,6 +472,42 @@ class Listing(object):
             "%s subclass must provide title() method" % eloc(self,"title"))
 
 
+# This object replaces the Listing object's list of report lines when the report is
+# streamed to a file.  See the Listing.stream() method.
+#
+# Instance Arguments:
+#   fo      The open file object to which lines are written
+#   buffer  The number of lines collected before they are written.  0 writes each
+#           line when it is appended.  Defaults to 0.
+class ListingWriter(object):
+    def __init__(self,fo,buffer=0):
+        self.fo=fo
+        self.buffer=buffer
+        self.pending=[]     # Lines not yet written
+        self.lines=0        # Number of lines appended
+
+    # Returns True if any line has been appended, like a non-empty list.
+    def __bool__(self):
+        return self.lines!=0
+
+    def append(self,line):
+        self.lines+=1
+        if self.buffer<=0:
+            self.fo.write(line)
+            return
+        pending=self.pending
+        pending.append(line)
+        if len(pending)>=self.buffer:
+            self.fo.write("".join(pending))
+            pending.clear()
+
+    # Write any lines not yet written
+    def flush(self):
+        if self.pending:
+            self.fo.write("".join(self.pending))
+            self.pending=[]
+
+
 # This object is used by the Multiline object to simplify managing different portions
 # of the listing.
 class ListingPart(object):
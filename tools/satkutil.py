@@ -1177,6 +1177,69 @@ class FilePath(object):
 # +-------------------------------------+
 #
 
+# This class retains the names of the files in a search path directory.  A PathMgr
+# object consults it rather than attempting to open a file in a directory that does
+# not contain the file.  Both the presence and the absence of a file are answered
+# by the retained names.
+#
+# Instance Argument:
+#   directory   The absolute path of the directory
+class DirListing(object):
+    def __init__(self,directory):
+        self.directory=directory
+        self.mtime=None    # Directory modification time when listed
+        self.names=None    # Set of file names or None if not listed
+        self.folded=None   # Set of case folded file names or None if not listed
+        self.load()
+
+    def __str__(self):
+        if self.names is None:
+            return "DirListing(%s) unlisted" % self.directory
+        return "DirListing(%s) files: %s" % (self.directory,len(self.names))
+
+    # Returns whether the directory has changed since it was listed.  A directory's
+    # modification time changes when a file is added to or removed from it.
+    def changed(self):
+        try:
+            mtime=os.stat(self.directory).st_mtime_ns
+        except OSError:
+            mtime=None
+        return mtime!=self.mtime
+
+    # List the directory's files
+    def load(self):
+        names=set()
+        try:
+            mtime=os.stat(self.directory).st_mtime_ns
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            names.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            mtime=names=None
+        self.mtime=mtime
+        self.names=names
+        if names is None:
+            self.folded=None
+        else:
+            self.folded=set(n.casefold() for n in names)
+
+    # Returns whether a file may be present in the directory.  The file must be
+    # tried when the directory could not be listed, when the file name includes a
+    # subdirectory, or when the name differs only in case from a listed file (the
+    # file system may be case insensitive).
+    def present(self,filename):
+        names=self.names
+        if names is None or filename in names:
+            return True
+        if os.sep in filename or (os.altsep and os.altsep in filename):
+            return True
+        return filename.casefold() in self.folded
+
+
 # This class encapsulates the processing of a single search order path
 class SOPath(object):
     def __init__(self,variable):
@@ -1270,15 +1333,28 @@ class SOPath(object):
 # to used for all paths, or individual instances may be used for a subset including
 # one path.
 #
+# Search path directory listings are retained so that a file is only opened in a
+# directory that contains it.  A file absent from every directory is rejected
+# without any attempt to open it.
+#
 # Instance arguments:
 #    'variable'   A single string or list of strings identifying the supported
 #                 environment variables.
 #    default      The default directory if an environment variable is not defined.
 #                 Defaults to None.
+#    cache        Specify False to attempt to open a file in each directory without
+#                 retaining directory listings.  Defaults to True.
+#    revalidate   Specify True to list a directory again when it has changed since
+#                 it was last listed.  Specify False to rely on the retained
+#                 listings, avoiding all directory status checks.  Defaults to True.
 class PathMgr(object):
-    def __init__(self,variable=None,default=None,debug=False):
+    def __init__(self,variable=None,default=None,cache=True,revalidate=True,\
+                 debug=False):
         self.debug=debug          # Enable debugging of all methods
         self.paths={}             # Dictionary of supported paths
+        self.cache=cache          # Whether directory listings are retained
+        self.revalidate=revalidate  # Whether retained listings are revalidated
+        self.listings={}          # DirListing objects by absolute directory path
 
         if __debug__:
             clstr="satkutil.py - %s.__init__() -" % (self.__class__.__name__)
@@ -1303,6 +1379,35 @@ class PathMgr(object):
     def __str__(self):
         return "PathMgr: %s" % self.paths
 
+    # Returns the paths in search order at which a file opened for reading may be
+    # found.  Directories whose listing does not contain the file are omitted.
+    # Method Arguments:
+    #   pathlist  The list of search path directories
+    #   filename  The relative path of the file being opened
+    #   debug     Specify True to print omitted directories
+    def candidates(self,pathlist,filename,debug=False):
+        listings=self.listings
+        found=[]
+        for d in pathlist:
+            if os.path.isabs(d):
+                absd=d
+            else:
+                absd=os.path.abspath(d)
+            try:
+                listing=listings[absd]
+                if self.revalidate and listing.changed():
+                    listing.load()
+            except KeyError:
+                listing=listings[absd]=DirListing(absd)
+            if listing.present(filename):
+                found.append(os.path.join(d,filename))
+            elif __debug__:
+                if debug:
+                    print("satkutil.py - %s.candidates() - not in directory "
+                        "listing: %s" % (self.__class__.__name__,\
+                            os.path.join(d,filename)))
+        return found
+
     # Returns configuration information about the specific path
     def cinfo(self,variable):
         try:
@@ -1353,6 +1458,39 @@ class PathMgr(object):
                         files.append(x)
         return files
 
+    # Discard all retained directory listings
+    def forget(self):
+        self.listings={}
+
+    # Returns whether opening a file for reading would still select the path at
+    # which the file was previously located.  The retained directory listings of
+    # the search path are consulted, so a file added to a directory earlier in the
+    # search order is recognized.
+    # Method Arguments:
+    #   filename  The file name as opened
+    #   filepath  The path returned by ropen() when the file was opened
+    #   variable  The environment variable of the search path used to open the file
+    def resolves(self,filename,filepath,variable=None):
+        try:
+            pathlist=self.paths[variable].dir_list
+        except KeyError:
+            return filename==filepath
+        if os.path.isabs(filename):
+            return filename==filepath
+
+        if self.cache:
+            filepaths=self.candidates(pathlist,filename)
+        else:
+            filepaths=[os.path.join(p,filename) for p in pathlist]
+        for path in filepaths:
+            if path==filepath:
+                return True
+            # A listing may only suggest the file is present (for example when
+            # the names differ in case), so the file itself is checked.
+            if os.path.isfile(path):
+                return False
+        return False
+
     # Perform the actual opening of the file
     def osopen(self,filename,mode,debug=False):
         if __debug__:
@@ -1508,10 +1646,14 @@ class PathMgr(object):
                 clsstr="satkutil.py - %s.ropen() -" % (self.__class__.__name__)
                 print("%s using path %s with directories: %s" \
                     % (clsstr,variable,pathlist))
+        # Only directories that may contain an existing file are tried
+        if self.cache and "r" in mode:
+            filepaths=self.candidates(pathlist,filename,debug=ldebug)
+        else:
+            filepaths=[os.path.join(p,filename) for p in pathlist]
         if stdio:
             # Return the open file object
-            for p in pathlist:
-                filepath=os.path.join(p,filename)
+            for filepath in filepaths:
                 try:
                     return (filepath,self.osopen(filepath,mode,debug=ldebug))
                 # on success, simply return the tuple (abspath,file_object)
@@ -1529,9 +1671,7 @@ class PathMgr(object):
 
         else:
             # Return the open file descriptor object
-            for p in pathlist:
-                filepath=os.path.join(p,filename)
-
+            for filepath in filepaths:
                 try:
                     return (filepath,os.open(filepath,os.O_RDONLY))
                 # on success, simply return the tuple (abspath,descriptor_object)
@@ -1635,48 +1775,25 @@ def byte2str(blist):
     return "".join(s)
 
 
-# Produce a hex dump of a bytes/bytearray sequence as a string
+# Produce a hex dump of a bytes/bytearray sequence as a string.  The dump is
+# produced by the hexdump.py dump engine.
 # Function Arguments:
 #   barray   the sequence being dumped
 #   start    the initial starting address.  Defaults to 0
 #   mode     the "address mode" used for the dump.  Accepts 24,31,64.  Defaults to 24
 #   indent   a string constituting the line indent
+#   chars    'ascii' or 'ebcdic' to add a character column.  Defaults to None.
+#   suppress Specify True to suppress duplicate lines.  Defaults to False.
 # Returns:
 #   a string of the hexadecimal represantation of the binary sequence
-def dump(barray,start=0,mode=24,indent=""):
-    #isstring=isinstance(barray,type(""))
-    isstring=not isinstance(barray,(bytes,bytearray))
-    if mode==31:
-        format="%s%s%08X %s\n"
-    else:
-        if mode==64:
-           format="%s%s%016X %s\n"
-        else:
-           format="%s%s%06X %s\n"
-    string=""
-    addr=start
-    strlen=len(barray)
-    #print("strlen: %s" % strlen)
-    strend=strlen-1
-    for x in range(0,strlen,16):
-        #print("x=%s" % x)
-        linestr=""
-        for y in range(x,x+15,4):
-            #print("y=%s" % y)
-            wordstr=""
-            if y>strend:
-                continue
-            last=min(y+4,strlen)
-            for z in range(y,last,1):
-                #print("z=%s" % z)
-                if isstring:
-                    wordstr="%s%02X" % (wordstr,ord(barray[z]))
-                else:
-                    wordstr="%s%02X" % (wordstr,barray[z])
-            linestr="%s %s" % (linestr,wordstr)
-        string=format % (string,indent,addr,linestr)
-        addr+=16
-    return string[:-1]
+def dump(barray,start=0,mode=24,indent="",chars=None,suppress=False):
+    try:
+        import hexdump
+    except ImportError:
+        pythonpath("tools/ipl",nodup=True)
+        import hexdump
+    return hexdump.dump(barray,start=start,mode=mode,indent=indent,chars=chars,\
+        suppress=suppress)
 
 
 # This function returns a standard identification of an error's location.